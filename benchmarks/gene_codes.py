@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+"""Benchmark of the run-wide gene codes of multiplemuts.
+
+Computes the membership of every gene of the DEG, UP and DOWN categories and
+of every inverted regulation (the UP genes of a sample against the DOWN
+genes of the others and the other way round) of synthetic samples twice: on
+sets of gene ID strings rebuilt from the index of each sample for every
+comparison, as before the GeneDictionary, and on the sorted int32 codes the
+samples get once from encode_samples(). Reports the wall time and the peak
+memory (tracemalloc) of each, and the memory the codes of the samples hold.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, DGEAPY_PATH)
+
+from dgeapy.gene_dictionary import SAMPLE_GENE_CODES
+from dgeapy.gene_dictionary import encode_samples
+from dgeapy.intersections import get_membership_codes
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def mk_samples(n_samples, n_genes, seed=0):
+    """Returns <n_samples> samples with the input, DEG, UP and DOWN
+    dataframes (of their gene IDs only) of multiplemuts. Every sample has
+    the same <n_genes> gene IDs, in its own order, and about 30% of them are
+    differentially expressed.
+    """
+
+    rng = np.random.default_rng(seed)
+    gene_ids = np.array(
+            [f'TRANSCRIPT_{i:07d}' for i in range(n_genes)], dtype=object
+            )
+
+    samples = []
+    for _ in range(n_samples):
+        index = pd.Index(gene_ids[rng.permutation(n_genes)])
+        is_up = rng.random(n_genes) < 0.5
+        is_dge = rng.random(n_genes) < 0.3
+        samples.append(SimpleNamespace(
+                input_df=pd.DataFrame(index=index),
+                dge_df=pd.DataFrame(index=index[is_dge]),
+                up_df=pd.DataFrame(index=index[is_dge & is_up]),
+                down_df=pd.DataFrame(index=index[is_dge & ~is_up]),
+                ))
+
+    return samples
+
+
+def get_inverted_regulation_sets(sets, inverted_sets):
+    """Yields, for each sample, <sets> with that of the sample replaced by
+    its <inverted_sets>.
+    """
+
+    for i in range(len(sets)):
+        yield sets[:i] + [inverted_sets[i]] + sets[i + 1:]
+
+
+def compare_strings(samples):
+    """Every comparison rebuilds the sets of gene ID strings it needs.
+    """
+
+    for df_attribute in SAMPLE_GENE_CODES:
+        get_membership_codes([set(getattr(d, df_attribute).index) for d in samples])
+
+    up_sets = [set(d.up_df.index) for d in samples]
+    down_sets = [set(d.down_df.index) for d in samples]
+    for sets, inverted_sets in ((down_sets, up_sets), (up_sets, down_sets)):
+        for gene_sets in get_inverted_regulation_sets(sets, inverted_sets):
+            get_membership_codes(gene_sets)
+
+
+def compare_codes(samples):
+    """Gene IDs are encoded once and every comparison uses the codes.
+    """
+
+    n_genes = len(encode_samples(samples).gene_ids)
+
+    for codes_attribute in SAMPLE_GENE_CODES.values():
+        get_membership_codes(
+                [getattr(d, codes_attribute) for d in samples], n_genes
+                )
+
+    up_codes = [d.up_codes for d in samples]
+    down_codes = [d.down_codes for d in samples]
+    for codes, inverted_codes in ((down_codes, up_codes), (up_codes, down_codes)):
+        for gene_codes in get_inverted_regulation_sets(codes, inverted_codes):
+            get_membership_codes(gene_codes, n_genes)
+
+
+def measure(function, samples, repeats):
+    """Returns the best wall time, in seconds, of <repeats> calls of
+    <function> on <samples> and the peak memory, in bytes, of another one.
+    """
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(samples)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(samples)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(times), peak
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    parser.add_argument(
+            '--samples',
+            metavar='INT',
+            type=int,
+            default=16,
+            help='number of samples, default is 16'
+            )
+    parser.add_argument(
+            '--genes',
+            metavar='INT',
+            type=int,
+            default=60000,
+            help='genes of each sample, default is 60000'
+            )
+    parser.add_argument(
+            '--repeats',
+            metavar='INT',
+            type=int,
+            default=3,
+            help='best of this many runs of each timing, default is 3'
+            )
+    args = parser.parse_args(argv)
+
+    samples = mk_samples(args.samples, args.genes)
+
+    results = {
+            'strings' : measure(compare_strings, samples, args.repeats),
+            'int32 codes' : measure(compare_codes, samples, args.repeats),
+            }
+    codes_size = sum(
+            getattr(d, codes_attribute).nbytes
+            for d in samples
+            for codes_attribute in SAMPLE_GENE_CODES.values()
+            )
+
+    print(
+            f'{args.samples} samples of {args.genes} genes, ' \
+            f'{3 + 2 * args.samples} comparisons'
+            )
+    print(f'{"genes as":<12}{"wall s":>8}{"peak MiB":>10}')
+    for mode, (wall_time, peak) in results.items():
+        print(f'{mode:<12}{wall_time:>8.2f}{peak / 2**20:>10.1f}')
+    print(f'the codes of the samples hold {codes_size / 2**20:.1f} MiB')
+
+
+if __name__ == "__main__":
+    main()
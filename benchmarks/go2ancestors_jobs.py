@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+"""Scaling benchmark of go2ancestors --jobs.
+
+Runs go2ancestors on a synthetic annotation table and ontology with each
+number of jobs and reports the wall time of the whole command and of its
+row-sharded stage (map_row_shards() over get_go_column_ancestors()), the
+speedup over 1 job and the efficiency (speedup per worker). The output
+table of every run is checked to be the same as with 1 job.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+import contextlib
+import importlib.util
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, DGEAPY_PATH)
+
+# The table cache is left out, so every run parses its table.
+os.environ['DGEAPY_CACHE_DIR'] = ''
+
+from dgeapy.tables import read_table
+from dgeapy.go_ancestors import load_go_ancestor_closure
+from dgeapy.go_ancestors import get_go_column_ancestors
+from dgeapy.parallel import map_row_shards
+
+from synthetic import mk_go_obo
+from synthetic import mk_go_table
+
+
+GO_COLUMN = 'Gene Ontology IDs'
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def load_go2ancestors():
+    """Imports dgeapy_go2ancestors.py and returns its main function.
+    """
+
+    spec = importlib.util.spec_from_file_location(
+            'dgeapy_go2ancestors', f'{DGEAPY_PATH}/dgeapy_go2ancestors.py'
+            )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    return module.main
+
+
+def best_time(function, repeats):
+    """Returns the best wall time, in seconds, of <repeats> calls of
+    <function>.
+    """
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def file_sha256(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    parser.add_argument(
+            '--rows',
+            metavar='INT',
+            type=int,
+            default=200000,
+            help='rows of the synthetic table, default is 200000'
+            )
+    parser.add_argument(
+            '--terms',
+            metavar='INT',
+            type=int,
+            default=45000,
+            help='terms of the synthetic go.obo file, default is 45000'
+            )
+    parser.add_argument(
+            '--jobs',
+            metavar='INT',
+            type=int,
+            nargs='+',
+            default=[1, 2, 4],
+            help='numbers of jobs to time, default is 1 2 4'
+            )
+    parser.add_argument(
+            '--repeats',
+            metavar='INT',
+            type=int,
+            default=3,
+            help='best of this many runs of each timing, default is 3'
+            )
+    args = parser.parse_args(argv)
+
+    go2ancestors = load_go2ancestors()
+    jobs_list = sorted(set([1] + args.jobs))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        obo_file = f'{tmp_dir}/go.obo'
+        table_file = f'{tmp_dir}/table.tsv'
+        mk_go_obo(obo_file, args.terms)
+        mk_go_table(table_file, args.rows, args.terms)
+
+        # The closure is built and cached once, outside of the timings.
+        go_ancestors = load_go_ancestor_closure(obo_file)
+        go_codes = read_table(table_file)[GO_COLUMN]
+
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            results = {}
+            reference = None
+            for jobs in jobs_list:
+                stage = best_time(
+                        lambda: map_row_shards(
+                            get_go_column_ancestors,
+                            go_codes,
+                            jobs,
+                            go_ancestors=go_ancestors,
+                            ),
+                        args.repeats,
+                        )
+                with contextlib.redirect_stdout(None):
+                    command = best_time(
+                            lambda: go2ancestors([
+                                '-t', table_file,
+                                '-on', GO_COLUMN,
+                                '--obo', obo_file,
+                                '--jobs', str(jobs),
+                                ]),
+                            args.repeats,
+                            )
+                results[jobs] = (command, stage)
+
+                digest = file_sha256('table.tsv_go_ancestors.tsv')
+                if reference is None:
+                    reference = digest
+                elif digest != reference:
+                    sys.exit(f'\n** Output with {jobs} jobs differs from 1 job **\n')
+        finally:
+            os.chdir(cwd)
+
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count()
+    print(f'{args.rows} rows, {args.terms} GO terms, {cpus} CPUs available')
+    if cpus < max(jobs_list):
+        print('more jobs than CPUs: the extra jobs can only add overhead')
+    print(
+            f'{"jobs":>4}{"command s":>11}{"speedup":>9}{"per job":>9}' \
+            f'{"sharded s":>11}{"speedup":>9}{"per job":>9}'
+            )
+    for jobs, (command, stage) in results.items():
+        command_speedup = results[1][0] / command
+        stage_speedup = results[1][1] / stage
+        print(
+                f'{jobs:>4}{command:>11.2f}{command_speedup:>9.2f}' \
+                f'{command_speedup / jobs:>9.2f}{stage:>11.2f}' \
+                f'{stage_speedup:>9.2f}{stage_speedup / jobs:>9.2f}'
+                )
+    print('outputs are identical for every number of jobs')
+
+
+if __name__ == "__main__":
+    main()
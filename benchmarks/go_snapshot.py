@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+"""Benchmark of the lazily loaded GO snapshot of go2ancestors.
+
+On a synthetic go.obo file, times:
+    - go2ancestors --help, which no longer loads the ontology, against the
+      same --help after a full goatools parse of the file, which is what
+      the script used to do at import time.
+    - a full goatools parse of the file.
+    - load_go_snapshot() with no snapshot (cold: parse and store it) and
+      with the snapshot already stored (warm).
+    - load_go_ancestor_closure(), cold and warm.
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import tempfile
+import subprocess
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, DGEAPY_PATH)
+
+from dgeapy.go_ancestors import load_go_snapshot
+from dgeapy.go_ancestors import load_go_ancestor_closure
+
+from synthetic import mk_go_obo
+
+
+# go2ancestors --help as the script ran it before the snapshot, with the
+# ontology parsed at import time.
+FULL_PARSE_HELP = """
+import sys, runpy
+from goatools.obo_parser import GODag
+GODag(sys.argv[1], optional_attrs={'relationship'}, prt=None)
+sys.argv = [sys.argv[2], '--help']
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def time_call(function, repeats=1):
+    """Returns the best wall time, in seconds, of <repeats> calls of
+    <function>.
+    """
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def remove_cache_files(obo_file):
+    for cache_file in glob.glob(f'{glob.escape(obo_file)}.*.npz'):
+        os.remove(cache_file)
+
+
+def full_parse(obo_file):
+    from goatools.obo_parser import GODag
+
+    GODag(
+            obo_file,
+            optional_attrs={'relationship', 'replaced_by'},
+            load_obsolete=True,
+            prt=None,
+            )
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    parser.add_argument(
+            '--terms',
+            metavar='INT',
+            type=int,
+            default=45000,
+            help='terms of the synthetic go.obo file, default is 45000 ' \
+                 '(about the size of GO)'
+            )
+    parser.add_argument(
+            '--obo',
+            metavar='<go.obo>',
+            type=str,
+            help='time this go.obo file instead of a synthetic one, its ' \
+                 'snapshots are removed'
+            )
+    parser.add_argument(
+            '--repeats',
+            metavar='INT',
+            type=int,
+            default=3,
+            help='best of this many runs of each warm timing, default is 3'
+            )
+    args = parser.parse_args(argv)
+
+    script = f'{DGEAPY_PATH}/dgeapy_go2ancestors.py'
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.obo:
+            obo_file = os.path.abspath(args.obo)
+        else:
+            obo_file = f'{tmp_dir}/go.obo'
+            mk_go_obo(obo_file, args.terms)
+        remove_cache_files(obo_file)
+
+        results = {}
+        results['--help, lazy load'] = time_call(
+                lambda: subprocess.run(
+                    [sys.executable, script, '--help'],
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                    ),
+                args.repeats,
+                )
+        results['--help, full parse first'] = time_call(
+                lambda: subprocess.run(
+                    [sys.executable, '-c', FULL_PARSE_HELP, obo_file, script],
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                    ),
+                args.repeats,
+                )
+        results['goatools full parse'] = time_call(
+                lambda: full_parse(obo_file)
+                )
+
+        results['snapshot, cold'] = time_call(
+                lambda: load_go_snapshot(obo_file)
+                )
+        results['snapshot, warm'] = time_call(
+                lambda: load_go_snapshot(obo_file), args.repeats
+                )
+
+        remove_cache_files(obo_file)
+        results['ancestor closure, cold'] = time_call(
+                lambda: load_go_ancestor_closure(obo_file)
+                )
+        results['ancestor closure, warm'] = time_call(
+                lambda: load_go_ancestor_closure(obo_file), args.repeats
+                )
+
+        snapshot = load_go_snapshot(obo_file)
+        obo_size = os.path.getsize(obo_file)
+        snapshot_size = sum(
+                os.path.getsize(f)
+                for f in glob.glob(f'{glob.escape(obo_file)}.*.snapshot.npz')
+                )
+
+        if args.obo:
+            remove_cache_files(obo_file)
+
+    print(
+            f'{len(snapshot.terms)} terms, go.obo {obo_size / 1024**2:.1f} MB, ' \
+            f'snapshot {snapshot_size / 1024**2:.1f} MB'
+            )
+    for name, seconds in results.items():
+        print(f'{name:<28}{seconds:>9.3f} s')
+    print(
+            'warm snapshot load is ' \
+            f'{results["goatools full parse"] / results["snapshot, warm"]:.0f}x ' \
+            'faster than a full parse'
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+"""Benchmark of the intersections of 2, 3 and 4 sets of gene IDs.
+
+Times the loops over Python sets the intersections were computed with
+before (benchmarks/legacy.py) against the membership codes of
+get_gene_ids_set_for_intersections() on the same sets of gene ID strings,
+on arrays of the same strings and on the integer codes of a GeneDictionary,
+which is what multiplemuts compares. Every result is checked to be the same
+as that of the loops.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, DGEAPY_PATH)
+
+from dgeapy.intersections import get_gene_ids_set_for_intersections
+from dgeapy.intersections import get_membership_codes
+from dgeapy.intersections import group_by_code
+from dgeapy.intersections import code_to_key
+
+import legacy
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def best_time(function, repeats):
+    """Returns the best wall time, in seconds, of <repeats> calls of
+    <function>, and the result of the last one.
+    """
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    return min(times), result
+
+
+def get_intersections_from_codes(gene_sets, n_genes):
+    """Intersections of <gene_sets>, the codes of a GeneDictionary of
+    <n_genes> gene IDs, as get_gene_ids_set_for_intersections() computes
+    them.
+    """
+
+    genes, codes = get_membership_codes(gene_sets, n_genes)
+    distinct_codes, positions = group_by_code(codes)
+
+    return {
+            code_to_key(code, len(gene_sets)) : set(genes[p].tolist())
+            for code, p in zip(distinct_codes.tolist(), positions)
+            }
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    parser.add_argument(
+            '--genes',
+            metavar='INT',
+            type=int,
+            default=100000,
+            help='gene IDs in each set, out of 1.5 times as many, default ' \
+                 'is 100000'
+            )
+    parser.add_argument(
+            '--repeats',
+            metavar='INT',
+            type=int,
+            default=5,
+            help='best of this many runs of each timing, default is 5'
+            )
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    n_genes = args.genes * 3 // 2
+    gene_ids = np.array(
+            [f'TRANSCRIPT_{i:07d}' for i in range(n_genes)], dtype=object
+            )
+
+    print(f'sets of {args.genes} gene IDs out of {n_genes}')
+    print(f'{"":>14}{"membership codes of":>31}')
+    print(
+            f'{"sets":>4}{"loops s":>10}{"sets s":>10}{"strings s":>11}' \
+            f'{"codes s":>10}'
+            )
+    for n_sets in (2, 3, 4):
+        gene_codes = [
+                np.sort(rng.choice(n_genes, args.genes, replace=False))
+                .astype(np.int32)
+                for _ in range(n_sets)
+                ]
+        gene_arrays = [gene_ids[codes] for codes in gene_codes]
+        gene_sets = [set(genes.tolist()) for genes in gene_arrays]
+
+        loops = getattr(legacy, f'get_gene_ids_set_for_intersections{n_sets}')
+        loops_time, expected = best_time(
+                lambda: loops(*gene_sets), args.repeats
+                )
+        expected = {key : genes for key, genes in expected.items() if genes}
+
+        sets_time, by_sets = best_time(
+                lambda: get_gene_ids_set_for_intersections(gene_sets),
+                args.repeats,
+                )
+        strings_time, by_strings = best_time(
+                lambda: get_gene_ids_set_for_intersections(gene_arrays),
+                args.repeats,
+                )
+        codes_time, by_codes = best_time(
+                lambda: get_intersections_from_codes(gene_codes, n_genes),
+                args.repeats,
+                )
+
+        by_codes = {
+                key : set(gene_ids[list(codes)].tolist())
+                for key, codes in by_codes.items()
+                }
+        if not expected == by_sets == by_strings == by_codes:
+            sys.exit(f'\n** Intersections of {n_sets} sets differ **\n')
+
+        print(
+                f'{n_sets:>4}{loops_time:>10.3f}{sets_time:>10.3f}' \
+                f'{strings_time:>11.3f}{codes_time:>10.3f}'
+                )
+    print('every result is the same as that of the loops')
+
+
+if __name__ == "__main__":
+    main()
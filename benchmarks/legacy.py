@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+"""Code paths the benchmarks compare against, as they were before being
+optimized.
+"""
+
+import numpy as np
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+# Intersections of 2, 3 and 4 sets of gene IDs (dgeapy/filter_dataframe.py),
+# replaced by dgeapy.intersections.get_gene_ids_set_for_intersections().
+def get_gene_ids_set_for_intersections2(
+        set1,
+        set2,
+        ):
+    """Computes lists contaning gene_ids. Generates one list for each intersection.
+    Returns a dictionary where the keys are binary numbers that represent the
+    list for each intersection:
+        - First bit equals to the first set.
+        - Second bit equals to the second set.
+    """
+
+    intersections_dict = {
+            "10" : set(),
+            "01" : set(),
+            "11" : set()
+            }
+    for gene in set1:
+        if gene in set2:
+            intersections_dict["11"].add(gene)
+        elif gene not in set2:
+            intersections_dict["10"].add(gene)
+
+    for gene in set2:
+        if gene not in set1:
+            intersections_dict["01"].add(gene)
+
+    return intersections_dict
+
+
+def get_gene_ids_set_for_intersections3(
+        set1,
+        set2,
+        set3,
+        ):
+    """Computes lists contaning gene_ids. Generates one list for each intersection.
+    Returns a dictionary where the keys are binary numbers that represent the
+    list for each intersection:
+        - First bit equals to the first set.
+        - Second bit equals to the second set.
+        - Third bit equals to the third set.
+    """
+
+    intersections_dict = {
+            "100" : set(),
+            "010" : set(),
+            "001" : set(),
+            "110" : set(),
+            "101" : set(),
+            "011" : set(),
+            "111" : set()
+            }
+    for gene in set1:
+        if gene in set2 and gene in set3:
+            intersections_dict["111"].add(gene)
+        elif gene in set2 and gene not in set3:
+            intersections_dict["110"].add(gene)
+        elif gene not in set2 and gene in set3:
+            intersections_dict["101"].add(gene)
+        elif gene not in set2 and gene not in set3:
+            intersections_dict["100"].add(gene)
+
+    for gene in set2:
+        if gene not in set1 and gene in set3:
+            intersections_dict["011"].add(gene)
+        elif gene not in set1 and gene not in set3:
+            intersections_dict["010"].add(gene)
+
+    for gene in set3:
+        if gene not in set1 and gene not in set2:
+            intersections_dict["001"].add(gene)
+
+    return intersections_dict
+
+
+def get_gene_ids_set_for_intersections4(set1, set2, set3, set4):
+    """
+    Computes sets containing gene IDs. Generates one set for each intersection.
+    Returns a dictionary where the keys are binary numbers that represent the
+    list for each intersection:
+        - First bit equals to the first set.
+        - Second bit equals to the second set.
+        - Third bit equals to the third set.
+        - Fourth bit equals to the fourth set.
+    """
+    intersections_dict = {
+        "0001": set(),
+        "0010": set(),
+        "0100": set(),
+        "1000": set(),
+        "0011": set(),
+        "0101": set(),
+        "1001": set(),
+        "0110": set(),
+        "1010": set(),
+        "1100": set(),
+        "0111": set(),
+        "1011": set(),
+        "1101": set(),
+        "1110": set(),
+        "1111": set(),
+    }
+
+    for gene in set1:
+        if gene in set2 and gene in set3 and gene in set4:
+            intersections_dict["1111"].add(gene)
+        elif gene in set2 and gene in set3 and gene not in set4:
+            intersections_dict["1110"].add(gene)
+        elif gene in set2 and gene not in set3 and gene in set4:
+            intersections_dict["1101"].add(gene)
+        elif gene in set2 and gene not in set3 and gene not in set4:
+            intersections_dict["1100"].add(gene)
+        elif gene not in set2 and gene in set3 and gene in set4:
+            intersections_dict["1011"].add(gene)
+        elif gene not in set2 and gene in set3 and gene not in set4:
+            intersections_dict["1010"].add(gene)
+        elif gene not in set2 and gene not in set3 and gene in set4:
+            intersections_dict["1001"].add(gene)
+        else:
+            intersections_dict["1000"].add(gene)
+
+    for gene in set2:
+        if gene not in set1 and gene in set3 and gene in set4:
+            intersections_dict['0111'].add(gene)
+        elif gene not in set1 and gene in set3 and gene not in set4:
+            intersections_dict['0110'].add(gene)
+        elif gene not in set1 and gene not in set3 and gene in set4:
+            intersections_dict['0101'].add(gene)
+        elif gene not in set1 and gene not in set3 and gene not in set4:
+            intersections_dict['0100'].add(gene)
+
+    for gene in set3:
+        if gene not in set1 and gene not in set2 and gene in set4:
+            intersections_dict['0011'].add(gene)
+        elif gene not in set1 and gene not in set2 and gene not in set4:
+            intersections_dict['0010'].add(gene)
+
+    for gene in set4:
+        if gene not in set1 and gene not in set2 and gene not in set3:
+            intersections_dict['0001'].add(gene)
+
+    return intersections_dict
+
+
+# "Regulation" column of a "log2 Fold Change" one (dgeapy/add_columns.py),
+# replaced by a lookup on the signs of the whole column.
+def add_regulation_columns(dataframe):
+    """
+    Adds a "Regulation" column to the dataframe after each  "Fold Change" one.
+    A gene is considered as up-regulated if the "log2 Fold Change" value 
+    is positive, and down-regulated if the value is negative. 
+    """
+
+    # We get the column names.
+    column_names = dataframe.columns.values.tolist()
+    # We set an accumulator so we can keep track of the column names we've
+    # been adding.
+    accumulator = 2
+
+    if 'Regulation' in column_names:
+        return None
+
+    # Iterate trough the column names using the index numbers.
+    for index_num  in range(len(column_names)):
+        # If "log2FoldChange" is present in the name of the column:
+        if "log2FoldChange" in column_names[index_num] or 'log2foldchange' in column_names[index_num]:
+
+            # Saving the column name as a variable.
+            log2FoldChange_column_name = str(column_names[index_num])
+
+            # Creating the new column name just by replacing "log2FoldChange"
+            # from the previous column with "Regulation".
+            new_column_name = log2FoldChange_column_name.replace(
+                column_names[index_num],
+                "Regulation",
+                )
+
+            # new_column values are the result of checking if each value form
+            # "log2 Fold Change" is positive or negative (greater or less 
+            # then zero). We'll fill this list with a for loop.
+            new_column_values = []
+
+            # For each value in the "log2FoldChange" column:
+            for value in dataframe[log2FoldChange_column_name]:
+                # If value is greater than zero, add "Up".
+                if value > 0:
+                    new_column_values.append("Up")
+                # If value is less than zero, add "Down".
+                elif value < 0:
+                    new_column_values.append("Down")
+                # If value is equal to zero, add "Unchanged"
+                elif value == 0:
+                    new_column_values.append("Unchanged")
+                # In any other situation, add "--"
+                else:
+                    new_column_values.append(np.nan)
+
+            dataframe.insert(
+                    # Location where new_colmn will be inserted.
+                    loc=(index_num + accumulator),
+                    # Columb name
+                    column=new_column_name,
+                    # Values it will contain
+                    value=new_column_values,
+                    )
+
+            # Specifiying the new column type as "string".
+            dataframe[new_column_name] = dataframe[new_column_name].astype(
+                    "string"
+                    )
+
+            # Add +1 to the accumulator because we added one more column
+            # to the dataframe. By doing it so, the next "Regulation" column
+            # will be placed after two positions of the corresponding
+            # "log2FoldChange" column.
+            accumulator += 1
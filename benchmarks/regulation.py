@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""Micro-benchmark of add_regulation_columns().
+
+Adds the "Regulation" column of a synthetic table with a single "log2 Fold
+Change" column, with missing, zero and infinite values, with the loop over
+the values it was added with before (benchmarks/legacy.py) and with the
+lookup on the signs of the column of dgeapy.add_columns, and reports the
+wall time of each. Both columns are checked to hold the same regulations.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, DGEAPY_PATH)
+
+from dgeapy.add_columns import add_fold_change_columns
+from dgeapy.add_columns import add_regulation_columns
+
+import legacy
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def mk_table(n_rows, seed=0):
+    """Returns a table of <n_rows> genes with "log2FoldChange", "FoldChange"
+    and "padj" columns. 5% of the log2 fold changes are missing and 1% are
+    zero.
+    """
+
+    rng = np.random.default_rng(seed)
+    log2_fold_changes = rng.normal(0, 2, n_rows)
+    log2_fold_changes[rng.random(n_rows) < 0.05] = np.nan
+    log2_fold_changes[rng.random(n_rows) < 0.01] = 0.0
+    log2_fold_changes[:3] = [-0.0, np.inf, -np.inf]
+
+    table = pd.DataFrame({
+            'gene_id' : [f'GENE_{i:07d}' for i in range(n_rows)],
+            'log2FoldChange' : log2_fold_changes,
+            'padj' : rng.random(n_rows),
+            })
+    add_fold_change_columns(table)
+
+    return table
+
+
+def best_time(function, table, repeats):
+    """Returns the best wall time, in seconds, of <repeats> calls of
+    <function> on a copy of <table>, and the last copy.
+    """
+
+    times = []
+    for _ in range(repeats):
+        copy = table.copy()
+        start = time.perf_counter()
+        function(copy)
+        times.append(time.perf_counter() - start)
+
+    return min(times), copy
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    parser.add_argument(
+            '--rows',
+            metavar='INT',
+            type=int,
+            default=1000000,
+            help='rows of the synthetic table, default is 1000000'
+            )
+    parser.add_argument(
+            '--repeats',
+            metavar='INT',
+            type=int,
+            default=3,
+            help='best of this many runs of each timing, default is 3'
+            )
+    args = parser.parse_args(argv)
+
+    table = mk_table(args.rows)
+
+    loop_time, loop_table = best_time(
+            legacy.add_regulation_columns, table, args.repeats
+            )
+    lookup_time, lookup_table = best_time(
+            add_regulation_columns, table, args.repeats
+            )
+
+    if loop_table.columns.tolist() != lookup_table.columns.tolist() or not (
+            loop_table['Regulation'].astype(object).fillna('').equals(
+                lookup_table['Regulation'].astype(object).fillna('')
+                )
+            ):
+        sys.exit('\n** The Regulation columns differ **\n')
+
+    print(f'{args.rows} rows')
+    print(f'{"regulation":<12}{"wall s":>8}{"rows/s":>14}')
+    for name, wall_time in (('loop', loop_time), ('lookup', lookup_time)):
+        print(f'{name:<12}{wall_time:>8.3f}{args.rows / wall_time:>14.0f}')
+    print(f'the lookup is {loop_time / lookup_time:.0f}x faster')
+
+
+if __name__ == "__main__":
+    main()
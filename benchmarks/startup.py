@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+"""Startup benchmark of dgeapy.py subcommands.
+
+Times a batch of calls of a table-only subcommand (dropNaN-in-column on a
+small synthetic table) dispatched in a new Python interpreter each, as
+dgeapy.py used to run them, against the same calls run in-process through
+load_subcommand(). The work done by each call is tiny, so the difference is
+the cost of starting an interpreter and importing the dependencies.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, DGEAPY_PATH)
+
+# The table cache is left out, so every call parses its table.
+os.environ['DGEAPY_CACHE_DIR'] = ''
+
+COMMAND = 'dropNaN-in-column'
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def load_dispatcher():
+    """Imports dgeapy.py, which can't be imported by name since the dgeapy
+    package takes precedence.
+    """
+
+    spec = importlib.util.spec_from_file_location(
+            'dgeapy_dispatcher', f'{DGEAPY_PATH}/dgeapy.py'
+            )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def mk_table(file_path, rows):
+    """Writes a table of <rows> rows with missing values in its 'GO' column.
+    """
+
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+            'index' : [f'GENE_{i:06d}' for i in range(rows)],
+            'log2FoldChange' : rng.normal(size=rows),
+            'GO' : np.where(rng.random(rows) < 0.2, None, 'GO:0008150'),
+            }).to_csv(file_path, sep='\t', index=False)
+
+
+def time_calls(function, calls):
+    """Returns the wall time, in seconds, of each of <calls> calls of
+    <function>.
+    """
+
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    parser.add_argument(
+            '--calls',
+            metavar='INT',
+            type=int,
+            default=20,
+            help='calls of the subcommand in each mode, default is 20'
+            )
+    parser.add_argument(
+            '--rows',
+            metavar='INT',
+            type=int,
+            default=1000,
+            help='rows of the synthetic table, default is 1000'
+            )
+    args = parser.parse_args(argv)
+
+    dispatcher = load_dispatcher()
+    script = f'{DGEAPY_PATH}/{dispatcher.SUBCOMMANDS[COMMAND]}'
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        table_file = f'{tmp_dir}/table.tsv'
+        mk_table(table_file, args.rows)
+        command_args = ['-t', table_file, '-c', 'GO']
+
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            def run_subprocess():
+                subprocess.run(
+                        [sys.executable, script] + command_args,
+                        check=True,
+                        stdout=subprocess.DEVNULL,
+                        )
+
+            def run_in_process():
+                with contextlib.redirect_stdout(None):
+                    dispatcher.load_subcommand(COMMAND)(command_args)
+
+            # pandas is already imported in this process, as it is after
+            # the first call of a batch run in-process.
+            results = {
+                    'subprocess' : time_calls(run_subprocess, args.calls),
+                    'in-process' : time_calls(run_in_process, args.calls),
+                    }
+        finally:
+            os.chdir(cwd)
+
+    print(f'{COMMAND}, {args.rows} rows, {args.calls} calls')
+    print(f'{"dispatch":<12}{"total s":>10}{"mean ms":>10}{"min ms":>10}')
+    for mode, times in results.items():
+        print(
+                f'{mode:<12}{sum(times):>10.2f}{1000 * np.mean(times):>10.1f}' \
+                f'{1000 * min(times):>10.1f}'
+                )
+    speedup = sum(results['subprocess']) / sum(results['in-process'])
+    print(f'in-process dispatch is {speedup:.1f}x faster')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""Synthetic inputs shared by the benchmarks.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Relationships, on top of "is_a", of the synthetic GO terms.
+RELATIONSHIPS = [
+        'regulates',
+        'negatively_regulates',
+        'positively_regulates',
+        'part_of',
+        ]
+
+NAMESPACES = ['biological_process', 'molecular_function', 'cellular_component']
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def get_go_id(i):
+    return f'GO:{i:07d}'
+
+
+def mk_go_obo(file_path, n_terms, seed=0):
+    """Writes a go.obo file with <n_terms> terms. Terms GO:0000000 to
+    GO:0000002 are the roots, every other term "is_a" 1 or 2 earlier terms
+    and about a fifth of them have another relationship with an earlier
+    term. One in 50 terms is obsolete, replaced by the term
+    before it, and one in 40 has an alternative ID (its ID plus 9000000).
+    """
+
+    rng = np.random.default_rng(seed)
+    is_obsolete = np.arange(n_terms) % 50 == 49
+
+    lines = ['format-version: 1.2', 'data-version: synthetic', 'ontology: go', '']
+    for i in range(n_terms):
+        lines += [
+                '[Term]',
+                f'id: {get_go_id(i)}',
+                f'name: term {i}',
+                f'namespace: {NAMESPACES[i % 3]}',
+                ]
+        if i % 40 == 7:
+            lines.append(f'alt_id: {get_go_id(9000000 + i)}')
+
+        if is_obsolete[i]:
+            lines += ['is_obsolete: true', f'replaced_by: {get_go_id(i - 1)}']
+
+        elif i >= len(NAMESPACES):
+            # Parents are taken from the terms made before, a quarter of the
+            # terms have two of them, so that terms have a few tens of
+            # ancestors as in GO.
+            parents = {int(rng.integers(i // 3, i // 2 + 1))}
+            if rng.random() < 0.25:
+                parents.add(int(rng.integers(i // 3, i)))
+            for p in sorted(parents):
+                if not is_obsolete[p]:
+                    lines.append(f'is_a: {get_go_id(p)} ! term {p}')
+            if rng.random() < 0.2:
+                p = int(rng.integers(i // 3, i))
+                if not is_obsolete[p]:
+                    relationship = RELATIONSHIPS[rng.integers(len(RELATIONSHIPS))]
+                    lines.append(
+                            f'relationship: {relationship} {get_go_id(p)} ! term {p}'
+                            )
+        lines.append('')
+
+    with open(file_path, 'w') as f:
+        f.write('\n'.join(lines))
+
+
+def mk_go_table(file_path, n_rows, n_terms, seed=0):
+    """Writes an annotation table of <n_rows> genes ('Entry'), each with 0 to
+    6 GO codes of a go.obo file made by mk_go_obo() with <n_terms> terms
+    ('Gene Ontology IDs'), some of them alternative IDs, and KEGG pathways
+    ('kegg_pathways').
+    """
+
+    rng = np.random.default_rng(seed)
+    go_ids = np.array([get_go_id(i) for i in range(n_terms)])
+    pathways = np.array([f'ko{i:05d}' for i in range(0, 3000, 10)])
+
+    n_codes = rng.integers(0, 7, n_rows)
+    terms = rng.integers(0, n_terms, n_codes.sum())
+    codes = go_ids[terms]
+    # Half of the codes of terms with an alternative ID use it.
+    alt_ids = (terms % 40 == 7) & (rng.random(len(terms)) < 0.5)
+    codes[alt_ids] = [get_go_id(9000000 + i) for i in terms[alt_ids].tolist()]
+    codes = np.split(codes, np.cumsum(n_codes)[:-1])
+    n_pathways = rng.integers(0, 4, n_rows)
+    kegg = np.split(
+            pathways[rng.integers(0, len(pathways), n_pathways.sum())],
+            np.cumsum(n_pathways)[:-1],
+            )
+
+    pd.DataFrame({
+            'Entry' : [f'GENE_{i:07d}' for i in range(n_rows)],
+            'Gene Ontology IDs' : [
+                '; '.join(c) if len(c) else None for c in codes
+                ],
+            'kegg_pathways' : [';'.join(k) if len(k) else None for k in kegg],
+            }).to_csv(file_path, sep='\t', index=False)
+
+
+def mk_sample_table(file_path, n_genes, seed=0):
+    """Writes a multiplemuts sample table of <n_genes> genes, with missing
+    log2 fold changes and adjusted p-values and a few annotation columns.
+    """
+
+    rng = np.random.default_rng(seed)
+    ids = [f'GENE_{i:07d}' for i in range(n_genes)]
+    log2_fold_changes = rng.normal(0, 1.5, n_genes)
+    log2_fold_changes[rng.random(n_genes) < 0.02] = np.nan
+    padj = rng.random(n_genes) * 0.2
+    padj[rng.random(n_genes) < 0.03] = np.nan
+
+    pd.DataFrame({
+            'index' : ids,
+            'gene_id' : ids,
+            'log2FoldChange' : log2_fold_changes,
+            'pvalue' : padj / 2,
+            'padj' : padj,
+            'Description' : [f'protein {i}' for i in range(n_genes)],
+            'chr' : 'chr1',
+            'start' : rng.integers(1, 10**6, n_genes),
+            'GO' : [get_go_id(i % 5000) for i in range(n_genes)],
+            }).to_csv(file_path, sep='\t', index=False)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+"""Benchmark of multiplemuts --workbook.
+
+Runs multiplemuts on synthetic sample tables writing its XLSX tables as
+separate files, as the sheets of a single workbook (--workbook run) and as
+those of one workbook per directory of tables (--workbook category), and
+reports the wall time of each run and the number of XLSX and other files
+it wrote. The plots, which take most of the time, are drawn the same way in
+every run, so the time the XLSX tables take is given over that of a run
+writing only the TSV tables.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import importlib.util
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, DGEAPY_PATH)
+
+# The table cache is left out, so every run parses its tables.
+os.environ['DGEAPY_CACHE_DIR'] = ''
+
+from synthetic import mk_sample_table
+
+
+# Options of each of the runs compared.
+MODES = {
+        'tsv only' : [],
+        'files' : ['--outputs', 'tsv,xlsx'],
+        'run' : ['--workbook', 'run'],
+        'category' : ['--workbook', 'category'],
+        }
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def load_multiplemuts():
+    """Imports dgeapy_multiplemuts.py and returns its main function.
+    """
+
+    spec = importlib.util.spec_from_file_location(
+            'dgeapy_multiplemuts', f'{DGEAPY_PATH}/dgeapy_multiplemuts.py'
+            )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    return module.main
+
+
+def count_files(directory):
+    """Returns the number of XLSX files and of other files in <directory>.
+    """
+
+    n_xlsx = 0
+    n_other = 0
+    for _, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            if file_name.endswith('.xlsx'):
+                n_xlsx += 1
+            else:
+                n_other += 1
+
+    return n_xlsx, n_other
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    parser.add_argument(
+            '--samples',
+            metavar='INT',
+            type=int,
+            default=4,
+            help='number of sample tables, default is 4'
+            )
+    parser.add_argument(
+            '--genes',
+            metavar='INT',
+            type=int,
+            default=20000,
+            help='genes of each sample table, default is 20000'
+            )
+    parser.add_argument(
+            '--repeats',
+            metavar='INT',
+            type=int,
+            default=1,
+            help='best of this many runs of each mode, default is 1'
+            )
+    args = parser.parse_args(argv)
+
+    multiplemuts = load_multiplemuts()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = {}
+        for i in range(args.samples):
+            config[f'mut{i}'] = f'{tmp_dir}/mut{i}.tsv'
+            mk_sample_table(config[f'mut{i}'], args.genes, seed=i)
+        config_file = f'{tmp_dir}/config.json'
+        with open(config_file, 'w') as f:
+            f.write(json.dumps(config))
+
+        results = {}
+        for mode, options in MODES.items():
+            times = []
+            for repeat in range(args.repeats):
+                run_dir = f'{tmp_dir}/{mode.replace(" ", "_")}_{repeat}'
+                os.mkdir(run_dir)
+
+                cwd = os.getcwd()
+                os.chdir(run_dir)
+                try:
+                    start = time.perf_counter()
+                    with (
+                            contextlib.redirect_stdout(None),
+                            contextlib.redirect_stderr(None),
+                            ):
+                        multiplemuts([config_file] + options)
+                    times.append(time.perf_counter() - start)
+                finally:
+                    os.chdir(cwd)
+
+            results[mode] = (
+                    min(times),
+                    count_files(f'{run_dir}/dgeapy_multiplemuts_output/dataframes'),
+                    count_files(f'{run_dir}/dgeapy_multiplemuts_output'),
+                    )
+
+    print(f'{args.samples} samples of {args.genes} genes')
+    print(
+            f'{"xlsx":<10}{"wall s":>8}{"xlsx s":>8}{"table xlsx":>12}' \
+            f'{"table tsv":>11}{"all files":>11}'
+            )
+    tsv_time = results['tsv only'][0]
+    for mode, (wall_time, (n_xlsx, n_tsv), (n_all_xlsx, n_all_other)) in (
+            results.items()
+            ):
+        print(
+                f'{mode:<10}{wall_time:>8.2f}{wall_time - tsv_time:>8.2f}' \
+                f'{n_xlsx:>12}{n_tsv:>11}{n_all_xlsx + n_all_other:>11}'
+                )
+
+
+if __name__ == "__main__":
+    main()
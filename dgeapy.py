@@ -7,11 +7,46 @@ data at a different levels.
 
 import os
 import sys
-import subprocess
+import importlib.util
 
 from dgeapy.utilities import mkconfigs
 
 
+# Each subcommand is implemented by a script exposing a main(argv) function.
+SUBCOMMANDS = {
+        "multiplemuts" : "dgeapy_multiplemuts.py",
+        "annotate" : "dgeapy_annotate.py",
+        "assert-function" : "dgeapy_assert-function.py",
+        "dropNaN-in-column" : "dgeapy_dropNaN-in-column.py",
+        "go2ancestors" : "dgeapy_go2ancestors.py",
+        "joindfs" : "dgeapy_joindfs.py",
+        "mapgenes" : "dgeapy_mapgenes.py",
+        }
+
+
+def load_subcommand(cmd):
+    """Imports the script implementing <cmd> and returns its main function.
+    Subcommands run in the same interpreter, so pandas and the rest of the
+    dependencies are only imported once.
+    """
+
+    dgeapy_path = os.path.dirname(os.path.realpath(__file__))
+    script = SUBCOMMANDS[cmd]
+    module_name = script[:-len(".py")]
+
+    spec = importlib.util.spec_from_file_location(
+            module_name,
+            f"{dgeapy_path}/{script}",
+            )
+    module = importlib.util.module_from_spec(spec)
+    # Registered so that functions defined in the script can be pickled
+    # (e.g. when sent to a process pool).
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+
+    return module.main
+
+
 def main():
 
     description = """
@@ -23,6 +58,7 @@ usage: dgeapy.py <command> [options]
         multiplemuts        analyze a dataframe contaning 3 mutants
 
     utilities:
+        annotate            assign function to each gene directly from its GO codes, without an intermediate go2ancestors table.
         assert-function     assign function to each gene based on a preestablished list of GO codes and KEGG pathways to define each function.
         dropNaN-in-column   drop all NaN values in a specific column
         go2ancestors        obtain all of the GO ancestors from GO codes and store them in a new column
@@ -40,34 +76,15 @@ usage: dgeapy.py <command> [options]
 
     elif arg_len > 1:
         cmd = sys.argv[1]
-        dgeapy_path = os.path.dirname(os.path.realpath(__file__))
 
         if cmd == "-h" or cmd == "--help":
             print(description)
 
-        elif cmd == "multiplemuts":
-            subcmd = ["python", f"{dgeapy_path}/dgeapy_multiplemuts.py",] + sys.argv[2:]
-            subprocess.run(subcmd)
-
-        elif cmd == "assert-function":
-            subcmd = ["python", f"{dgeapy_path}/dgeapy_assert-function.py",] + sys.argv[2:]
-            subprocess.run(subcmd)
-
-        elif cmd == "dropNaN-in-column":
-            subcmd = ["python", f"{dgeapy_path}/dgeapy_dropNaN-in-column.py",] + sys.argv[2:]
-            subprocess.run(subcmd)
-
-        elif cmd == "go2ancestors":
-            subcmd = ["python", f"{dgeapy_path}/dgeapy_go2ancestors.py",] + sys.argv[2:]
-            subprocess.run(subcmd)
-
-        elif cmd == "joindfs":
-            subcmd = ["python", f"{dgeapy_path}/dgeapy_joindfs.py",] + sys.argv[2:]
-            subprocess.run(subcmd)
-
-        elif cmd == "mapgenes":
-            subcmd = ["python", f"{dgeapy_path}/dgeapy_mapgenes.py",] + sys.argv[2:]
-            subprocess.run(subcmd)
+        elif cmd in SUBCOMMANDS:
+            subcmd_main = load_subcommand(cmd)
+            # Errors of the subcommand (sys.exit() with a message, or an
+            # exception) exit with status 1, a finished subcommand with 0.
+            sys.exit(subcmd_main(sys.argv[2:]))
 
         elif cmd == "mkconfigs":
             mkconfigs()
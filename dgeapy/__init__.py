@@ -1,19 +1,66 @@
 #!/usr/bin/env python3
 
 from dgeapy.utilities import read_config_json_file
+from dgeapy.tables import read_table
+from dgeapy.tables import write_table
+from dgeapy.tables import add_output_arguments
+from dgeapy.tables import get_output_options
+from dgeapy.tables import close_output
+from dgeapy.tables import BackgroundWriter
+from dgeapy.tables import ConsolidatedWorkbooks
+from dgeapy.sample_tables import NON_CODING_PATTERNS
+from dgeapy.sample_tables import read_sample_table
+from dgeapy.sample_tables import join_annotation_columns
+from dgeapy.sample_tables import trim_annotation_columns
+from dgeapy.gene_dictionary import GeneDictionary
+from dgeapy.gene_dictionary import build_gene_dictionary
+from dgeapy.gene_dictionary import encode_samples
+from dgeapy.gene_dictionary import get_gene_codes
+from dgeapy.gene_dictionary import get_sorted_gene_codes
+from dgeapy.gene_dictionary import get_gene_ids
 from dgeapy.add_columns import add_fold_change_columns
 from dgeapy.add_columns import add_regulation_columns
 from dgeapy.filter_dataframe import get_column_names
 from dgeapy.filter_dataframe import filter_FC_PADJ
+from dgeapy.intersections import MAX_SETS
+from dgeapy.intersections import get_gene_ids_set_for_intersections
 from dgeapy.filter_dataframe import get_gene_ids_set_for_intersections2
 from dgeapy.filter_dataframe import get_gene_ids_set_for_intersections3
 from dgeapy.filter_dataframe import get_gene_ids_set_for_intersections4
 # from dgeapy.filter_dataframe import mk_df_for_each_intersection3
-from dgeapy.venn_diagrams import generate_venn2_diagram_with_regulation_labels
-from dgeapy.venn_diagrams import generate_venn3_diagram_with_regulation_labels
-from dgeapy.venn_diagrams import generate_venn4_diagram_with_regulation_labels
+from dgeapy.filter_dataframe import IntersectionsTable
+from dgeapy.filter_dataframe import mk_intersections_table
+from dgeapy.filter_dataframe import mk_df_for_each_intersection
+from dgeapy.filter_dataframe import mk_df_for_each_code
 from dgeapy.filter_dataframe import mk_venn_upset_and_intersections_dfs
 from dgeapy.filter_dataframe import get_inverted_regulations_and_mk_venns_and_dataframes
-from dgeapy.volcanos import generate_volcano_plot
-from dgeapy.sankey_diagrams import generate_sankey_diagram
 
+
+# Plotting functions depend on matplotlib, seaborn, matplotlib-venn, pyvenn,
+# UpSetPlot and pySankey. Their modules are only imported the first time one
+# of them is accessed, so table-only commands never pay for the plotting stack.
+_LAZY_FUNCTIONS = {
+        "generate_venn2_diagram_with_regulation_labels" : "venn_diagrams",
+        "generate_venn3_diagram_with_regulation_labels" : "venn_diagrams",
+        "generate_venn4_diagram_with_regulation_labels" : "venn_diagrams",
+        "generate_volcano_plot" : "volcanos",
+        "generate_sankey_diagram" : "sankey_diagrams",
+        "generate_venn_diagram" : "venn_diagrams",
+        "generate_upset_plot_from_codes" : "upset_plots",
+        }
+
+
+def __getattr__(name):
+    import importlib
+
+    if name in _LAZY_FUNCTIONS:
+        module = importlib.import_module(f"dgeapy.{_LAZY_FUNCTIONS[name]}")
+        function = getattr(module, name)
+        globals()[name] = function
+
+        return function
+
+    if name in ("venn_diagrams", "volcanos", "upset_plots", "sankey_diagrams"):
+        return importlib.import_module(f"dgeapy.{name}")
+
+    raise AttributeError(f"module 'dgeapy' has no attribute '{name}'")
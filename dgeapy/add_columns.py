@@ -9,9 +9,35 @@ Functions that add columns to a pandas DGE dataframe.
 """
 
 
+# Values of the "Regulation" columns.
+REGULATION_CATEGORIES = ["Up", "Down", "Unchanged"]
+REGULATION_DTYPE = pd.CategoricalDtype(REGULATION_CATEGORIES)
+
+
 #-------# Function Definitions #-----------------------------------------------#
 
 
+def get_new_column_name(column_names, log2FoldChange_column_name, name):
+    """
+    Returns the name of the <name> column ("FoldChange", "Regulation"...)
+    added for a "log2 Fold Change" column. It's just <name> if the table
+    has a single "log2 Fold Change" column and, in multi-contrast tables,
+    the name of the "log2 Fold Change" column with <name> instead of
+    "log2FoldChange".
+    """
+
+    log2FoldChange_columns = [
+            column for column in column_names
+            if "log2FoldChange" in column or 'log2foldchange' in column
+            ]
+    if len(log2FoldChange_columns) == 1:
+        return name
+
+    return log2FoldChange_column_name.replace(
+            "log2FoldChange", name,
+            ).replace("log2foldchange", name)
+
+
 def add_fold_change_columns(dataframe):
     """
     Adds a "Fold Change" column to the dataframe for each
@@ -47,10 +73,11 @@ def add_fold_change_columns(dataframe):
                     )
             # Creating the new column name just by replacing "log2FoldChange".
             # from the previous column with "FoldChange".
-            new_column_name = log2FoldChange_column_name.replace(
-                column_names[index_num],
-                "FoldChange",
-                )
+            new_column_name = get_new_column_name(
+                    column_names,
+                    log2FoldChange_column_name,
+                    "FoldChange",
+                    )
             # Inserting the new column into the dataframe.
             dataframe.insert(
                     # Location where new_colmn will be inserted.
@@ -72,71 +99,74 @@ def add_regulation_columns(dataframe):
     """
     Adds a "Regulation" column to the dataframe after each  "Fold Change" one.
     A gene is considered as up-regulated if the "log2 Fold Change" value 
-    is positive, and down-regulated if the value is negative. 
+    is positive, and down-regulated if the value is negative. Regulations
+    are stored as categoricals of REGULATION_DTYPE, with NaN where the
+    "log2 Fold Change" value is missing.
     """
 
     # We get the column names.
     column_names = dataframe.columns.values.tolist()
-    # We set an accumulator so we can keep track of the column names we've
-    # been adding.
-    accumulator = 2
 
     if 'Regulation' in column_names:
         return None
 
-    # Iterate trough the column names using the index numbers.
-    for index_num  in range(len(column_names)):
-        # If "log2FoldChange" is present in the name of the column:
-        if "log2FoldChange" in column_names[index_num] or 'log2foldchange' in column_names[index_num]:
+    # Positions of every "log2FoldChange" column.
+    log2FoldChange_positions = [
+            index_num for index_num in range(len(column_names))
+            if "log2FoldChange" in column_names[index_num]
+            or 'log2foldchange' in column_names[index_num]
+            ]
+    if not log2FoldChange_positions:
+        return None
 
-            # Saving the column name as a variable.
-            log2FoldChange_column_name = str(column_names[index_num])
+    # The regulations of all of the "log2FoldChange" columns are computed
+    # at once, on a single array with a column for each of them: the sign
+    # of each value (+1 so it's 0, 1 or 2, and 3 for NaN) is the position of
+    # its regulation code in this lookup table. NaN values have no
+    # regulation (code -1).
+    regulation_lookup = np.array(
+            [
+                REGULATION_CATEGORIES.index("Down"),
+                REGULATION_CATEGORIES.index("Unchanged"),
+                REGULATION_CATEGORIES.index("Up"),
+                -1,
+                ],
+            dtype=np.int8,
+            )
+    signs = np.sign(dataframe.iloc[:, log2FoldChange_positions].to_numpy(
+            dtype='float64',
+            na_value=np.nan,
+            )) + 1
+    signs[np.isnan(signs)] = 3
+    regulation_codes = regulation_lookup[signs.astype(np.intp)]
 
-            # Creating the new column name just by replacing "log2FoldChange"
-            # from the previous column with "Regulation".
-            new_column_name = log2FoldChange_column_name.replace(
+    # We set an accumulator so we can keep track of the column names we've
+    # been adding.
+    accumulator = 2
+
+    for i, index_num in enumerate(log2FoldChange_positions):
+
+        new_column_name = get_new_column_name(
+                column_names,
                 column_names[index_num],
                 "Regulation",
                 )
 
-            # new_column values are the result of checking if each value form
-            # "log2 Fold Change" is positive or negative (greater or less 
-            # then zero). We'll fill this list with a for loop.
-            new_column_values = []
-
-            # For each value in the "log2FoldChange" column:
-            for value in dataframe[log2FoldChange_column_name]:
-                # If value is greater than zero, add "Up".
-                if value > 0:
-                    new_column_values.append("Up")
-                # If value is less than zero, add "Down".
-                elif value < 0:
-                    new_column_values.append("Down")
-                # If value is equal to zero, add "Unchanged"
-                elif value == 0:
-                    new_column_values.append("Unchanged")
-                # In any other situation, add "--"
-                else:
-                    new_column_values.append(np.nan)
-
-            dataframe.insert(
-                    # Location where new_colmn will be inserted.
-                    loc=(index_num + accumulator),
-                    # Columb name
-                    column=new_column_name,
-                    # Values it will contain
-                    value=new_column_values,
-                    )
-
-            # Specifiying the new column type as "string".
-            dataframe[new_column_name] = dataframe[new_column_name].astype(
-                    "string"
-                    )
-
-            # Add +1 to the accumulator because we added one more column
-            # to the dataframe. By doing it so, the next "Regulation" column
-            # will be placed after two positions of the corresponding
-            # "log2FoldChange" column.
-            accumulator += 1
-
+        dataframe.insert(
+                # Location where new_colmn will be inserted, or the end if
+                # the table has no "Fold Change" columns.
+                loc=min(index_num + accumulator, len(dataframe.columns)),
+                # Columb name
+                column=new_column_name,
+                # Values it will contain
+                value=pd.Categorical.from_codes(
+                    regulation_codes[:, i],
+                    dtype=REGULATION_DTYPE,
+                    ),
+                )
 
+        # Add +1 to the accumulator because we added one more column
+        # to the dataframe. By doing it so, the next "Regulation" column
+        # will be placed after two positions of the corresponding
+        # "log2FoldChange" column.
+        accumulator += 1
@@ -7,10 +7,67 @@ import pdb
 
 import os
 
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
-from .venn_diagrams import generate_venn2_diagram, generate_venn3_diagram, generate_venn4_diagram
-from .upset_plots import generate_upset_plot
+from dgeapy.tables import write_table
+from dgeapy.gene_dictionary import GeneDictionary
+from dgeapy.gene_dictionary import encode_samples
+from dgeapy.gene_dictionary import get_gene_codes
+from dgeapy.gene_dictionary import get_sorted_gene_codes
+from dgeapy.intersections import get_gene_ids_set_for_intersections
+from dgeapy.intersections import get_membership_codes
+from dgeapy.intersections import group_by_code
+from dgeapy.intersections import key_to_code
+from dgeapy.intersections import code_to_key
+from dgeapy.intersections import sort_intersection_keys
+
+
+# Keys of the intersections of 2, 3 and 4 sets, in the order their
+# dataframes have always been written. Every one of them is written, even
+# if empty.
+INTERSECTION_KEYS = {
+        2 : ["10", "01", "11"],
+        3 : ["100", "010", "001", "110", "101", "011", "111"],
+        4 : [
+            "0001", "0010", "0100", "1000",
+            "0011", "0101", "1001", "0110", "1010", "1100",
+            "0111", "1011", "1101", "1110",
+            "1111",
+            ],
+        }
+
+# Gene categories whose intersections are computed: name of their
+# directories and files, attribute of each sample with the codes of their
+# gene IDs (see encode_samples()) and title of their plots.
+GENE_CATEGORIES = [
+        ('DEG', 'dge_codes', 'Differentially expressed genes'),
+        ('UP', 'up_codes', 'Upregulated genes'),
+        ('DOWN', 'down_codes', 'Downregulated genes'),
+        ]
+
+
+@dataclass
+class IntersectionsTable:
+    """DEG dataframes of all the samples joined on their gene IDs, with the
+    columns of each sample prefixed by its name. sample_columns has the
+    columns of each sample, columns all of them in the order they are
+    written, and dtypes those they had before the join, which turns the
+    integer columns of the genes missing in a sample into floats.
+    rows_by_code has the row of each code of gene_dictionary, or -1.
+    """
+    df: pd.DataFrame
+    sample_columns: list
+    columns: list
+    dtypes: dict
+    gene_dictionary: GeneDictionary
+    rows_by_code: np.ndarray
+
+
+#-------# Function definitions #-----------------------------------------------#
+
 
 
 def generate_sub_dataframes_3muts(
@@ -137,22 +194,10 @@ def get_gene_ids_set_for_intersections2(
         - Second bit equals to the second set.
     """
 
-    intersections_dict = {
-            "10" : set(),
-            "01" : set(),
-            "11" : set()
-            }
-    for gene in set1:
-        if gene in set2:
-            intersections_dict["11"].add(gene)
-        elif gene not in set2:
-            intersections_dict["10"].add(gene)
-
-    for gene in set2:
-        if gene not in set1:
-            intersections_dict["01"].add(gene)
-
-    return intersections_dict
+    return get_gene_ids_set_for_intersections(
+            [set1, set2],
+            keys=INTERSECTION_KEYS[2],
+            )
 
 
 def get_gene_ids_set_for_intersections3(
@@ -168,36 +213,10 @@ def get_gene_ids_set_for_intersections3(
         - Third bit equals to the third set.
     """
 
-    intersections_dict = {
-            "100" : set(),
-            "010" : set(),
-            "001" : set(),
-            "110" : set(),
-            "101" : set(),
-            "011" : set(),
-            "111" : set()
-            }
-    for gene in set1:
-        if gene in set2 and gene in set3:
-            intersections_dict["111"].add(gene)
-        elif gene in set2 and gene not in set3:
-            intersections_dict["110"].add(gene)
-        elif gene not in set2 and gene in set3:
-            intersections_dict["101"].add(gene)
-        elif gene not in set2 and gene not in set3:
-            intersections_dict["100"].add(gene)
-
-    for gene in set2:
-        if gene not in set1 and gene in set3:
-            intersections_dict["011"].add(gene)
-        elif gene not in set1 and gene not in set3:
-            intersections_dict["010"].add(gene)
-
-    for gene in set3:
-        if gene not in set1 and gene not in set2:
-            intersections_dict["001"].add(gene)
-
-    return intersections_dict
+    return get_gene_ids_set_for_intersections(
+            [set1, set2, set3],
+            keys=INTERSECTION_KEYS[3],
+            )
 
 
 def get_gene_ids_set_for_intersections4(set1, set2, set3, set4):
@@ -210,72 +229,19 @@ def get_gene_ids_set_for_intersections4(set1, set2, set3, set4):
         - Third bit equals to the third set.
         - Fourth bit equals to the fourth set.
     """
-    intersections_dict = {
-        "0001": set(),
-        "0010": set(),
-        "0100": set(),
-        "1000": set(),
-        "0011": set(),
-        "0101": set(),
-        "1001": set(),
-        "0110": set(),
-        "1010": set(),
-        "1100": set(),
-        "0111": set(),
-        "1011": set(),
-        "1101": set(),
-        "1110": set(),
-        "1111": set(),
-    }
-
-    for gene in set1:
-        if gene in set2 and gene in set3 and gene in set4:
-            intersections_dict["1111"].add(gene)
-        elif gene in set2 and gene in set3 and gene not in set4:
-            intersections_dict["1110"].add(gene)
-        elif gene in set2 and gene not in set3 and gene in set4:
-            intersections_dict["1101"].add(gene)
-        elif gene in set2 and gene not in set3 and gene not in set4:
-            intersections_dict["1100"].add(gene)
-        elif gene not in set2 and gene in set3 and gene in set4:
-            intersections_dict["1011"].add(gene)
-        elif gene not in set2 and gene in set3 and gene not in set4:
-            intersections_dict["1010"].add(gene)
-        elif gene not in set2 and gene not in set3 and gene in set4:
-            intersections_dict["1001"].add(gene)
-        else:
-            intersections_dict["1000"].add(gene)
-
-    for gene in set2:
-        if gene not in set1 and gene in set3 and gene in set4:
-            intersections_dict['0111'].add(gene)
-        elif gene not in set1 and gene in set3 and gene not in set4:
-            intersections_dict['0110'].add(gene)
-        elif gene not in set1 and gene not in set3 and gene in set4:
-            intersections_dict['0101'].add(gene)
-        elif gene not in set1 and gene not in set3 and gene not in set4:
-            intersections_dict['0100'].add(gene)
-
-    for gene in set3:
-        if gene not in set1 and gene not in set2 and gene in set4:
-            intersections_dict['0011'].add(gene)
-        elif gene not in set1 and gene not in set2 and gene not in set4:
-            intersections_dict['0010'].add(gene)
-
-    for gene in set4:
-        if gene not in set1 and gene not in set2 and gene not in set3:
-            intersections_dict['0001'].add(gene)
 
-    return intersections_dict
+    return get_gene_ids_set_for_intersections(
+            [set1, set2, set3, set4],
+            keys=INTERSECTION_KEYS[4],
+            )
 
 
-def sort_df(df):
-    """Takes a df generated in mk_df_for_each_intersection() and sorts the
-    columns. Rows are sorted taking the first foldchange column values.
+def get_sorted_columns(column_names):
+    """Sorts the column names of a df generated in
+    mk_df_for_each_intersection() for a cleaner visualization. Returns them
+    and the foldchange column names, in the same order.
     """
 
-    column_names = df.columns.values.tolist()
-
     # Column names can be classified into this 7 lists.
     gene_id = []
     log2FC = []
@@ -334,100 +300,211 @@ def sort_df(df):
             + go_annotations
             )
 
-    df = df[new_colums_names]
-    try:
-        df = df.sort_values(
-                    fc[0],
-                    ascending=False,
-                    )
+    return new_colums_names, fc
 
-        return df
 
-    except:
+def sort_df(df):
+    """Takes a df generated in mk_df_for_each_intersection() and sorts the
+    columns. Rows are sorted taking the first foldchange column values.
+    """
+
+    new_colums_names, fc = get_sorted_columns(df.columns.values.tolist())
+
+    df = df[new_colums_names]
+    if not fc:
         return df
 
+    return df.sort_values(fc[0], ascending=False, kind='stable')
 
-def mk_df_for_each_intersection2(
-        mutant1_gene_set,
-        mutant1_name,
-        mutant2_gene_set,
-        mutant2_name,
+
+def mk_intersections_table(data, gene_dictionary=None):
+    """Joins the DEG dataframe of every sample, with all of its columns
+    prefixed by the sample name, into a single IntersectionsTable. Each
+    sample's annotation columns are only joined once, for every intersection
+    of every gene category. The samples must have been encoded (see
+    encode_samples()) with <gene_dictionary>, they are encoded with a new
+    one if it's not given.
+    """
+
+    if gene_dictionary is None:
+        gene_dictionary = encode_samples(data)
+
+    # Only the analysis columns are loaded for each sample, the rest are
+    # joined back here. Deferred to avoid a circular import.
+    from .sample_tables import join_annotation_columns
+
+    sample_dfs = []
+    sample_columns = []
+    for d in data:
+        columns = list(d.df_columns.keys())
+        columns.remove('index')
+        sample_df = join_annotation_columns(d, d.dge_df)[columns]
+        sample_df = sample_df.rename(columns={
+                col : f'{d.name}_{col}' for col in columns
+                })
+        sample_dfs.append(sample_df)
+        sample_columns.append(sample_df.columns.values.tolist())
+
+    df = pd.concat(sample_dfs, axis=1, join='outer')
+    df.index.name = 'index'
+
+    # Column order and dtypes of the intersection dataframes.
+    columns, _ = get_sorted_columns(df.columns.values.tolist())
+    dtypes = {
+            col : dtype
+            for sample_df in sample_dfs
+            for col, dtype in sample_df.dtypes.items()
+            }
+
+    rows_by_code = np.full(len(gene_dictionary.gene_ids), -1, dtype=np.int64)
+    row_codes = get_gene_codes(gene_dictionary, df.index)
+    rows_by_code[row_codes[row_codes >= 0]] = np.flatnonzero(row_codes >= 0)
+
+    return IntersectionsTable(
+            df=df,
+            sample_columns=sample_columns,
+            columns=columns,
+            dtypes=dtypes,
+            gene_dictionary=gene_dictionary,
+            rows_by_code=rows_by_code,
+            )
+
+
+def mk_df_for_each_intersection(
+        gene_sets,
         data,
         path,
         file_names,
+        keys=None,
+        output=None,
+        intersections_table=None,
         ):
-    """Takes 2 sets of gene IDs and computes the 3 possible intersections
-    Creates a dataframe for each intersection that will display all of the
-    relevant information for each gene.
+    """Takes a list of sets of gene IDs, one for each sample in <data>, and
+    writes a dataframe for each one of their intersections that will display
+    all of the relevant information for each gene. See
+    mk_df_for_each_code().
     """
 
-    # Storing output files in here
-    os.mkdir(f"{path}/{file_names}")
+    if intersections_table is None:
+        intersections_table = mk_intersections_table(data)
+    gene_dictionary = intersections_table.gene_dictionary
 
-    # Generate a dictionary contaning all of the gene IDs intersections.
-    intersections_dict = get_gene_ids_set_for_intersections2(
-            set1=mutant1_gene_set,
-            set2=mutant2_gene_set,
+    genes, codes = get_membership_codes(
+            [get_sorted_gene_codes(gene_dictionary, s) for s in gene_sets],
+            n_genes=len(gene_dictionary.gene_ids),
             )
 
-    # Columns that the generated dataframes will contain.
-    columns = [
-            'log2FoldChange',
-            'FoldChange',
-            'padj',
-            'pvalue',
-            'Regulation',
-            'Description',
-            ]
+    mk_df_for_each_code(
+            genes,
+            codes,
+            data,
+            path,
+            file_names,
+            keys=keys,
+            output=output,
+            intersections_table=intersections_table,
+            )
 
-    mutant1_df = data[0].dge_df[columns]
-    mutant2_df = data[1].dge_df[columns]
-    for col in columns:
-        mutant1_df = mutant1_df.rename(columns={col : f'{data[0].name}_{col}'})
-        mutant2_df = mutant2_df.rename(columns={col : f'{data[1].name}_{col}'})
-
-    # For each one of the intersections
-    for key in intersections_dict:
-
-        # Making a dataframe containing only the gene IDs presents
-        # In that intersection. Also setting the gene IDs as index.
-        df = pd.DataFrame(data={'geneID' : list(intersections_dict[key])})
-        df = df.set_index('geneID')
-
-        # If first bit is 1, there're gene IDs from the 1st mutant DE genes
-        # that are present in that intersection. So we take the
-        # 1st mutant DE genes dataframe and we add all of the columns
-        # showed above for ONLY the gene IDs that are already present
-        # in the previosly created df.
-        if key[0] == str(1):
-            df = pd.merge(
-                    df,
-                    mutant1_df,
-                    on='geneID',
-                    )
 
-        # The second bit being 1 means there're gene IDs form the 2nd mutant
-        # DE genes present in that intersection. We do the same as above.
-        if key[1] == str(1):
-            df= pd.merge(
-                    df,
-                    mutant2_df,
-                    on='geneID',
-                    )
+def mk_df_for_each_code(
+        genes,
+        codes,
+        data,
+        path,
+        file_names,
+        keys=None,
+        output=None,
+        intersections_table=None,
+        ):
+    """Takes the codes of gene IDs in the gene_dictionary of
+    <intersections_table> and their membership codes (as given by
+    get_membership_codes()) to sets of gene IDs of each sample in <data>,
+    and writes a dataframe for each intersection in <keys> that will display
+    all of the relevant information for each gene. By default, those are
+    the INTERSECTION_KEYS of 2 to 4 samples and, for more samples, the
+    non-empty intersections only. Genes are grouped by membership code in a
+    single pass over the rows of <intersections_table>, which is made from
+    <data> if not given.
+    """
 
+    # Storing output files in here
+    os.mkdir(f"{path}/{file_names}")
 
-        # We sort the columns for a cleaner visualization
-        df = sort_df(df)
+    if intersections_table is None:
+        intersections_table = mk_intersections_table(data)
+    df = intersections_table.df
+
+    # Membership code of each row. Genes in none of the sets are left with
+    # code 0, as are those not differentially expressed in their samples.
+    rows = intersections_table.rows_by_code[genes]
+    row_codes = np.zeros(len(df), dtype=np.uint64)
+    row_codes[rows[rows >= 0]] = codes[rows >= 0]
+
+    distinct_codes, positions = group_by_code(row_codes)
+    code_positions = dict(zip(distinct_codes.tolist(), positions))
+
+    if keys is None:
+        keys = INTERSECTION_KEYS.get(len(data))
+    if keys is None:
+        keys = sort_intersection_keys([
+                code_to_key(code, len(data)) for code in code_positions if code
+                ])
+
+    for key in keys:
+        code = key_to_code(key)
+
+        # Columns of the samples in the intersection, in the sorted order.
+        key_columns = {
+                col
+                for bit, columns in zip(key, intersections_table.sample_columns)
+                if bit == '1'
+                for col in columns
+                }
+        columns = [c for c in intersections_table.columns if c in key_columns]
 
-        df.to_csv(
-                f"{path}/{file_names}/{file_names}_{key}.tsv",
-                )
+        key_df = df.iloc[code_positions.get(code, [])][columns]
+        # Every column in the intersection has a value for all of its genes,
+        # so they get their dtypes before the join back.
+        key_df = key_df.astype({
+                col : intersections_table.dtypes[col] for col in columns
+                if key_df[col].dtype != intersections_table.dtypes[col]
+                })
 
-        df.to_excel(
-                f"{path}/{file_names}/{file_names}_{key}.xlsx",
+        write_table(
+                sort_df(key_df),
+                f"{path}/{file_names}/{file_names}_{key}",
+                output,
+                sep=",",
                 )
 
 
+def mk_df_for_each_intersection2(
+        mutant1_gene_set,
+        mutant1_name,
+        mutant2_gene_set,
+        mutant2_name,
+        data,
+        path,
+        file_names,
+        output=None,
+        intersections_table=None,
+        ):
+    """Takes 2 sets of gene IDs and computes the 3 possible intersections
+    Creates a dataframe for each intersection that will display all of the
+    relevant information for each gene.
+    """
+
+    mk_df_for_each_intersection(
+            [mutant1_gene_set, mutant2_gene_set],
+            data,
+            path,
+            file_names,
+            keys=INTERSECTION_KEYS[2],
+            output=output,
+            intersections_table=intersections_table,
+            )
+
+
 def mk_df_for_each_intersection3(
         mutant1_gene_set,
         mutant1_name,
@@ -438,89 +515,24 @@ def mk_df_for_each_intersection3(
         data,
         path,
         file_names,
+        output=None,
+        intersections_table=None,
         ):
     """Takes 3 sets of gene IDs and computes the 7 possible intersections
     Creates a dataframe for each intersection that will display all of the
     relevant information for each gene.
     """
 
-    # Storing output files in here
-    os.mkdir(f"{path}/{file_names}")
-
-    # Generate a dictionary contaning all of the gene IDs intersections.
-    intersections_dict = get_gene_ids_set_for_intersections3(
-            set1=mutant1_gene_set,
-            set2=mutant2_gene_set,
-            set3=mutant3_gene_set,
+    mk_df_for_each_intersection(
+            [mutant1_gene_set, mutant2_gene_set, mutant3_gene_set],
+            data,
+            path,
+            file_names,
+            keys=INTERSECTION_KEYS[3],
+            output=output,
+            intersections_table=intersections_table,
             )
 
-    # Columns that the generated dataframes will contain.
-    columns1 = list(data[0].df_columns.keys())
-    columns1.remove('index')
-    columns2 = list(data[1].df_columns.keys())
-    columns2.remove('index')
-    columns3 = list(data[2].df_columns.keys())
-    columns3.remove('index')
-
-    mutant1_df = data[0].dge_df[columns1]
-    mutant2_df = data[1].dge_df[columns2]
-    mutant3_df = data[2].dge_df[columns3]
-    for col in columns1:
-        mutant1_df = mutant1_df.rename(columns={col : f'{data[0].name}_{col}'})
-    for col in columns2:
-        mutant2_df = mutant2_df.rename(columns={col : f'{data[1].name}_{col}'})
-    for col in columns3:
-        mutant3_df = mutant3_df.rename(columns={col : f'{data[2].name}_{col}'})
-
-    # For each one of the intersections
-    for key in intersections_dict:
-
-        # Making a dataframe containing only the gene IDs presents
-        # In that intersection. Also setting the gene IDs as index.
-        df = pd.DataFrame(data={"index" : list(intersections_dict[key])})
-        df = df.set_index("index")
-
-        # If first bit is 1, there're gene IDs from the 1st mutant DE genes
-        # that are present in that intersection. So we take the
-        # 1st mutant DE genes dataframe and we add all of the columns
-        # showed above for ONLY the gene IDs that are already present
-        # in the previosly created df.
-        if key[0] == str(1):
-            df = pd.merge(
-                    df,
-                    mutant1_df,
-                    on="index",
-                    )
-
-        # The second bit being 1 means there're gene IDs form the 2nd mutant
-        # DE genes present in that intersection. We do the same as above.
-        if key[1] == str(1):
-            df = pd.merge(
-                    df,
-                    mutant2_df,
-                    on="index",
-                    )
-
-        # The third bit being 1 means there're gene IDs form the 3rd mutant
-        # DE genes present in that intersection. We do the same as before.
-        if key[2] == str(1):
-            df = pd.merge(
-                    df,
-                    mutant3_df,
-                    on="index",
-                    )
-
-        # We sort the columns for a cleaner visualization
-        df = sort_df(df)
-
-        df.to_csv(
-                f"{path}/{file_names}/{file_names}_{key}.tsv",
-                )
-
-        df.to_excel(
-                f"{path}/{file_names}/{file_names}_{key}.xlsx",
-                )
-
 
 def mk_df_for_each_intersection4(
         mutant1_gene_set,
@@ -534,103 +546,87 @@ def mk_df_for_each_intersection4(
         data,
         path,
         file_names,
+        output=None,
+        intersections_table=None,
         ):
     """Takes 4 sets of gene IDs and computes the 16 possible intersections
     Creates a dataframe for each intersection that will display all of the
     relevant information for each gene.
     """
 
-    # Storing output files in here
-    os.mkdir(f"{path}/{file_names}")
-
-    # Generate a dictionary contaning all of the gene IDs intersections.
-    intersections_dict = get_gene_ids_set_for_intersections4(
-            set1=mutant1_gene_set,
-            set2=mutant2_gene_set,
-            set3=mutant3_gene_set,
-            set4=mutant4_gene_set,
+    mk_df_for_each_intersection(
+            [
+                mutant1_gene_set,
+                mutant2_gene_set,
+                mutant3_gene_set,
+                mutant4_gene_set,
+                ],
+            data,
+            path,
+            file_names,
+            keys=INTERSECTION_KEYS[4],
+            output=output,
+            intersections_table=intersections_table,
             )
 
-    # Columns that the generated dataframes will contain.
-    columns1 = list(data[0].df_columns.keys())
-    columns1.remove('index')
-    columns2 = list(data[1].df_columns.keys())
-    columns2.remove('index')
-    columns3 = list(data[2].df_columns.keys())
-    columns3.remove('index')
-    columns4 = list(data[3].df_columns.keys())
-    columns4.remove('index')
-
-    mutant1_df = data[0].dge_df[columns1]
-    mutant2_df = data[1].dge_df[columns2]
-    mutant3_df = data[2].dge_df[columns3]
-    mutant4_df = data[3].dge_df[columns4]
-    for col in columns1:
-        mutant1_df = mutant1_df.rename(columns={col : f'{data[0].name}_{col}'})
-    for col in columns2:
-        mutant2_df = mutant2_df.rename(columns={col : f'{data[1].name}_{col}'})
-    for col in columns3:
-        mutant3_df = mutant3_df.rename(columns={col : f'{data[2].name}_{col}'})
-    for col in columns4:
-        mutant4_df = mutant4_df.rename(columns={col : f'{data[3].name}_{col}'})
-
-    # For each one of the intersections
-    for key in intersections_dict:
-
-        # Making a dataframe containing only the gene IDs presents
-        # In that intersection. Also setting the gene IDs as index.
-        df = pd.DataFrame(data={"index" : list(intersections_dict[key])})
-        df = df.set_index("index")
-
-        # If first bit is 1, there're gene IDs from the 1st mutant DE genes
-        # that are present in that intersection. So we take the
-        # 1st mutant DE genes dataframe and we add all of the columns
-        # showed above for ONLY the gene IDs that are already present
-        # in the previosly created df.
-        if key[0] == str(1):
-            df = pd.merge(
-                    df,
-                    mutant1_df,
-                    on="index",
-                    )
 
-        # The second bit being 1 means there're gene IDs form the 2nd mutant
-        # DE genes present in that intersection. We do the same as above.
-        if key[1] == str(1):
-            df= pd.merge(
-                    df,
-                    mutant2_df,
-                    on="index",
-                    )
-
-        # The third bit being 1 means there're gene IDs form the 3rd mutant
-        # DE genes present in that intersection. We do the same as before.
-        if key[2] == str(1):
-            df = pd.merge(
-                    df,
-                    mutant3_df,
-                    on="index",
-                    )
+def mk_venn_upset_and_intersection_dfs(
+        gene_sets,
+        names,
+        data,
+        plot_formats,
+        title,
+        venn_file,
+        upset_file,
+        df_path,
+        file_names,
+        output=None,
+        intersections_table=None,
+        ):
+    """Takes the sorted codes of a set of gene IDs for each sample in <data>
+    (see encode_samples()) and the names they are displayed with. Computes
+    their membership codes once and generates from them the venn diagrams
+    (if there are no more sets than MAX_VENN_SETS), the upset plot and a
+    dataframe for each intersection.
+    """
 
-        # The fourth bit being 1 means there're gene IDs form the 4th mutant
-        # DE genes present in that intersection. We do the same as before.
-        if key[3] == str(1):
-            df = pd.merge(
-                    df,
-                    mutant4_df,
-                    on="index",
-                    )
+    # Deferred so that importing dgeapy does not load the plotting stack.
+    from .venn_diagrams import MAX_VENN_SETS, generate_venn_diagram
+    from .upset_plots import generate_upset_plot_from_codes
 
-        # We sort the columns for a cleaner visualization
-        df = sort_df(df)
+    if intersections_table is None:
+        intersections_table = mk_intersections_table(data)
 
-        df.to_csv(
-                f"{path}/{file_names}/{file_names}_{key}.tsv",
-                )
+    genes, codes = get_membership_codes(
+            gene_sets,
+            n_genes=len(intersections_table.gene_dictionary.gene_ids),
+            )
 
-        df.to_excel(
-                f"{path}/{file_names}/{file_names}_{key}.xlsx",
-                )
+    if len(gene_sets) <= MAX_VENN_SETS:
+        generate_venn_diagram(
+                gene_sets=[set(s.tolist()) for s in gene_sets],
+                names=names,
+                plot_formats=plot_formats,
+                title=title,
+                path=venn_file,
+                )
+    generate_upset_plot_from_codes(
+            genes=genes,
+            codes=codes,
+            names=names,
+            plot_formats=plot_formats,
+            title=title,
+            path=upset_file,
+            )
+    mk_df_for_each_code(
+            genes=genes,
+            codes=codes,
+            data=data,
+            path=df_path,
+            file_names=file_names,
+            output=output,
+            intersections_table=intersections_table,
+            )
 
 
 def mk_venn_upset_and_intersections_dfs(
@@ -639,331 +635,34 @@ def mk_venn_upset_and_intersections_dfs(
         venn_path,
         upset_path,
         df_path,
+        output=None,
+        intersections_table=None,
         ):
-    """Takes 3 sets of gene IDs and the respective mutant name and generates
-    the correspoding venn diagrams, upset plots and a dataframe for each
-    one of the 7 intersections.
+    """Takes the samples in <data> and, for each one of the GENE_CATEGORIES
+    (DEG, UP and DOWN regulated genes), generates the correspoding venn
+    diagrams, upset plot and a dataframe for each one of the intersections.
     """
 
-    if len(data) == 2:
-
-        # Differentially expressed genes
-        generate_venn2_diagram(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                plot_formats=plot_formats,
-                title='Differentially expressed genes',
-                path=f'{venn_path}/venn_DEG',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                plot_formats=plot_formats,
-                title='Differentially expressed genes',
-                path=f'{upset_path}/UpSet_DEG'
-                )
-        mk_df_for_each_intersection2(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                data=data,
-                path=df_path,
-                file_names='DEG_intersection',
-                )
-
-        # Upregulated genes
-        generate_venn2_diagram(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                plot_formats=plot_formats,
-                title='Upregulated genes',
-                path=f'{venn_path}/venn_UP',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                plot_formats=plot_formats,
-                title='Upregulated genes',
-                path=f'{upset_path}/UpSet_UP'
-                )
-        mk_df_for_each_intersection2(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                data=data,
-                path=df_path,
-                file_names='UP_intersection',
-                )
-
-        # Downregulated genes
-        generate_venn2_diagram(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                plot_formats=plot_formats,
-                title='Downregulated genes',
-                path=f'{venn_path}/venn_DOWN',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                plot_formats=plot_formats,
-                title='Downregulated genes',
-                path=f'{upset_path}/UpSet_DOWN'
-                )
-        mk_df_for_each_intersection2(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                data=data,
-                path=df_path,
-                file_names='DOWN_intersection',
-                )
-
-    elif len(data) == 3:
+    # The same joined dataframe makes the intersection dataframes of every
+    # gene category.
+    if intersections_table is None:
+        intersections_table = mk_intersections_table(data)
 
-        # Differentially expressed genes
-        generate_venn3_diagram(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].dge_df.index),
-                mutant3_name=data[2].name,
-                plot_formats=plot_formats,
-                title='Differentially expressed genes',
-                path=f'{venn_path}/venn_DEG',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].dge_df.index),
-                mutant3_name=data[2].name,
-                plot_formats=plot_formats,
-                title='Differentially expressed genes',
-                path=f'{upset_path}/UpSet_DEG'
-                )
-        mk_df_for_each_intersection3(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].dge_df.index),
-                mutant3_name=data[2].name,
-                data=data,
-                path=df_path,
-                file_names='DEG_intersection',
-                )
+    names = [d.name for d in data]
 
-        # Upregulated genes
-        generate_venn3_diagram(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].up_df.index),
-                mutant3_name=data[2].name,
-                plot_formats=plot_formats,
-                title='Upregulated genes',
-                path=f'{venn_path}/venn_UP',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].up_df.index),
-                mutant3_name=data[2].name,
-                plot_formats=plot_formats,
-                title='Upregulated genes',
-                path=f'{upset_path}/UpSet_UP'
-                )
-        mk_df_for_each_intersection3(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].up_df.index),
-                mutant3_name=data[2].name,
+    for category, codes_attribute, title in GENE_CATEGORIES:
+        mk_venn_upset_and_intersection_dfs(
+                gene_sets=[getattr(d, codes_attribute) for d in data],
+                names=names,
                 data=data,
-                path=df_path,
-                file_names='UP_intersection',
-                )
-
-        # Downregulated genes
-        generate_venn3_diagram(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].down_df.index),
-                mutant3_name=data[2].name,
                 plot_formats=plot_formats,
-                title='Downregulated genes',
-                path=f'{venn_path}/venn_DOWN',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].down_df.index),
-                mutant3_name=data[2].name,
-                plot_formats=plot_formats,
-                title='Downregulated genes',
-                path=f'{upset_path}/UpSet_DOWN'
-                )
-        mk_df_for_each_intersection3(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].down_df.index),
-                mutant3_name=data[2].name,
-                data=data,
-                path=df_path,
-                file_names='DOWN_intersection',
-                )
-
-    elif len(data) == 4:
-
-        # Differentially expressed genes
-        generate_venn4_diagram(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].dge_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                plot_formats=plot_formats,
-                title='Differentially expressed genes',
-                path=f'{venn_path}/venn_DEG',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].dge_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                plot_formats=plot_formats,
-                title='Differentially expressed genes',
-                path=f'{upset_path}/UpSet_DEG'
-                )
-        mk_df_for_each_intersection4(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].dge_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                data=data,
-                path=df_path,
-                file_names='DEG_intersection',
-                )
-
-        # Upregulated genes
-        generate_venn4_diagram(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].up_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                plot_formats=plot_formats,
-                title='Upregulated genes',
-                path=f'{venn_path}/venn_UP',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].up_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                plot_formats=plot_formats,
-                title='Upregulated genes',
-                path=f'{upset_path}/UpSet_UP'
-                )
-        mk_df_for_each_intersection4(
-                mutant1_gene_set=set(data[0].up_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].up_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].up_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                data=data,
-                path=df_path,
-                file_names='UP_intersection',
-                )
-
-        # Downregulated genes
-        generate_venn4_diagram(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].down_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                plot_formats=plot_formats,
-                title='Downregulated genes',
-                path=f'{venn_path}/venn_DOWN',
-                )
-        generate_upset_plot(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].down_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                plot_formats=plot_formats,
-                title='Downregulated genes',
-                path=f'{upset_path}/UpSet_DOWN'
-                )
-        mk_df_for_each_intersection4(
-                mutant1_gene_set=set(data[0].down_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].down_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].down_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
-                data=data,
-                path=df_path,
-                file_names='DOWN_intersection',
+                title=title,
+                venn_file=f'{venn_path}/venn_{category}',
+                upset_file=f'{upset_path}/UpSet_{category}',
+                df_path=df_path,
+                file_names=f'{category}_intersection',
+                output=output,
+                intersections_table=intersections_table,
                 )
 
 
@@ -973,209 +672,58 @@ def get_inverted_regulations_and_mk_venns_and_dataframes(
         venn_directory_path,
         upset_directory_path,
         dataframes_directory_path,
+        output=None,
+        intersections_table=None,
         ):
     """Generates the venn diagramas and the correspoding intersection
     dataframe for each one of the possible inverted regulations combinations
     """
 
+    # The same joined dataframe makes the intersection dataframes of every
+    # combination.
+    if intersections_table is None:
+        intersections_table = mk_intersections_table(data)
+
     inverted_regulation_dict = {}
 
     for d in data:
 
         inverted_regulation_dict[d.name] = {
                 'Up' : {
-                    'set' : set(d.up_df.index),
+                    'set' : d.up_codes,
                     'label' : (r'$\uparrow$' + d.name),
                     },
                 'Down' : {
-                    'set' : set(d.down_df.index),
+                    'set' : d.down_codes,
                     'label' : (r'$\downarrow$' + d.name),
                     },
                 }
 
-    regulations = ("Up", "Down")
+    regulations = (("Up", "Down"), ("Down", "Up"))
 
     for k in inverted_regulation_dict:
 
-        for reg in regulations:
-
-            plot_data_dict = {}
-
-            plot_data_dict[k] = 'Up'
-
-            name = f'{k}_Up_others_Down'
-
-            for notk in inverted_regulation_dict:
-
-                if notk is not k:
-                    plot_data_dict[notk] = 'Down'
-
-                    if reg == 'Down':
-
-                        plot_data_dict[k] = 'Down'
-
-                        plot_data_dict[notk] = 'Up'
-
-                        name = f'{k}_Down_others_Up'
-
-            if len(data) == 2:
-                generate_venn2_diagram(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        plot_formats=plot_formats,
-                        title="Inverted regulations between mutants",
-                        path=f"{venn_directory_path}/{name}",
-                        )
-                generate_upset_plot(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        plot_formats=plot_formats,
-                        title='Inverted regulations between mutants',
-                        path=f'{upset_directory_path}/{name}'
-                        )
-                mk_df_for_each_intersection2(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        data=data,
-                        path=dataframes_directory_path,
-                        file_names=name
-                        )
-
-            elif len(data) == 3:
-
-                generate_venn3_diagram(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        mutant3_gene_set=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['set'],
-                        mutant3_name=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['label'],
-                        plot_formats=plot_formats,
-                        title="Inverted regulations between mutants",
-                        path=f"{venn_directory_path}/{name}",
-                        )
-                generate_upset_plot(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        mutant3_gene_set=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['set'],
-                        mutant3_name=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['label'],
-                        plot_formats=plot_formats,
-                        title='Inverted regulations between mutants',
-                        path=f'{upset_directory_path}/{name}'
-                        )
-                mk_df_for_each_intersection3(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        mutant3_gene_set=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['set'],
-                        mutant3_name=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['label'],
-                        data=data,
-                        path=dataframes_directory_path,
-                        file_names=name
-                        )
-
-            elif len(data) == 4:
-
-                generate_venn4_diagram(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        mutant3_gene_set=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['set'],
-                        mutant3_name=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['label'],
-                        mutant4_gene_set=inverted_regulation_dict[
-                            data[3].name][plot_data_dict[data[3].name]]['set'],
-                        mutant4_name=inverted_regulation_dict[
-                            data[3].name][plot_data_dict[data[3].name]]['label'],
-                        plot_formats=plot_formats,
-                        title="Inverted regulations between mutants",
-                        path=f"{venn_directory_path}/{name}",
-                        )
-                generate_upset_plot(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        mutant3_gene_set=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['set'],
-                        mutant3_name=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['label'],
-                        mutant4_gene_set=inverted_regulation_dict[
-                            data[3].name][plot_data_dict[data[3].name]]['set'],
-                        mutant4_name=inverted_regulation_dict[
-                            data[3].name][plot_data_dict[data[3].name]]['label'],
-                        plot_formats=plot_formats,
-                        title='Inverted regulations between mutants',
-                        path=f'{upset_directory_path}/{name}'
-                        )
-                mk_df_for_each_intersection4(
-                        mutant1_gene_set=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['set'],
-                        mutant1_name=inverted_regulation_dict[
-                            data[0].name][plot_data_dict[data[0].name]]['label'],
-                        mutant2_gene_set=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['set'],
-                        mutant2_name=inverted_regulation_dict[
-                            data[1].name][plot_data_dict[data[1].name]]['label'],
-                        mutant3_gene_set=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['set'],
-                        mutant3_name=inverted_regulation_dict[
-                            data[2].name][plot_data_dict[data[2].name]]['label'],
-                        mutant4_gene_set=inverted_regulation_dict[
-                            data[3].name][plot_data_dict[data[3].name]]['set'],
-                        mutant4_name=inverted_regulation_dict[
-                            data[3].name][plot_data_dict[data[3].name]]['label'],
-                        data=data,
-                        path=dataframes_directory_path,
-                        file_names=f'{name}'
-                        )
-
+        for reg, others_reg in regulations:
+
+            # Regulation of each sample: <reg> for k, the opposite for the
+            # others.
+            plot_data = [
+                    inverted_regulation_dict[d.name][reg if d.name == k else others_reg]
+                    for d in data
+                    ]
+
+            name = f'{k}_{reg}_others_{others_reg}'
+
+            mk_venn_upset_and_intersection_dfs(
+                    gene_sets=[p['set'] for p in plot_data],
+                    names=[p['label'] for p in plot_data],
+                    data=data,
+                    plot_formats=plot_formats,
+                    title="Inverted regulations between mutants",
+                    venn_file=f"{venn_directory_path}/{name}",
+                    upset_file=f'{upset_directory_path}/{name}',
+                    df_path=dataframes_directory_path,
+                    file_names=name,
+                    output=output,
+                    intersections_table=intersections_table,
+                    )
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+"""Function assignment from GO codes and KEGG pathways. The function JSON
+file is compiled once into an inverted index (GO code -> function) and a
+single regular expression matching every KEGG pathway, so that each gene's
+function is found with column-wide lookups.
+"""
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from dgeapy.go_ancestors import explode_go_codes
+from dgeapy.go_ancestors import gather_ancestors
+
+
+@dataclass
+class FunctionIndex:
+    """Compiled function JSON file. A function's priority is its position in
+    the JSON file: when a GO code is listed under several functions, the
+    first one wins, as does the first function with a matching KEGG pathway.
+    """
+    names: list
+    go_priority: dict
+    kegg_priority: dict
+    kegg_regex: re.Pattern
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def build_function_index(function_dict):
+    """Compiles a {function : {'GO' : [...], 'KEGG' : [...]}} dictionary into
+    a FunctionIndex.
+    """
+
+    names = list(function_dict)
+    go_priority = {}
+    kegg_priority = {}
+
+    for priority, name in enumerate(names):
+        for code in function_dict[name]['GO']:
+            go_priority.setdefault(code, priority)
+        for pathway in function_dict[name]['KEGG']:
+            kegg_priority.setdefault(pathway, priority)
+
+    # All KEGG pathways in a single alternation, ordered by priority. Wrapped
+    # in a lookahead so that a match is tried at every position of the
+    # string: where several pathways start at the same position the one with
+    # the lowest priority wins, so the lowest priority over all matches is
+    # that of the first function with a pathway contained in the string.
+    alternation = '|'.join(re.escape(pathway) for pathway in kegg_priority)
+    kegg_regex = re.compile(f'(?=({alternation}))')
+
+    return FunctionIndex(
+            names=names,
+            go_priority=go_priority,
+            kegg_priority=kegg_priority,
+            kegg_regex=kegg_regex,
+            )
+
+
+def get_first_go_match(go_codes, go_priority, strip=True):
+    """Takes a Series of ';'-separated GO codes and returns, for each row, the
+    priority of the function of its first GO code (in the order they're
+    written) that belongs to any function. Rows without matches get NaN.
+    """
+
+    codes = go_codes.reset_index(drop=True).dropna().astype(str).str.split(';')
+    codes = codes.explode()
+    if strip:
+        codes = codes.str.strip()
+
+    # explode() keeps the order of the codes within each row, so the first
+    # match of each row is the first non-NaN priority of its group.
+    priorities = codes.map(go_priority).dropna()
+    first_match = priorities.groupby(level=0).first()
+
+    return first_match.reindex(range(len(go_codes)))
+
+
+def get_kegg_match(kegg_pathways, kegg_priority, kegg_regex):
+    """Takes a Series of KEGG pathway strings and returns, for each row, the
+    priority of the first function with a pathway contained in the string.
+    Rows without matches get NaN.
+    """
+
+    kegg_pathways = kegg_pathways.reset_index(drop=True)
+
+    if not kegg_priority:
+        return pd.Series(np.nan, index=kegg_pathways.index)
+
+    matches = kegg_pathways.dropna().astype(str).str.findall(kegg_regex)
+    priorities = matches.explode().dropna().map(kegg_priority)
+    lowest_priority = priorities.groupby(level=0).min()
+
+    return lowest_priority.reindex(range(len(kegg_pathways)))
+
+
+def get_first_ancestor_match(go_codes, go_ancestors, go_priority, strict=False):
+    """Takes a Series of ';'-separated GO codes and returns, for each row, the
+    priority of the function of its first GO ancestor that belongs to any
+    function, straight from the GOAncestorClosure. Ancestors are taken in
+    GO ID order, as written by go2ancestors, so the result is the same as
+    running get_first_go_match() on its ancestor columns. Only "is_a"
+    relationships are followed if <strict>. Rows without matches get NaN.
+    """
+
+    if strict:
+        indptr, indices = go_ancestors.is_a_indptr, go_ancestors.is_a_indices
+    else:
+        indptr = go_ancestors.is_a_and_regulates_indptr
+        indices = go_ancestors.is_a_and_regulates_indices
+
+    n_terms = len(go_ancestors.terms)
+    genes, term_rows = explode_go_codes(go_codes, go_ancestors.index)
+
+    # Row of each term in the closure -> priority of its function, -1 if it
+    # doesn't belong to any.
+    term_priority = np.full(n_terms, -1, dtype=np.int64)
+    for code, priority in go_priority.items():
+        if code in go_ancestors.index:
+            i = go_ancestors.index[code]
+            if go_ancestors.terms[i] == code:
+                term_priority[i] = priority
+
+    # The first function ancestor of each distinct GO code. Ancestors are
+    # sorted by row, which is GO ID order.
+    unique_rows, labels = np.unique(term_rows, return_inverse=True)
+    codes, ancestors = gather_ancestors(
+            np.arange(len(unique_rows)), unique_rows, indptr, indices, n_terms
+            )
+    hits = term_priority[ancestors] >= 0
+    first_hit = np.full(len(unique_rows), n_terms, dtype=np.int64)
+    np.minimum.at(first_hit, codes[hits], ancestors[hits])
+
+    # Then the first one over all the codes of each gene.
+    gene_first_hit = (
+            pd.Series(first_hit[labels])
+            .groupby(genes)
+            .min()
+            )
+    gene_first_hit = gene_first_hit[gene_first_hit < n_terms]
+    priorities = pd.Series(
+            term_priority[gene_first_hit.to_numpy()],
+            index=gene_first_hit.index,
+            dtype=float,
+            )
+
+    return priorities.reindex(range(len(go_codes)))
+
+
+def name_functions(priorities, not_annotated, function_index):
+    """Turns function priorities into function names. NaN priorities become
+    'others' and <not_annotated> rows 'not annotated'.
+    """
+
+    names = np.array(function_index.names + ['others'], dtype=object)
+    functions = names[priorities.fillna(len(function_index.names)).astype(int)]
+    functions[not_annotated] = 'not annotated'
+
+    return functions
+
+
+def assign_functions(
+        table,
+        function_index,
+        go_codes_column,
+        ancestors_column,
+        kegg_pathways_column,
+        ):
+    """Assigns a function to each row of <table>. The function of the first
+    matching GO code is taken; then the one of the first matching GO
+    ancestor; then the one of the first function with a matching KEGG
+    pathway. Rows with no annotations at all get 'not annotated' and rows
+    with annotations but no match get 'others'.
+    """
+
+    go_codes = table[go_codes_column]
+    ancestors = table[ancestors_column]
+    kegg_pathways = table[kegg_pathways_column]
+
+    priorities = get_first_go_match(go_codes, function_index.go_priority)
+    priorities = priorities.fillna(get_first_go_match(
+            ancestors, function_index.go_priority, strip=False
+            ))
+    priorities = priorities.fillna(get_kegg_match(
+            kegg_pathways,
+            function_index.kegg_priority,
+            function_index.kegg_regex,
+            ))
+
+    not_annotated = (
+            go_codes.isna() & ancestors.isna() & kegg_pathways.isna()
+            ).to_numpy()
+
+    return pd.Series(
+            name_functions(priorities, not_annotated, function_index),
+            index=table.index,
+            )
+
+
+def annotate_functions(
+        table,
+        function_index,
+        go_ancestors,
+        go_codes_column,
+        kegg_pathways_column,
+        strict=False,
+        ):
+    """Same as assign_functions(), but the GO ancestors are taken directly
+    from a GOAncestorClosure instead of from ancestor columns.
+    """
+
+    go_codes = table[go_codes_column]
+    kegg_pathways = table[kegg_pathways_column]
+
+    priorities = get_first_go_match(go_codes, function_index.go_priority)
+    priorities = priorities.fillna(get_first_ancestor_match(
+            go_codes, go_ancestors, function_index.go_priority, strict
+            ))
+    priorities = priorities.fillna(get_kegg_match(
+            kegg_pathways,
+            function_index.kegg_priority,
+            function_index.kegg_regex,
+            ))
+
+    not_annotated = (go_codes.isna() & kegg_pathways.isna()).to_numpy()
+
+    return pd.Series(
+            name_functions(priorities, not_annotated, function_index),
+            index=table.index,
+            )
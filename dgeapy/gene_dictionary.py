@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""Run-wide dictionary of gene IDs.
+
+Every gene ID of the samples of a run gets a dense int32 code once, right
+after the samples are loaded. Cross-sample work (intersections, Venn and
+UpSet counts, inverted regulations, Sankey flows) then runs on sorted arrays
+of codes and on bitmaps indexed by them instead of on sets of strings, and
+gene IDs are only looked up again to write the tables.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+# Gene dataframes of a sample and the attribute their sorted codes are
+# stored in by encode_samples().
+SAMPLE_GENE_CODES = {
+        'dge_df' : 'dge_codes',
+        'up_df' : 'up_codes',
+        'down_df' : 'down_codes',
+        }
+
+
+@dataclass
+class GeneDictionary:
+    """Gene IDs of a run. The code of each gene ID is its position in
+    gene_ids, whose hash table is built once and shared by every lookup.
+    """
+    gene_ids: pd.Index
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def build_gene_dictionary(gene_id_arrays):
+    """Takes a list of arrays (or indexes) of gene IDs and returns a
+    GeneDictionary with every distinct gene ID in them, in order of first
+    appearance.
+    """
+
+    # Only the gene IDs not seen in the arrays before are added, so the
+    # samples of a run, which mostly share their gene IDs, are never all
+    # concatenated and hashed at once.
+    gene_ids = pd.Index([], dtype=object)
+    for a in gene_id_arrays:
+        a = np.asarray(a, dtype=object)
+        new_ids = a[gene_ids.get_indexer(a) < 0]
+        new_ids = pd.unique(new_ids[pd.notna(new_ids)])
+        if len(new_ids):
+            gene_ids = gene_ids.append(pd.Index(new_ids, dtype=object))
+
+    return GeneDictionary(gene_ids=gene_ids)
+
+
+def get_gene_codes(gene_dictionary, gene_ids):
+    """Returns the int32 code of each one of <gene_ids>, in the same order,
+    or -1 for those not in <gene_dictionary>.
+    """
+
+    return gene_dictionary.gene_ids.get_indexer(gene_ids).astype(np.int32)
+
+
+def get_sorted_gene_codes(gene_dictionary, gene_ids):
+    """Returns the sorted int32 codes of the distinct <gene_ids> found in
+    <gene_dictionary>.
+    """
+
+    codes = get_gene_codes(gene_dictionary, gene_ids)
+
+    return np.unique(codes[codes >= 0])
+
+
+def get_gene_ids(gene_dictionary, codes):
+    """Returns an array with the gene ID of each one of <codes>.
+    """
+
+    return gene_dictionary.gene_ids.values[codes]
+
+
+def encode_samples(data, gene_dictionary=None):
+    """Adds to each sample in <data> the sorted codes of the gene IDs of its
+    dataframes, as listed in SAMPLE_GENE_CODES (e.g. up_codes for the index
+    of up_df). Unless <gene_dictionary> is given, it's built from the gene
+    IDs of the samples' input dataframes. Returns it.
+    """
+
+    if gene_dictionary is None:
+        gene_dictionary = build_gene_dictionary([d.input_df.index for d in data])
+
+    for d in data:
+        for df_attribute, codes_attribute in SAMPLE_GENE_CODES.items():
+            setattr(
+                    d,
+                    codes_attribute,
+                    get_sorted_gene_codes(
+                        gene_dictionary,
+                        getattr(d, df_attribute).index,
+                        ),
+                    )
+
+    return gene_dictionary
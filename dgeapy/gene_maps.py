@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+"""Mapping of gene tables to a gene ID map.
+
+The map is read once and indexed by the gene ID column of each strain, so
+every strain's table is joined to the same map in memory instead of reading
+and indexing the map again for each of them.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from dgeapy.tables import read_table
+from dgeapy.tables import read_table_file
+from dgeapy.tables import get_table_name
+from dgeapy.tables import write_table
+
+
+# Keys of each strain of a mapgenes configuration file.
+STRAIN_KEYS = ['df', 'id_col_in_map', 'id_col_in_df']
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def index_map(gene_map, id_column, columns=None):
+    """Indexes <gene_map> by the gene IDs of <id_column>, without the '#'
+    some of them end with. Rows without a gene ID are left out. Only
+    <columns> are kept, if given.
+    """
+
+    ids = gene_map[id_column]
+    has_id = ids.notna().values
+    ids = ids[has_id]
+
+    if columns is not None:
+        gene_map = gene_map[columns]
+    gene_map = gene_map[has_id]
+
+    gene_map = gene_map.set_axis(
+            np.where(ids.str.endswith('#'), ids.str[:-1], ids),
+            axis=0,
+            )
+    gene_map.index.name = 'index'
+
+    return gene_map
+
+
+def map_table(gene_map, table, id_col_in_df):
+    """Joins <table> to <gene_map> (as returned by index_map()) on the gene
+    IDs of its <id_col_in_df> column. Map columns named like a column of the
+    table, its gene ID column included, get a '_map' suffix. Returns the
+    mapped table, with the map columns first, and the map rows whose gene ID
+    is not in the table.
+    """
+
+    table = table.set_index(id_col_in_df)
+
+    gene_map = gene_map.rename(columns={
+            column : f'{column}_map' for column in gene_map.columns
+            if column in table.columns or column == id_col_in_df
+            })
+
+    table_mapped = table.join(gene_map, how='left')
+
+    table_columns = table.columns.values.tolist()
+    map_columns = gene_map.columns.values.tolist()
+    table_mapped = table_mapped.reindex(columns= map_columns + table_columns)
+    table_mapped = table_mapped.reset_index()
+
+    map_notmapped = gene_map[~gene_map.index.isin(table.index)]
+    map_notmapped = map_notmapped.reset_index(drop=True)
+
+    return table_mapped, map_notmapped
+
+
+def check_strains_config(config_dictionary):
+    """Checks that a mapgenes configuration file has a map and, for each
+    strain, the STRAIN_KEYS. Exits with a message otherwise.
+    """
+
+    if 'map' not in config_dictionary or 'strains' not in config_dictionary:
+        sys.exit("\n** The JSON configuration file needs a 'map' and its " \
+                 "'strains' **\n")
+
+    for strain, strain_config in config_dictionary['strains'].items():
+        missing_keys = [k for k in STRAIN_KEYS if k not in strain_config]
+        if missing_keys:
+            sys.exit(f"\n** Strain '{strain}' is missing " \
+                     f"{', '.join(missing_keys)} in the JSON configuration " \
+                     "file **\n")
+
+
+def check_strains_columns(gene_map, map_file, strains):
+    """Checks that the gene ID columns of every strain are in <gene_map> and
+    in the header of the strain's table, before any strain is mapped. Exits
+    with a message otherwise.
+    """
+
+    for strain, strain_config in strains.items():
+        table_file = os.path.abspath(strain_config['df'])
+        table_columns = read_table_file(table_file, nrows=0).columns
+
+        if strain_config['id_col_in_map'] not in gene_map.columns:
+            sys.exit(f"\n** Column '{strain_config['id_col_in_map']}' of " \
+                     f"strain '{strain}' not found in {map_file} **\n")
+        if strain_config['id_col_in_df'] not in table_columns:
+            sys.exit(f"\n** Column '{strain_config['id_col_in_df']}' of " \
+                     f"strain '{strain}' not found in {table_file} **\n")
+
+
+def map_strain(gene_map, map_file, strain, strain_config, out_dir, output,
+               map_columns=None, threads=1):
+    """Maps the table of a strain to the map read from <map_file> and writes
+    the mapped table and the map rows not found in it to <out_dir>/<strain>.
+    <gene_map> is only read, so the strains can share it.
+    """
+
+    table_file = os.path.abspath(strain_config['df'])
+    table = read_table(table_file, threads=threads)
+
+    id_col_in_map = strain_config['id_col_in_map']
+    id_col_in_df = strain_config['id_col_in_df']
+    # Checked by check_strains_columns() before the strains are mapped.
+    if id_col_in_map not in gene_map.columns:
+        raise ValueError(f"Column '{id_col_in_map}' of strain '{strain}' " \
+                         f"not found in {map_file}")
+    if id_col_in_df not in table.columns:
+        raise ValueError(f"Column '{id_col_in_df}' of strain '{strain}' " \
+                         f"not found in {table_file}")
+
+    table_mapped, map_notmapped = map_table(
+            index_map(gene_map, id_col_in_map, map_columns),
+            table,
+            id_col_in_df,
+            )
+
+    strain_dir = f'{out_dir}/{strain}'
+    os.mkdir(strain_dir)
+    write_table(
+            table_mapped,
+            f'{strain_dir}/{get_table_name(table_file)}_mapped',
+            output,
+            index=False,
+            )
+    write_table(
+            map_notmapped,
+            f'{strain_dir}/{get_table_name(map_file)}_notmapped',
+            output,
+            index=False,
+            )
+
+
+def map_strains(config_dictionary, out_dir, output, map_columns=None,
+                jobs=1, threads=1):
+    """Reads the map of a mapgenes configuration file once and maps the
+    table of each of its strains to it. Strains are mapped by <jobs>
+    threads, which share the same map, once the gene ID columns of all of
+    them have been checked.
+    """
+
+    map_file = os.path.abspath(config_dictionary['map'])
+    gene_map = read_table(map_file, threads=threads)
+
+    strains = config_dictionary['strains']
+    check_strains_columns(gene_map, map_file, strains)
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures = [
+                executor.submit(
+                    map_strain,
+                    gene_map,
+                    map_file,
+                    strain,
+                    strains[strain],
+                    out_dir,
+                    output,
+                    map_columns,
+                    threads,
+                    )
+                for strain in strains
+                ]
+        for future in futures:
+            future.result()
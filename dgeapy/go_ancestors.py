@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+
+"""Gene Ontology snapshot and precomputed GO ancestor closure.
+
+The go.obo file is parsed once into a compact binary snapshot (term IDs,
+"is_a" and regulates edge arrays, obsolete/replaced_by metadata) and the
+ancestors of every GO term are computed once from it. Both are stored next
+to the ontology file, keyed by the file's hash, so later runs load them in
+milliseconds and each ancestor lookup is a dictionary hit.
+"""
+
+import os
+import glob
+import hashlib
+from dataclasses import dataclass
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+
+# Relationships followed, on top of "is_a", when "regulates" ancestors
+# are requested.
+REGULATES_RELATIONSHIPS = {
+        'regulates', 'negatively_regulates', 'positively_regulates'
+        }
+
+
+@dataclass
+class GOSnapshot:
+    """Parsed go.obo file. Edges are stored as (child, parent) index arrays
+    into <terms>; replaced_by holds the index of the replacement term of
+    obsolete terms, -1 otherwise.
+    """
+    terms: np.ndarray
+    is_obsolete: np.ndarray
+    replaced_by: np.ndarray
+    alt_ids: np.ndarray
+    alt_id_targets: np.ndarray
+    is_a_children: np.ndarray
+    is_a_parents: np.ndarray
+    regulates_children: np.ndarray
+    regulates_parents: np.ndarray
+
+
+@dataclass
+class GOAncestorClosure:
+    """Ancestors of every GO term in CSR layout: the ancestors of
+    terms[i] are terms[indices[indptr[i]:indptr[i + 1]]]. "is_a" holds the
+    closure over "is_a" relationships and "is_a_and_regulates" the one over
+    "is_a" plus the regulates relationships.
+    """
+    terms: np.ndarray
+    index: dict
+    is_a_indptr: np.ndarray
+    is_a_indices: np.ndarray
+    is_a_and_regulates_indptr: np.ndarray
+    is_a_and_regulates_indices: np.ndarray
+
+    def ancestors_is_a(self, go_code: str) -> list:
+        """Returns the "is_a" ancestors of a GO code. Raises KeyError if the
+        code is not in the ontology (e.g. obsolete GO codes).
+        """
+
+        i = self.index[go_code]
+        start, end = self.is_a_indptr[i], self.is_a_indptr[i + 1]
+
+        return self.terms[self.is_a_indices[start:end]].tolist()
+
+    def ancestors_is_a_and_regulates(self, go_code: str) -> list:
+        """Returns the "is_a" and "regulates" ancestors of a GO code. Raises
+        KeyError if the code is not in the ontology.
+        """
+
+        i = self.index[go_code]
+        start = self.is_a_and_regulates_indptr[i]
+        end = self.is_a_and_regulates_indptr[i + 1]
+
+        return self.terms[self.is_a_and_regulates_indices[start:end]].tolist()
+
+
+@dataclass
+class GOIncidenceMatrix:
+    """Sparse genes x GO terms incidence matrix in CSR layout. Row i holds
+    the GO codes of genes[i] plus all of their ancestors, so the column of a
+    term lists the genes annotated with that term or any of its descendants.
+    "is_a" and "is_a_and_regulates" follow the same relationships as
+    GOAncestorClosure. alt_ids are the (sorted) alternative IDs of the terms
+    and alt_id_columns the column of the term of each.
+
+    A CSC copy of each matrix is built once, when the matrix is made or read,
+    so the genes of a term are just a slice of it.
+    """
+    genes: np.ndarray
+    terms: np.ndarray
+    is_a_indptr: np.ndarray
+    is_a_indices: np.ndarray
+    is_a_and_regulates_indptr: np.ndarray
+    is_a_and_regulates_indices: np.ndarray
+    alt_ids: np.ndarray = None
+    alt_id_columns: np.ndarray = None
+
+    def __post_init__(self):
+        # Matrices stored before alternative IDs were.
+        if self.alt_ids is None:
+            self.alt_ids = self.terms[:0]
+            self.alt_id_columns = np.array([], dtype=np.int32)
+
+        self.is_a_columns = get_csc_layout(
+                self.is_a_indptr, self.is_a_indices, len(self.terms)
+                )
+        self.is_a_and_regulates_columns = get_csc_layout(
+                self.is_a_and_regulates_indptr,
+                self.is_a_and_regulates_indices,
+                len(self.terms),
+                )
+
+    def get_column(self, go_code: str) -> int:
+        """Returns the column of <go_code>, which can be an alternative ID,
+        or -1 if it's not in the matrix.
+        """
+
+        column = np.searchsorted(self.terms, go_code)
+        if column < len(self.terms) and self.terms[column] == go_code:
+            return int(column)
+
+        i = np.searchsorted(self.alt_ids, go_code)
+        if i < len(self.alt_ids) and self.alt_ids[i] == go_code:
+            return int(self.alt_id_columns[i])
+
+        return -1
+
+    def genes_with_term(self, go_code: str, strict=False) -> np.ndarray:
+        """Returns the genes annotated with <go_code> or any of its
+        descendants, in the order of the matrix rows. Only "is_a"
+        relationships are considered if <strict>.
+        """
+
+        if strict:
+            indptr, rows = self.is_a_columns
+        else:
+            indptr, rows = self.is_a_and_regulates_columns
+
+        column = self.get_column(go_code)
+        if column < 0:
+            return self.genes[:0]
+
+        return self.genes[rows[indptr[column]:indptr[column + 1]]]
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def file_sha256(file_path):
+    """Returns the SHA-256 hex digest of a file.
+    """
+
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def get_cache_file(obo_file, digest, kind):
+    """Returns the path of a cache file stored next to <obo_file>.
+    """
+
+    return f'{obo_file}.{digest[:16]}.{kind}.npz'
+
+
+def write_cache_file(obo_file, digest, kind, arrays):
+    """Stores <arrays> in the <kind> cache file of <obo_file> and removes the
+    ones left by previous versions of the file. The file is written under a
+    temporary name first so that concurrent runs never read a partial file.
+    A read-only ontology directory just disables the cache.
+    """
+
+    cache_file = get_cache_file(obo_file, digest, kind)
+    tmp_file = f'{cache_file[:-len(".npz")]}.{os.getpid()}.tmp.npz'
+
+    try:
+        np.savez(tmp_file, **arrays)
+        os.replace(tmp_file, cache_file)
+
+        for stale_file in glob.glob(f'{glob.escape(obo_file)}.*.{kind}.npz'):
+            if stale_file != cache_file:
+                os.remove(stale_file)
+
+    except OSError:
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+
+
+def parse_go_obo(obo_file):
+    """Parses a go.obo file with goatools and returns a GOSnapshot.
+    """
+
+    # goatools is only needed when the snapshot has to be (re)built.
+    from goatools.obo_parser import GODag
+
+    godag = GODag(
+            obo_file,
+            optional_attrs={'relationship', 'replaced_by'},
+            load_obsolete=True,
+            prt=None,
+            )
+
+    # GODag maps alternative IDs to the same term object.
+    go_terms = {term.id : term for term in godag.values()}
+    terms = np.array(sorted(go_terms))
+    index = {go_id : i for i, go_id in enumerate(terms.tolist())}
+
+    alt_ids = [k for k in godag if k not in go_terms]
+
+    is_obsolete = np.zeros(len(terms), dtype=bool)
+    replaced_by = np.full(len(terms), -1, dtype=np.int32)
+    is_a_edges = []
+    regulates_edges = []
+    for i, go_id in enumerate(terms.tolist()):
+        term = go_terms[go_id]
+        is_obsolete[i] = term.is_obsolete
+
+        replacement = getattr(term, 'replaced_by', '')
+        if isinstance(replacement, (set, list)):
+            replacement = min(replacement, default='')
+        if replacement in godag:
+            replaced_by[i] = index[godag[replacement].id]
+
+        is_a_edges.extend((i, index[p.id]) for p in term.parents)
+        for relationship in REGULATES_RELATIONSHIPS:
+            regulates_edges.extend(
+                    (i, index[p.id])
+                    for p in term.relationship.get(relationship, ())
+                    )
+
+    is_a_edges = np.array(is_a_edges, dtype=np.int32).reshape(-1, 2)
+    regulates_edges = np.array(regulates_edges, dtype=np.int32).reshape(-1, 2)
+
+    return GOSnapshot(
+            terms=terms,
+            is_obsolete=is_obsolete,
+            replaced_by=replaced_by,
+            alt_ids=np.array(alt_ids, dtype=terms.dtype),
+            alt_id_targets=np.array(
+                [index[godag[k].id] for k in alt_ids], dtype=np.int32
+                ),
+            is_a_children=is_a_edges[:, 0],
+            is_a_parents=is_a_edges[:, 1],
+            regulates_children=regulates_edges[:, 0],
+            regulates_parents=regulates_edges[:, 1],
+            )
+
+
+def load_go_snapshot(obo_file, digest=None):
+    """Returns the GOSnapshot of <obo_file>. The snapshot is cached next to the
+    .obo file and only rebuilt when the file's hash changes.
+    """
+
+    if digest is None:
+        digest = file_sha256(obo_file)
+    cache_file = get_cache_file(obo_file, digest, 'snapshot')
+
+    if os.path.isfile(cache_file):
+        with np.load(cache_file) as npz:
+            return GOSnapshot(**{k : npz[k] for k in npz.files})
+
+    snapshot = parse_go_obo(obo_file)
+    write_cache_file(obo_file, digest, 'snapshot', vars(snapshot))
+
+    return snapshot
+
+
+def get_go_term_index(snapshot):
+    """Maps every GO ID and alternative ID to its row in the snapshot.
+    Obsolete terms are left out, so looking them up raises KeyError.
+    """
+
+    index = {
+            go_id : i
+            for i, go_id in enumerate(snapshot.terms.tolist())
+            if not snapshot.is_obsolete[i]
+            }
+    for alt_id, i in zip(
+            snapshot.alt_ids.tolist(), snapshot.alt_id_targets.tolist()
+            ):
+        if not snapshot.is_obsolete[i]:
+            index[alt_id] = i
+
+    return index
+
+
+def compute_ancestor_closure(n_terms, children, parents):
+    """Computes the transitive closure of the (child, parent) edge arrays in a
+    single topological pass: a term's ancestors are its parents plus their
+    (already computed) ancestors. Returns the closure as (indptr, indices).
+    """
+
+    order = np.argsort(children, kind='stable')
+    parents_of = np.split(
+            parents[order],
+            np.searchsorted(children[order], np.arange(1, n_terms)),
+            )
+    parents_of = [p.tolist() for p in parents_of]
+
+    closure = [None] * n_terms
+    # 0: not visited, 1: waiting for its parents, 2: done.
+    state = np.zeros(n_terms, dtype=np.int8)
+
+    for root in range(n_terms):
+        if state[root]:
+            continue
+
+        # Iterative post-order traversal so deep ontologies don't hit the
+        # recursion limit.
+        stack = [root]
+        state[root] = 1
+        while stack:
+            i = stack[-1]
+            pending = [p for p in parents_of[i] if state[p] == 0]
+            if pending:
+                state[pending] = 1
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            ancestors = set(parents_of[i])
+            for p in parents_of[i]:
+                # A parent still waiting means there's a cycle, which we
+                # just cut here.
+                if closure[p] is not None:
+                    ancestors.update(closure[p])
+            ancestors.discard(i)
+            closure[i] = ancestors
+            state[i] = 2
+
+    indptr = np.zeros(n_terms + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(c) for c in closure])
+    indices = np.fromiter(
+            (a for c in closure for a in sorted(c)),
+            dtype=np.int32,
+            count=indptr[-1],
+            )
+
+    return indptr, indices
+
+
+def build_go_ancestor_closure(snapshot):
+    """Computes the "is_a" and "is_a + regulates" ancestor closures for every
+    term of a GOSnapshot.
+    """
+
+    n_terms = len(snapshot.terms)
+
+    is_a_indptr, is_a_indices = compute_ancestor_closure(
+            n_terms,
+            snapshot.is_a_children,
+            snapshot.is_a_parents,
+            )
+    regulates_indptr, regulates_indices = compute_ancestor_closure(
+            n_terms,
+            np.concatenate([snapshot.is_a_children, snapshot.regulates_children]),
+            np.concatenate([snapshot.is_a_parents, snapshot.regulates_parents]),
+            )
+
+    return GOAncestorClosure(
+            terms=snapshot.terms,
+            index=get_go_term_index(snapshot),
+            is_a_indptr=is_a_indptr,
+            is_a_indices=is_a_indices,
+            is_a_and_regulates_indptr=regulates_indptr,
+            is_a_and_regulates_indices=regulates_indices,
+            )
+
+
+def load_go_ancestor_closure(obo_file):
+    """Returns the GOAncestorClosure of <obo_file>. The closure is cached next
+    to the .obo file, keyed by the file's SHA-256 hash, and only recomputed
+    when the .obo file changes.
+    """
+
+    digest = file_sha256(obo_file)
+    cache_file = get_cache_file(obo_file, digest, 'ancestors')
+
+    if os.path.isfile(cache_file):
+        with np.load(cache_file) as npz:
+            snapshot = GOSnapshot(**{
+                    k : npz[k] for k in GOSnapshot.__dataclass_fields__
+                    })
+
+            return GOAncestorClosure(
+                    terms=snapshot.terms,
+                    index=get_go_term_index(snapshot),
+                    is_a_indptr=npz['is_a_indptr'],
+                    is_a_indices=npz['is_a_indices'],
+                    is_a_and_regulates_indptr=npz['is_a_and_regulates_indptr'],
+                    is_a_and_regulates_indices=npz['is_a_and_regulates_indices'],
+                    )
+
+    snapshot = load_go_snapshot(obo_file, digest)
+    closure = build_go_ancestor_closure(snapshot)
+
+    # The snapshot is stored along with the closure so that warm runs only
+    # read one file.
+    arrays = vars(snapshot).copy()
+    arrays.update(
+            is_a_indptr=closure.is_a_indptr,
+            is_a_indices=closure.is_a_indices,
+            is_a_and_regulates_indptr=closure.is_a_and_regulates_indptr,
+            is_a_and_regulates_indices=closure.is_a_and_regulates_indices,
+            )
+    write_cache_file(obo_file, digest, 'ancestors', arrays)
+
+    return closure
+
+
+def explode_go_codes(go_codes, index):
+    """Splits a Series of ';'-separated GO codes once and maps every distinct
+    code to its row in the ontology. Returns two arrays: the position of each
+    code's gene in <go_codes> and the code's row. Codes that are not in
+    <index> (e.g. obsolete GO codes) are dropped.
+    """
+
+    codes = (
+            go_codes.reset_index(drop=True)
+            .dropna()
+            .astype(str)
+            .str.split(';')
+            .explode()
+            .str.strip()
+            )
+
+    # One dictionary lookup per distinct GO code, however many genes share it.
+    labels, unique_codes = pd.factorize(codes)
+    unique_rows = np.array(
+            [index.get(code, -1) for code in unique_codes],
+            dtype=np.int64,
+            )
+    term_rows = unique_rows[labels]
+
+    found = (labels >= 0) & (term_rows >= 0)
+
+    return codes.index.to_numpy()[found], term_rows[found]
+
+
+def gather_ancestors(genes, term_rows, indptr, indices, n_terms):
+    """Expands each (gene, GO term) pair into (gene, ancestor) pairs using the
+    CSR closure <indptr>/<indices>. Returns the unique pairs sorted by gene
+    and ancestor.
+    """
+
+    starts = indptr[term_rows]
+    counts = indptr[term_rows + 1] - starts
+
+    # Positions in <indices> of the ancestors of every pair, built without a
+    # Python loop: for pair k they go from starts[k] to starts[k] + counts[k].
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    offsets += np.arange(counts.sum())
+
+    pairs = np.unique(
+            np.repeat(genes, counts).astype(np.int64) * n_terms
+            + indices[offsets]
+            )
+
+    return pairs // n_terms, pairs % n_terms
+
+
+def get_go_column_ancestors(go_codes, go_ancestors):
+    """Takes a Series of ';'-separated GO codes and returns a DataFrame with
+    the ';'-joined "is_a" ancestors ('go_ancestors_is_a') and "is_a" plus
+    "regulates" ancestors ('go_ancestors_is_a_and_regulates') of each row.
+    Rows without GO codes get NaN and rows whose codes have no ancestors get
+    an empty string.
+    """
+
+    n_terms = len(go_ancestors.terms)
+    genes, term_rows = explode_go_codes(go_codes, go_ancestors.index)
+
+    has_go_codes = go_codes.notna().to_numpy()
+    ancestors_df = pd.DataFrame(index=go_codes.index)
+
+    for column, indptr, indices in (
+            (
+                'go_ancestors_is_a',
+                go_ancestors.is_a_indptr,
+                go_ancestors.is_a_indices,
+            ),
+            (
+                'go_ancestors_is_a_and_regulates',
+                go_ancestors.is_a_and_regulates_indptr,
+                go_ancestors.is_a_and_regulates_indices,
+            ),
+            ):
+        ancestor_genes, ancestors = gather_ancestors(
+                genes, term_rows, indptr, indices, n_terms
+                )
+
+        # Pairs are sorted by gene, so each gene's ancestors are a contiguous
+        # slice: grouping is just finding where the gene changes.
+        names = go_ancestors.terms[ancestors].tolist()
+        groups, starts = np.unique(ancestor_genes, return_index=True)
+        ends = np.append(starts[1:], len(names))
+
+        values = np.full(len(go_codes), np.nan, dtype=object)
+        values[has_go_codes] = ''
+        values[groups] = [
+                ';'.join(names[start:end])
+                for start, end in zip(starts.tolist(), ends.tolist())
+                ]
+        ancestors_df[column] = values
+
+    return ancestors_df
+
+
+def get_csc_layout(indptr, indices, n_columns):
+    """Takes a CSR matrix (<indptr>, <indices>) with <n_columns> columns and
+    returns the same matrix in CSC layout: the rows of column j are
+    rows[column_indptr[j]:column_indptr[j + 1]], in ascending order.
+    Returns (column_indptr, rows).
+    """
+
+    column_indptr = np.zeros(n_columns + 1, dtype=np.int64)
+    column_indptr[1:] = np.cumsum(np.bincount(indices, minlength=n_columns))
+
+    # A stable sort keeps the rows of each column in the CSR order.
+    order = np.argsort(indices, kind='stable')
+    row_of_entry = np.repeat(
+            np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr)
+            )
+
+    return column_indptr, row_of_entry[order]
+
+
+def get_go_incidence_matrix(go_codes, gene_ids, go_ancestors):
+    """Takes a Series of ';'-separated GO codes and the IDs of their genes and
+    returns a GOIncidenceMatrix. Only the GO terms present in the table are
+    kept as columns.
+    """
+
+    n_terms = len(go_ancestors.terms)
+    genes, term_rows = explode_go_codes(go_codes, go_ancestors.index)
+
+    matrices = []
+    for indptr, indices in (
+            (go_ancestors.is_a_indptr, go_ancestors.is_a_indices),
+            (
+                go_ancestors.is_a_and_regulates_indptr,
+                go_ancestors.is_a_and_regulates_indices,
+            ),
+            ):
+        ancestor_genes, ancestors = gather_ancestors(
+                genes, term_rows, indptr, indices, n_terms
+                )
+
+        # Each gene carries its own GO codes as well as their ancestors.
+        pairs = np.unique(np.concatenate([
+                genes.astype(np.int64) * n_terms + term_rows,
+                ancestor_genes * n_terms + ancestors,
+                ]))
+        matrices.append((pairs // n_terms, pairs % n_terms))
+
+    used_terms = np.unique(np.concatenate([m[1] for m in matrices]))
+
+    # Alternative IDs of the kept terms, so that they can be looked up too.
+    index_codes = np.array(list(go_ancestors.index), dtype=go_ancestors.terms.dtype)
+    index_rows = np.fromiter(
+            go_ancestors.index.values(), dtype=np.int64, count=len(index_codes)
+            )
+    is_alt_id = (
+            (go_ancestors.terms[index_rows] != index_codes)
+            & np.isin(index_rows, used_terms)
+            )
+    alt_order = np.argsort(index_codes[is_alt_id])
+
+    csr = []
+    for rows, columns in matrices:
+        matrix_indptr = np.zeros(len(go_codes) + 1, dtype=np.int64)
+        matrix_indptr[1:] = np.cumsum(np.bincount(rows, minlength=len(go_codes)))
+        csr.append((
+                matrix_indptr,
+                np.searchsorted(used_terms, columns).astype(np.int32),
+                ))
+
+    return GOIncidenceMatrix(
+            genes=np.asarray(gene_ids, dtype=str),
+            terms=go_ancestors.terms[used_terms],
+            is_a_indptr=csr[0][0],
+            is_a_indices=csr[0][1],
+            is_a_and_regulates_indptr=csr[1][0],
+            is_a_and_regulates_indices=csr[1][1],
+            alt_ids=index_codes[is_alt_id][alt_order],
+            alt_id_columns=np.searchsorted(
+                used_terms, index_rows[is_alt_id][alt_order]
+                ).astype(np.int32),
+            )
+
+
+def save_go_incidence_matrix(matrix, file_path):
+    """Stores a GOIncidenceMatrix as a compressed .npz file.
+    """
+
+    np.savez_compressed(file_path, **{
+            f.name : getattr(matrix, f.name) for f in fields(matrix)
+            })
+
+
+def read_go_incidence_matrix(file_path):
+    """Reads a GOIncidenceMatrix stored with save_go_incidence_matrix().
+    """
+
+    with np.load(file_path) as npz:
+        return GOIncidenceMatrix(**{k : npz[k] for k in npz.files})
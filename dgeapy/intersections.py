@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+"""Intersections between any number of sets of gene IDs.
+
+Each gene gets an integer membership code with one bit per set: bit i is on
+when the gene is in the i-th set. Genes are bucketed by code with a single
+sort, so every intersection comes out of one pass over the genes, whatever
+the number of sets. Codes are written as keys like "1010", whose i-th
+character is the i-th set (in the example, the gene is in the first and the
+third sets only).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Sets that fit in a membership code.
+MAX_SETS = 64
+
+# Integer gene IDs up to this many times the number of IDs are used as
+# positions of the codes array instead of being hashed.
+DENSE_CODES_FACTOR = 4
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def code_to_key(code, n_sets):
+    """Returns the "1010"-like key of a membership code of <n_sets> sets.
+    """
+
+    return format(int(code), f'0{n_sets}b')[::-1]
+
+
+def key_to_code(key):
+    """Returns the membership code of a "1010"-like key.
+    """
+
+    return int(key[::-1], 2)
+
+
+def get_intersection_keys(n_sets):
+    """Returns the keys of every intersection of <n_sets> sets: first those
+    of the genes in a single set, then in two sets... and, for the same
+    number of sets, the earlier the sets the earlier the key.
+    """
+
+    codes = range(1, 2**n_sets)
+
+    return sort_intersection_keys([code_to_key(code, n_sets) for code in codes])
+
+
+def sort_intersection_keys(keys):
+    """Sorts "1010"-like keys in the order given by get_intersection_keys().
+    """
+
+    return sorted(keys, key=lambda key: (key.count('1'), [-int(b) for b in key]))
+
+
+def get_membership_codes(gene_sets, n_genes=None):
+    """Takes a list of collections of gene IDs (sets, arrays, indexes...) and
+    returns an array with every gene ID found in any of them and an array
+    with the membership code of each of those genes. Collections of the
+    codes of a GeneDictionary of <n_genes> gene IDs are always bucketed in
+    a bitmap of that size, with the gene codes in ascending order.
+    """
+
+    n_sets = len(gene_sets)
+    if n_sets > MAX_SETS:
+        raise ValueError(f'At most {MAX_SETS} sets are supported, got {n_sets}')
+
+    gene_arrays = [
+            np.fromiter(s, dtype=object, count=len(s))
+            if isinstance(s, (set, frozenset)) else np.asarray(s)
+            for s in gene_sets
+            ]
+    sizes = [len(a) for a in gene_arrays]
+    if sum(sizes) == 0:
+        return np.array([], dtype=object), np.array([], dtype=np.uint64)
+
+    values = np.concatenate(gene_arrays)
+    bits = [np.uint64(1 << i) for i in range(n_sets)]
+    bounds = np.cumsum([0] + sizes)
+
+    if n_genes is not None or (
+            values.dtype.kind in 'iu'
+            and values.min() >= 0
+            and values.max() < DENSE_CODES_FACTOR * len(values)
+            ):
+        # Dense integer gene IDs index the codes directly.
+        if n_genes is None:
+            n_genes = int(values.max()) + 1
+        codes = np.zeros(n_genes, dtype=np.uint64)
+        for bit, start, end in zip(bits, bounds[:-1], bounds[1:]):
+            codes[values[start:end]] |= bit
+        genes = np.flatnonzero(codes)
+
+        return genes.astype(values.dtype), codes[genes]
+
+    # Other gene IDs are encoded as integers (their position in <genes>) by
+    # hashing, which is faster than sorting strings.
+    gene_positions, genes = pd.factorize(values, sort=False)
+
+    codes = np.zeros(len(genes), dtype=np.uint64)
+    for bit, start, end in zip(bits, bounds[:-1], bounds[1:]):
+        codes[gene_positions[start:end]] |= bit
+
+    return np.asarray(genes), codes
+
+
+def group_by_code(codes):
+    """Sorts the positions of <codes> by code. Returns the distinct codes
+    and, for each of them, the positions of the genes with that code.
+    """
+
+    order = np.argsort(codes, kind='stable')
+    distinct_codes, starts = np.unique(codes[order], return_index=True)
+
+    return distinct_codes, np.split(order, starts[1:])
+
+
+def get_gene_ids_set_for_intersections(gene_sets, keys=None):
+    """Computes the sets of gene IDs of every intersection of <gene_sets>, a
+    list of up to MAX_SETS collections of gene IDs. Returns a dictionary
+    where the keys are binary numbers that represent each intersection: the
+    i-th bit is the i-th set. Only the non-empty intersections are returned
+    unless their <keys> are given, in which case those and only those are
+    returned, in that order.
+    """
+
+    n_sets = len(gene_sets)
+    genes, codes = get_membership_codes(gene_sets)
+    distinct_codes, positions = group_by_code(codes)
+
+    intersections_dict = {
+            code_to_key(code, n_sets) : set(genes[p].tolist())
+            for code, p in zip(distinct_codes.tolist(), positions)
+            }
+
+    if keys is None:
+        return intersections_dict
+
+    return {key : intersections_dict.get(key, set()) for key in keys}
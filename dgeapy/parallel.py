@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+"""Row-sharded execution of table-wide functions over a process pool.
+
+The table is cut into contiguous shards of rows and each shard is processed
+by a worker; results are concatenated back in row order, so the output does
+not depend on the number of workers. Independent tasks (e.g. the samples of
+a run) can be spread over a process pool the same way. The GO ancestor
+closure is placed once in shared memory and every worker maps the same
+read-only arrays instead of receiving its own pickled copy.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from dgeapy.go_ancestors import GOAncestorClosure
+
+
+@dataclass
+class SharedArray:
+    """Location of a NumPy array stored in a SharedMemory block.
+    """
+    name: str
+    shape: tuple
+    dtype: str
+
+
+# Objects shared with the functions run by the workers of the current process,
+# set once per worker by _init_worker().
+_shared_objects = {}
+_shared_blocks = []
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def share_arrays(arrays):
+    """Copies a {name : array} dictionary to shared memory. Returns the
+    SharedMemory blocks, which the caller must close and unlink, and a
+    {name : SharedArray} dictionary to attach to them from other processes.
+    """
+
+    blocks = []
+    specs = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = SharedArray(block.name, array.shape, array.dtype.str)
+
+    return blocks, specs
+
+
+def attach_arrays(specs):
+    """Attaches to arrays stored with share_arrays(). Returns the SharedMemory
+    blocks, which must stay open while the arrays are used, and a read-only
+    {name : array} dictionary.
+    """
+
+    blocks = []
+    arrays = {}
+    for name, spec in specs.items():
+        if sys.version_info >= (3, 13):
+            block = shared_memory.SharedMemory(name=spec.name, track=False)
+        else:
+            block = shared_memory.SharedMemory(name=spec.name)
+        array = np.ndarray(spec.shape, dtype=spec.dtype, buffer=block.buf)
+        array.flags.writeable = False
+        blocks.append(block)
+        arrays[name] = array
+
+    return blocks, arrays
+
+
+def share_go_ancestor_closure(go_ancestors):
+    """Copies a GOAncestorClosure to shared memory, the term index included.
+    """
+
+    arrays = {k : v for k, v in vars(go_ancestors).items() if k != 'index'}
+    arrays['index_keys'] = np.array(list(go_ancestors.index))
+    arrays['index_values'] = np.fromiter(
+            go_ancestors.index.values(),
+            dtype=np.int64,
+            count=len(go_ancestors.index),
+            )
+
+    return share_arrays(arrays)
+
+
+def attach_go_ancestor_closure(specs):
+    """Rebuilds a GOAncestorClosure stored with share_go_ancestor_closure().
+    """
+
+    blocks, arrays = attach_arrays(specs)
+    index = dict(zip(
+            arrays.pop('index_keys').tolist(),
+            arrays.pop('index_values').tolist(),
+            ))
+
+    return blocks, GOAncestorClosure(index=index, **arrays)
+
+
+def _init_worker(objects, closure_specs):
+    """Sets the objects shared by every shard processed by this worker.
+    """
+
+    _shared_objects.update(objects)
+    if closure_specs is not None:
+        blocks, go_ancestors = attach_go_ancestor_closure(closure_specs)
+        _shared_blocks.extend(blocks)
+        _shared_objects['go_ancestors'] = go_ancestors
+
+
+def _run_shard(function, shard, kwargs):
+    """Runs <function> on a shard of rows with the worker's shared objects.
+    """
+
+    return function(shard, **_shared_objects, **kwargs)
+
+
+def map_row_shards(function, table, jobs, go_ancestors=None, shared=None,
+                   **kwargs):
+    """Runs function(table, **shared, **kwargs) over <jobs> processes and
+    returns the same result as a single call would. <table> (a DataFrame or
+    Series) is split into contiguous shards of rows and <function> must
+    return a DataFrame or Series with the index of the rows it was given.
+    <go_ancestors> is passed to <function> as a keyword argument through
+    shared memory and the small objects in <shared> are sent once to each
+    worker.
+    """
+
+    shared = dict(shared or {})
+    n_shards = min(len(table), jobs * 4)
+
+    if jobs <= 1 or n_shards <= 1:
+        if go_ancestors is not None:
+            shared['go_ancestors'] = go_ancestors
+        return function(table, **shared, **kwargs)
+
+    blocks, closure_specs = [], None
+    if go_ancestors is not None:
+        blocks, closure_specs = share_go_ancestor_closure(go_ancestors)
+
+    bounds = np.linspace(0, len(table), n_shards + 1).astype(int)
+    shards = (
+            table.iloc[start:end]
+            for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+            )
+
+    try:
+        with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(shared, closure_specs),
+                ) as executor:
+            # map() yields the results in the order of the shards, whatever
+            # the order in which the workers finish them.
+            results = list(executor.map(
+                    _run_shard,
+                    [function] * n_shards,
+                    shards,
+                    [kwargs] * n_shards,
+                    ))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return pd.concat(results)
+
+
+def _run_task(function, task):
+    """Runs <function> with the keyword arguments of <task>.
+    """
+
+    return function(**task)
+
+
+def map_tasks(function, tasks, jobs):
+    """Runs function(**task) for each {argument : value} dictionary of
+    <tasks> over <jobs> processes. Returns the results in the order of
+    <tasks>, whatever the order in which the workers finish them.
+    """
+
+    if jobs <= 1 or len(tasks) <= 1:
+        return [function(**task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+        return list(executor.map(
+                _run_task,
+                [function] * len(tasks),
+                tasks,
+                ))
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+"""Column-pruned loading of multiplemuts sample tables.
+
+Only the columns the analysis works with are loaded for each sample. The
+rest of the columns (annotations, GO terms...) are read back once per sample
+and joined when a table is written to disk. Rows whose gene ID matches an exclusion
+pattern, and repeated gene IDs, are dropped all at once right after loading.
+"""
+
+import re
+
+from dgeapy.tables import read_table
+from dgeapy.tables import read_table_file
+from dgeapy.add_columns import add_fold_change_columns
+from dgeapy.add_columns import add_regulation_columns
+from dgeapy.filter_dataframe import get_column_names
+
+
+# Values read as NaN in sample tables.
+NA_VALUES = ["--", "",]
+
+# Columns, by the keys given by get_column_names(), the analysis needs.
+ANALYSIS_COLUMNS = [
+        'index',
+        'geneID',
+        'log2FoldChange',
+        'FoldChange',
+        'Regulation',
+        'pvalue',
+        'padj',
+        'Description',
+        ]
+NUMERIC_COLUMNS = ['log2FoldChange', 'FoldChange', 'pvalue', 'padj']
+
+# Patterns of the gene IDs of non-coding transcripts, excluded by default.
+NON_CODING_PATTERNS = ['Novel', 'sRNA']
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def get_row_filter(ids, exclude=None):
+    """Returns a boolean mask of the gene IDs in <ids> (a Series) to keep:
+    IDs that don't match any of the regular expressions in <exclude> and
+    are not a repetition of a previous ID. The patterns are compiled into a
+    single expression, so each ID is only matched once. Also returns the
+    number of excluded and of repeated IDs.
+    """
+
+    keep = ~ids.duplicated(keep='first')
+    n_duplicated = int((~keep).sum())
+
+    n_excluded = 0
+    if exclude:
+        pattern = re.compile('|'.join(f'(?:{p})' for p in exclude))
+        excluded = ids.str.contains(pattern, na=False)
+        n_excluded = int(excluded.sum())
+        # A repeated ID is excluded just like the first one.
+        n_duplicated -= int((excluded & ~keep).sum())
+        keep &= ~excluded
+
+    return keep, n_excluded, n_duplicated
+
+
+def read_sample_table(file_path, threads=1, exclude=None):
+    """Reads the columns of a sample table listed in ANALYSIS_COLUMNS, with
+    explicit dtypes for the numeric ones, without the rows whose gene ID
+    matches any of the <exclude> patterns nor repeated gene IDs. Returns the
+    dataframe, the column names given by get_column_names() for the whole
+    table, the names of all of its columns, once renamed, in the order they
+    are written to disk and a {'excluded' : n, 'duplicated' : n} dictionary
+    with the number of dropped rows. <threads> is passed to read_table().
+    """
+
+    # Column names are resolved on the header alone, exactly as they would be
+    # on the whole table.
+    header = read_table_file(file_path, nrows=0, na_values=NA_VALUES)
+    file_columns = header.columns.values.tolist()
+
+    add_fold_change_columns(header)
+    add_regulation_columns(header)
+    column_names = get_column_names(header)
+
+    output_columns = header.rename(columns={
+            column_names[key] : key for key in column_names
+            }).columns.values.tolist()
+    output_columns.remove('index')
+
+    columns = [
+            column_names[key] for key in ANALYSIS_COLUMNS
+            if key in column_names and column_names[key] in file_columns
+            ]
+    dtype = {
+            column_names[key] : 'float64' for key in NUMERIC_COLUMNS
+            if key in column_names and column_names[key] in columns
+            }
+
+    df = read_table(
+            file_path,
+            columns=columns,
+            dtype=dtype,
+            threads=threads,
+            na_values=NA_VALUES,
+            )
+
+    # Dropped rows are filtered out with a single mask, before any other
+    # column is added to the table.
+    keep, n_excluded, n_duplicated = get_row_filter(
+            df[column_names['index']], exclude
+            )
+    if n_excluded or n_duplicated:
+        df = df[keep.values]
+
+    return df, column_names, output_columns, {
+            'excluded' : n_excluded,
+            'duplicated' : n_duplicated,
+            }
+
+
+def load_annotation_columns(sample_data):
+    """Reads the columns of a sample table that read_sample_table() left out,
+    for the rows of its input_df, and keeps them as sample_data.annotation_df
+    so that the table is only read and de-duplicated once per sample.
+    """
+
+    annotation_columns = [
+            column for column in sample_data.output_columns
+            if column not in sample_data.input_df.columns
+            ]
+
+    annotations = read_table(
+            sample_data.input_file,
+            columns=['index'] + annotation_columns,
+            na_values=NA_VALUES,
+            )
+    annotations = annotations.set_index('index')
+    annotations = annotations.loc[~annotations.index.duplicated(keep='first')]
+
+    sample_data.annotation_df = annotations.reindex(sample_data.input_df.index)
+
+
+def trim_annotation_columns(sample_data):
+    """Keeps only the annotations of the differentially expressed genes of a
+    sample, the only ones the intersection tables join, once its input table
+    has been written.
+    """
+
+    if sample_data.annotation_df is not None:
+        sample_data.annotation_df = sample_data.annotation_df.loc[
+                sample_data.dge_df.index
+                ]
+
+
+def join_annotation_columns(sample_data, df):
+    """Takes a dataframe with (some of) the rows of a sample and adds back the
+    columns that were not loaded by read_sample_table(), in the order of the
+    sample table. They are read the first time, see
+    load_annotation_columns().
+    """
+
+    annotation_columns = [
+            column for column in sample_data.output_columns
+            if column not in df.columns
+            ]
+    if not annotation_columns:
+        return df[sample_data.output_columns]
+
+    if sample_data.annotation_df is None:
+        load_annotation_columns(sample_data)
+
+    df = df.join(sample_data.annotation_df[annotation_columns], how='left')
+
+    return df[sample_data.output_columns]
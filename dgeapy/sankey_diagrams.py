@@ -5,85 +5,84 @@ pySankey.
 """
 
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from pysankey import sankey
 
+from dgeapy.gene_dictionary import build_gene_dictionary
+from dgeapy.gene_dictionary import get_gene_codes
+
+
+# Regulations on each side of the sankey diagrams, in order. The regulation
+# of a gene is coded by its position in here.
+SANKEY_REGULATIONS = ['Down', 'No sig', 'Up']
+
+
+def get_sankey_regulations(sample, log2fc, padj_value, gene_dictionary):
+    """Returns an array with the position in SANKEY_REGULATIONS of the
+    regulation in <sample> of each gene of <gene_dictionary>, by code. Genes
+    with a padj value over <padj_value> or an absolute log2FoldChange under
+    <log2fc>, as well as those not in the sample, are "No sig".
+    """
+
+    regulations = np.full(
+            len(gene_dictionary.gene_ids),
+            SANKEY_REGULATIONS.index('No sig'),
+            dtype=np.int8,
+            )
+
+    df = sample.input_df
+    log2_fold_change = df[sample.df_columns['log2FoldChange']].values
+    codes = get_gene_codes(gene_dictionary, df.index)
+
+    significant = ~(df[sample.df_columns['padj']].values > padj_value)
+    significant &= codes >= 0
+
+    # A gene can be both only when <log2fc> is negative, and it has always
+    # been "Down" then.
+    up = significant & (log2_fold_change >= log2fc)
+    down = significant & (log2_fold_change <= -log2fc)
+    regulations[codes[up]] = SANKEY_REGULATIONS.index('Up')
+    regulations[codes[down]] = SANKEY_REGULATIONS.index('Down')
+
+    return regulations
+
+
 def generate_sankey_diagram(
         data,
         fc_value,
         padj_value,
         plot_formats,
         path,
+        gene_dictionary=None,
         ):
     """Generate sankey diagrams for gene regulations betwwen 2 mutants,
-    form left to right. Will output all of the possible combinations
+    form left to right. Will output all of the possible combinations.
+    The regulations of each sample are computed once, over the codes of
+    <gene_dictionary> (built from the samples if not given), so each
+    diagram only compares two arrays.
     """
 
     log2fc = np.log2(fc_value)
 
-    for a in data:
+    if gene_dictionary is None:
+        gene_dictionary = build_gene_dictionary([d.input_df.index for d in data])
 
-        a.input_df.loc[a.input_df[
-                            a.df_columns['padj']] > padj_value,'Regulation'
-                                 ] = "No sig"
+    regulations = [
+            get_sankey_regulations(d, log2fc, padj_value, gene_dictionary)
+            for d in data
+            ]
+    labels = np.array(SANKEY_REGULATIONS, dtype=object)
+    no_sig = SANKEY_REGULATIONS.index('No sig')
 
-        a.input_df.loc[
-            (a.input_df[a.df_columns['log2FoldChange']] < log2fc)
-            & (a.input_df[a.df_columns['log2FoldChange']] > -log2fc), 'Regulation'
-                      ] = "No sig"
+    for a, a_regulations in zip(data, regulations):
 
-        a.input_df.loc[(
-            a.input_df['Regulation'] != "No sig")
-            & (a.input_df[a.df_columns['log2FoldChange']] >= log2fc),
-                'Regulation'
-                ] = "Up"
-
-        a.input_df.loc[
-                (a.input_df['Regulation'] != "No sig") 
-                & (a.input_df[a.df_columns['log2FoldChange']] <= -log2fc),
-                'Regulation'
-                ] = "Down"
-
-        a.input_df = a.input_df[a.input_df['Regulation'] != 'No sig']
-
-        for b in data:
+        for b, b_regulations in zip(data, regulations):
 
             if b is not a:
 
-                b.input_df.loc[b.input_df[
-                                    b.df_columns['padj']] > padj_value,'Regulation'
-                                         ] = "No sig"
-
-                b.input_df.loc[
-                    (b.input_df[b.df_columns['log2FoldChange']] < log2fc)
-                    & (b.input_df[b.df_columns['log2FoldChange']] > -log2fc), 'Regulation'
-                              ] = "No sig"
-
-                b.input_df.loc[(
-                    b.input_df['Regulation'] != "No sig")
-                    & (b.input_df[b.df_columns['log2FoldChange']] >= log2fc),
-                        'Regulation'
-                        ] = "Up"
-
-                b.input_df.loc[
-                        (b.input_df['Regulation'] != "No sig") 
-                        & (b.input_df[b.df_columns['log2FoldChange']] <= -log2fc),
-                        'Regulation'
-                        ] = "Down"
-
-                b.input_df = b.input_df[b.input_df['Regulation'] != 'No sig']
-
-                df = a.input_df.merge(
-                                b.input_df,
-                                how='outer',
-                                on=a.df_columns['geneID'],
-                                suffixes=('_a', '_b')
-                                )
-
-                df.loc[df['Regulation_a'].isnull(), 'Regulation_a'] = 'No sig'
-                df.loc[df['Regulation_b'].isnull(), 'Regulation_b'] = 'No sig'
-
-                df = df[['Regulation_a', 'Regulation_b']]
+                # Genes significant in any of both samples.
+                shown = (a_regulations != no_sig) | (b_regulations != no_sig)
 
                 colordict = {
                         'No sig' : "silver",
@@ -92,8 +91,8 @@ def generate_sankey_diagram(
                         }
 
                 sankey(
-                        df['Regulation_a'],
-                        df['Regulation_b'],
+                        pd.Series(labels[a_regulations[shown]]),
+                        pd.Series(labels[b_regulations[shown]]),
                         leftLabels=['Down', 'No sig', 'Up',],
                         rightLabels=['Down', 'No sig', 'Up',],
                         colorDict=colordict,
@@ -112,6 +111,7 @@ def generate_sankey_diagram(
                 plt.clf()
                 plt.close()
 
+
 # def generate_sankey_diagram(
 #         data,
 #         fc_value,
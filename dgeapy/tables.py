@@ -0,0 +1,1035 @@
+#!/usr/bin/env python3
+
+"""Reading of input tables through a shared on-disk cache.
+
+Every parsed TSV/XLSX table is also stored as a Parquet file in a cache
+directory shared by all the subcommands, so the next time any of them reads
+the same file with the same options it is loaded from the Parquet copy
+instead of being parsed again. Cache entries are keyed by the content hash of
+the file; its path, size and modification time, kept in an index entry of
+its own, are only used to avoid re-hashing unchanged files. The least
+recently used entries are removed once the cache grows past its size budget.
+The cache is only used when a cache directory is set.
+"""
+
+import os
+import bz2
+import glob
+import gzip
+import json
+import lzma
+import shutil
+import hashlib
+import argparse
+import threading
+import contextlib
+import importlib.util
+from concurrent.futures import wait
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # No file locks (e.g. on Windows): index entries are still replaced
+    # atomically and the threads of a run still wait for each other.
+    fcntl = None
+
+
+# Cache directory and size budget (in MB), set with the DGEAPY_CACHE_DIR and
+# DGEAPY_CACHE_SIZE environment variables. The cache is disabled unless
+# DGEAPY_CACHE_DIR is set to a directory.
+CACHE_DIR = os.path.expanduser(os.environ.get('DGEAPY_CACHE_DIR', ''))
+CACHE_SIZE = float(os.environ.get('DGEAPY_CACHE_SIZE', 2048))
+
+# Locks of the cache index entries, by entry file, that the threads of this
+# process hold while they update them.
+_index_entry_locks = {}
+_index_entry_locks_lock = threading.Lock()
+
+# Rows in an Excel worksheet, header included.
+EXCEL_MAX_ROWS = 1048576
+
+# Name of the consolidated workbook of a whole run and of the index sheet of
+# consolidated workbooks.
+WORKBOOK_NAME = 'tables'
+INDEX_SHEET_NAME = 'index'
+
+# Formats tables can be written in, and the default ones.
+OUTPUT_FORMATS = ['tsv', 'xlsx', 'parquet', 'feather']
+DEFAULT_OUTPUT_FORMATS = ['tsv']
+
+# Compression methods of TSV tables, by file extension.
+COMPRESSION_EXTENSIONS = {
+        '.gz' : 'gzip',
+        '.bz2' : 'bz2',
+        '.xz' : 'xz',
+        '.zst' : 'zstd',
+        }
+
+
+@dataclass
+class CompressionOptions:
+    """Compression of the TSV tables written by a command. <method> is one of
+    the COMPRESSION_EXTENSIONS extensions, without the dot, or None. <level>
+    None is the default level of the method and <threads> is the number of
+    compression threads (zstd only) or, when reading, whether decompression
+    runs in a separate thread.
+    """
+    method: str = None
+    level: int = None
+    threads: int = 1
+
+
+class StreamingXlsxWriter:
+    """Writes a table to an XLSX file chunk by chunk, with xlsxwriter's
+    constant_memory mode, so only the row being written is kept in memory.
+    Rows past the Excel limit go on to a new sheet. With <strings_to_numbers>,
+    numeric strings are written as numbers. Given a <workbook> (from
+    open_xlsx_workbook()), the sheets are added to it instead, named by
+    <get_sheet_name>, and it's left open on close().
+    """
+
+    def __init__(self, file_path, columns, strings_to_numbers=False,
+                 workbook=None, get_sheet_name=None):
+        self.owns_workbook = workbook is None
+        if workbook is None:
+            workbook = open_xlsx_workbook(file_path, strings_to_numbers)
+        self.workbook = workbook
+        self.get_sheet_name = get_sheet_name
+        self.columns = list(columns)
+        self.worksheet = None
+        self.sheet_names = []
+        self.row = EXCEL_MAX_ROWS
+
+    def add_worksheet(self):
+        sheet_name = None
+        if self.get_sheet_name is not None:
+            sheet_name = self.get_sheet_name()
+        self.worksheet = self.workbook.add_worksheet(sheet_name)
+        self.sheet_names.append(self.worksheet.get_name())
+        self.worksheet.write_row(0, 0, self.columns)
+        self.row = 1
+
+    def write(self, chunk):
+        """Appends the rows of a dataframe. Missing values are left blank.
+        """
+
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if self.row == EXCEL_MAX_ROWS:
+                self.add_worksheet()
+            self.worksheet.write_row(self.row, 0, row)
+            self.row += 1
+
+    def close(self):
+        if self.worksheet is None:
+            self.add_worksheet()
+        if self.owns_workbook:
+            self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConsolidatedWorkbooks:
+    """Collects the XLSX tables of a run, each on its own sheet, into a single
+    workbook in <root_dir> or, <by_category>, into one workbook for each
+    directory of <root_dir> the tables are written in. The first sheet of each
+    workbook is an index linking to the sheets with the path of each table.
+    Workbooks are written in constant memory and are complete once closed.
+    """
+
+    def __init__(self, root_dir, by_category=False):
+        self.root_dir = os.path.abspath(root_dir)
+        self.by_category = by_category
+        self.workbooks = {}
+
+    def get_workbook_file(self, file_path):
+        if not self.by_category:
+            return f'{self.root_dir}/{WORKBOOK_NAME}.xlsx'
+
+        category = os.path.relpath(
+                os.path.dirname(os.path.abspath(file_path)), self.root_dir
+                ).split(os.sep)[0]
+        if category in (os.curdir, os.pardir):
+            category = WORKBOOK_NAME
+
+        return f'{self.root_dir}/{category}.xlsx'
+
+    def open_workbook(self, workbook_file):
+        workbook = open_xlsx_workbook(workbook_file)
+        index_sheet = workbook.add_worksheet(INDEX_SHEET_NAME)
+        index_sheet.write_row(0, 0, ['sheet', 'table', 'rows', 'columns'])
+
+        self.workbooks[workbook_file] = {
+                'workbook' : workbook,
+                'index_sheet' : index_sheet,
+                'index_row' : 1,
+                'sheet_names' : {INDEX_SHEET_NAME.lower()},
+                }
+
+        return self.workbooks[workbook_file]
+
+    def write(self, table, file_path, index=True):
+        """Writes <table> on new sheet(s), named after the file name of
+        <file_path>, of its workbook. Returns the path of the workbook.
+        """
+
+        workbook_file = self.get_workbook_file(file_path)
+        entry = self.workbooks.get(workbook_file)
+        if entry is None:
+            entry = self.open_workbook(workbook_file)
+
+        table_name = os.path.relpath(os.path.abspath(file_path), self.root_dir)
+        base_name = get_sheet_name(os.path.basename(file_path))
+
+        def get_unique_sheet_name():
+            sheet_name = base_name
+            n = 1
+            while sheet_name.lower() in entry['sheet_names']:
+                n += 1
+                suffix = f'~{n}'
+                sheet_name = f'{base_name[:31 - len(suffix)]}{suffix}'
+            entry['sheet_names'].add(sheet_name.lower())
+
+            return sheet_name
+
+        table, columns = get_xlsx_columns(table, index)
+        with StreamingXlsxWriter(
+                workbook_file,
+                columns,
+                workbook=entry['workbook'],
+                get_sheet_name=get_unique_sheet_name,
+                ) as writer:
+            writer.write(table)
+
+        for sheet_name in writer.sheet_names:
+            row = entry['index_row']
+            entry['index_sheet'].write_url(
+                    row, 0, f"internal:'{sheet_name}'!A1", string=sheet_name
+                    )
+            entry['index_sheet'].write_row(
+                    row, 1, [table_name, len(table), len(columns)]
+                    )
+            entry['index_row'] += 1
+
+        return workbook_file
+
+    def close(self):
+        for entry in self.workbooks.values():
+            entry['workbook'].close()
+        self.workbooks = {}
+
+
+class BackgroundWriter:
+    """Writes tables in <threads> background threads, so the caller goes on
+    with its work while they are serialized and compressed. At most
+    <max_pending> (default is twice <threads>) writes are queued or running
+    at once: past that, submit() waits for one of them to finish, which
+    bounds the memory taken up by the tables waiting to be written. Writes
+    submitted as <serial> run one at a time, in the order they were
+    submitted. The error of a failed write is raised by the next submit() or
+    by flush().
+    """
+
+    def __init__(self, threads=2, max_pending=None):
+        self.pool = ThreadPoolExecutor(
+                threads, thread_name_prefix='dgeapy-writer'
+                )
+        self.serial_pool = ThreadPoolExecutor(
+                1, thread_name_prefix='dgeapy-serial-writer'
+                )
+        max_pending = 2 * threads if max_pending is None else max_pending
+        self.pending = threading.BoundedSemaphore(max_pending)
+        self.futures = []
+
+    def raise_errors(self):
+        """Raises the error of the first of the finished writes that failed.
+        """
+
+        futures = []
+        for future in self.futures:
+            if not future.done():
+                futures.append(future)
+            elif future.exception() is not None:
+                raise future.exception()
+        self.futures = futures
+
+    def submit(self, function, *args, serial=False, **kwargs):
+        """Runs function(*args, **kwargs) in the background.
+        """
+
+        self.raise_errors()
+
+        self.pending.acquire()
+        pool = self.serial_pool if serial else self.pool
+        try:
+            future = pool.submit(function, *args, **kwargs)
+        except BaseException:
+            self.pending.release()
+            raise
+        future.add_done_callback(lambda future: self.pending.release())
+        self.futures.append(future)
+
+        return future
+
+    def flush(self):
+        """Waits for all of the submitted writes and raises the error of the
+        first one that failed, if any.
+        """
+
+        futures, self.futures = self.futures, []
+        wait(futures)
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.pool.shutdown()
+            self.serial_pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@dataclass
+class OutputOptions:
+    """Formats (from OUTPUT_FORMATS) the tables of a command are written in,
+    compression of the TSV files and, if any, the ConsolidatedWorkbooks the
+    XLSX tables are written to instead of their own files and the
+    BackgroundWriter that writes them.
+    """
+    formats: list = field(default_factory=lambda: list(DEFAULT_OUTPUT_FORMATS))
+    compression: CompressionOptions = field(default_factory=CompressionOptions)
+    workbooks: ConsolidatedWorkbooks = None
+    writer: BackgroundWriter = None
+
+
+class StreamingTableWriter:
+    """Writes a table chunk by chunk in each of the formats of <output> (an
+    OutputOptions), adding the extension of the format to <file_path>. Values
+    are expected to be strings, as read with dtype=str, and are written as
+    they are; numeric strings become numbers in XLSX files only.
+    """
+
+    def __init__(self, file_path, columns, output):
+        self.columns = list(columns)
+        self.tsv = None
+        self.xlsx = None
+        self.arrow_writers = []
+        self.schema = None
+
+        for output_format in output.formats:
+            if output_format == 'tsv':
+                tsv_file = f'{file_path}.tsv'
+                if output.compression.method:
+                    tsv_file = f'{tsv_file}.{output.compression.method}'
+                self.tsv = open_compressed(tsv_file, 'w', output.compression)
+                pd.DataFrame(columns=self.columns).to_csv(
+                        self.tsv, sep='\t', index=False
+                        )
+
+            elif output_format == 'xlsx':
+                self.xlsx = StreamingXlsxWriter(
+                        f'{file_path}.xlsx', self.columns, strings_to_numbers=True
+                        )
+
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet
+
+                self.schema = pa.schema(
+                        [(str(column), pa.string()) for column in self.columns]
+                        )
+                if output_format == 'parquet':
+                    writer = pyarrow.parquet.ParquetWriter(
+                            f'{file_path}.parquet', self.schema
+                            )
+                else:
+                    writer = pa.ipc.new_file(
+                            f'{file_path}.feather', self.schema
+                            )
+                self.arrow_writers.append(writer)
+
+    def write(self, chunk):
+        """Appends the rows of a dataframe.
+        """
+
+        if self.tsv is not None:
+            chunk.to_csv(self.tsv, sep='\t', index=False, header=False)
+        if self.xlsx is not None:
+            self.xlsx.write(chunk)
+        if self.arrow_writers:
+            import pyarrow as pa
+
+            batch = pa.Table.from_pandas(
+                    chunk.set_axis(self.schema.names, axis=1),
+                    schema=self.schema,
+                    preserve_index=False,
+                    )
+            for writer in self.arrow_writers:
+                writer.write_table(batch)
+
+    def close(self):
+        if self.tsv is not None:
+            self.tsv.close()
+        if self.xlsx is not None:
+            self.xlsx.close()
+        for writer in self.arrow_writers:
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+#-------# Function definitions #-----------------------------------------------#
+
+
+def parse_output_formats(formats):
+    """Parses the comma-separated list of formats given to --outputs.
+    """
+
+    formats = [x.strip().lower() for x in formats.split(',') if x.strip()]
+    for output_format in formats:
+        if output_format not in OUTPUT_FORMATS:
+            raise argparse.ArgumentTypeError(
+                    f"unknown format '{output_format}', choose from " \
+                    f"{','.join(OUTPUT_FORMATS)}"
+                    )
+    if not formats:
+        raise argparse.ArgumentTypeError('at least one format is required')
+
+    # Each format only once, in the given order.
+    return list(dict.fromkeys(formats))
+
+
+def add_output_arguments(parser):
+    """Adds the output format and compression options to a command's parser.
+    """
+
+    output = parser.add_argument_group('output formats')
+    output.add_argument(
+            '--outputs',
+            metavar='FORMAT,',
+            type=parse_output_formats,
+            default=list(DEFAULT_OUTPUT_FORMATS),
+            help='comma-separated formats of the output tables, any of ' \
+                 f'{",".join(OUTPUT_FORMATS)}, default is ' \
+                 f'{",".join(DEFAULT_OUTPUT_FORMATS)}'
+            )
+    output.add_argument(
+            '--compress',
+            metavar='{gz,bz2,xz,zst}',
+            type=str,
+            choices=[ext[1:] for ext in COMPRESSION_EXTENSIONS],
+            help='compress the output TSV tables with gzip, bzip2, xz or zstd'
+            )
+    output.add_argument(
+            '--compress-level',
+            metavar='INT',
+            type=int,
+            help='compression level, default is the default of each method'
+            )
+    output.add_argument(
+            '--threads',
+            metavar='INT',
+            type=int,
+            default=1,
+            help='with more than 1, compressed inputs are decompressed ' \
+                 'while they are parsed and zstd outputs are compressed ' \
+                 'with this many threads, default is 1'
+            )
+
+
+def get_output_options(args):
+    """Returns the OutputOptions set with add_output_arguments().
+    """
+
+    return OutputOptions(
+            formats=args.outputs,
+            compression=CompressionOptions(
+                method=args.compress,
+                level=args.compress_level,
+                threads=args.threads,
+                ),
+            )
+
+
+def get_compression_extension(file_path):
+    """Returns the compression extension of a file ('.gz', '.bz2', '.xz' or
+    '.zst'), or an empty string.
+    """
+
+    for ext in COMPRESSION_EXTENSIONS:
+        if file_path.endswith(ext):
+            return ext
+
+    return ''
+
+
+def get_table_name(file_path):
+    """Returns the file name of a table without its compression extension,
+    which output file names are built on.
+    """
+
+    file_name = file_path.split('/')[-1]
+
+    return file_name[:len(file_name) - len(get_compression_extension(file_name))]
+
+
+def open_compressed(file_path, mode='rb', compression=None):
+    """Opens a file, compressed or not depending on its extension. When
+    writing, the level and threads of <compression> (a CompressionOptions)
+    are used.
+    """
+
+    ext = get_compression_extension(file_path)
+    level = compression.level if compression is not None else None
+    threads = compression.threads if compression is not None else 1
+    text_mode = {}
+    if 'b' not in mode:
+        text_mode = {'encoding' : 'utf-8', 'newline' : ''}
+        if ext and 't' not in mode:
+            mode = f'{mode}t'
+    writing = 'r' not in mode
+
+    if ext == '.gz':
+        if writing and level is not None:
+            return gzip.open(file_path, mode, compresslevel=level, **text_mode)
+        return gzip.open(file_path, mode, **text_mode)
+
+    if ext == '.bz2':
+        if writing and level is not None:
+            return bz2.open(file_path, mode, compresslevel=level, **text_mode)
+        return bz2.open(file_path, mode, **text_mode)
+
+    if ext == '.xz':
+        if writing and level is not None:
+            return lzma.open(file_path, mode, preset=level, **text_mode)
+        return lzma.open(file_path, mode, **text_mode)
+
+    if ext == '.zst':
+        import zstandard
+
+        if writing:
+            cctx = zstandard.ZstdCompressor(
+                    level=3 if level is None else level,
+                    threads=threads if threads > 1 else 0,
+                    )
+            return zstandard.open(file_path, mode, cctx=cctx, **text_mode)
+        return zstandard.open(file_path, mode, **text_mode)
+
+    return open(file_path, mode, **text_mode)
+
+
+@contextlib.contextmanager
+def decompress_in_background(file_path):
+    """Yields a pipe that another thread fills with the decompressed contents
+    of <file_path>, so that decompression (which releases the GIL) overlaps
+    with the reading of the pipe.
+    """
+
+    read_fd, write_fd = os.pipe()
+    errors = []
+
+    def decompress():
+        # The pipe is opened first so that it's closed, and the parser sees
+        # the end of the data, whatever happens to the compressed file.
+        try:
+            with (
+                    open(write_fd, 'wb') as pipe,
+                    open_compressed(file_path, 'rb') as source,
+                    ):
+                shutil.copyfileobj(source, pipe, 1 << 20)
+        except BrokenPipeError:
+            # The parser stopped early (e.g. nrows).
+            pass
+        except Exception as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=decompress, daemon=True)
+    thread.start()
+    try:
+        with open(read_fd, 'rb') as pipe:
+            yield pipe
+    except Exception:
+        thread.join()
+        # A decompression error explains the parsing one.
+        if errors:
+            raise errors[0] from None
+        raise
+    thread.join()
+
+    if errors:
+        raise errors[0]
+
+
+def read_csv_in_background(file_path, **kwargs):
+    """Reads a compressed TSV table while another thread decompresses it.
+    """
+
+    with decompress_in_background(file_path) as pipe:
+        return pd.read_csv(pipe, sep='\t', **kwargs)
+
+
+def read_table_file(file_path, threads=1, **kwargs):
+    """Reads a table with pandas, with read_excel() for .xlsx files and
+    read_csv() for tab-separated files, which can be compressed (.gz, .bz2,
+    .xz or .zst). With more than 1 <threads>, compressed tables are
+    decompressed in a separate thread. <kwargs> are passed to the reader.
+    """
+
+    if file_path.endswith('.xlsx'):
+        return pd.read_excel(file_path, **kwargs)
+
+    if threads > 1 and get_compression_extension(file_path):
+        return read_csv_in_background(file_path, **kwargs)
+
+    return pd.read_csv(file_path, sep='\t', **kwargs)
+
+
+def read_table_chunks(file_path, chunksize, threads=1, **kwargs):
+    """Reads a TSV table like read_table_file(), but yields it in dataframes
+    of <chunksize> rows as they're parsed. With more than 1 <threads>,
+    compressed tables are decompressed in a separate thread while the chunks
+    are parsed and used.
+    """
+
+    if threads > 1 and get_compression_extension(file_path):
+        with (
+                decompress_in_background(file_path) as pipe,
+                pd.read_csv(
+                    pipe, sep='\t', chunksize=chunksize, **kwargs
+                    ) as reader,
+                ):
+            yield from reader
+        return
+
+    with pd.read_csv(
+            file_path, sep='\t', chunksize=chunksize, **kwargs
+            ) as reader:
+        yield from reader
+
+
+def write_tsv(table, file_path, compression=None, **kwargs):
+    """Writes a table as a TSV file, compressed as set in <compression> (a
+    CompressionOptions), whose extension is added to <file_path>. <kwargs>
+    are passed to to_csv(). Returns the path of the written file.
+    """
+
+    kwargs.setdefault('sep', '\t')
+    if compression is not None and compression.method:
+        file_path = f'{file_path}.{compression.method}'
+
+    with open_compressed(file_path, 'w', compression) as f:
+        table.to_csv(f, **kwargs)
+
+    return file_path
+
+
+def open_xlsx_workbook(file_path, strings_to_numbers=False):
+    """Opens an xlsxwriter workbook in constant_memory mode.
+    """
+
+    import xlsxwriter
+
+    return xlsxwriter.Workbook(
+            file_path,
+            {
+                'constant_memory' : True,
+                'strings_to_numbers' : strings_to_numbers,
+                'nan_inf_to_errors' : True,
+            },
+            )
+
+
+def get_sheet_name(name):
+    """Turns <name> into a valid Excel sheet name.
+    """
+
+    for character in '[]:*?/\\':
+        name = name.replace(character, '_')
+    name = name.strip("'")[:31]
+
+    return name if name else 'Sheet'
+
+
+def get_xlsx_columns(table, index=True):
+    """Returns the table with its index, if <index>, as the first column(s)
+    and the header of the XLSX sheet.
+    """
+
+    columns = table.columns.values.tolist()
+    if index:
+        columns = [
+                '' if name is None else name for name in table.index.names
+                ] + columns
+        table = table.reset_index()
+
+    return table, columns
+
+
+def write_xlsx(table, file_path, index=True):
+    """Writes a table as an XLSX file with StreamingXlsxWriter, whose time
+    grows linearly with the size of the table. Falls back on pandas'
+    to_excel() when xlsxwriter is not installed.
+    """
+
+    if importlib.util.find_spec('xlsxwriter') is None:
+        table.to_excel(file_path, index=index)
+        return
+
+    table, columns = get_xlsx_columns(table, index)
+    with StreamingXlsxWriter(file_path, columns) as writer:
+        writer.write(table)
+
+
+def get_output_file(file_path, output_format, output):
+    """Returns the path of the file a table written to <file_path> in
+    <output_format> ends up in.
+    """
+
+    if output_format == 'xlsx' and output.workbooks is not None:
+        return output.workbooks.get_workbook_file(file_path)
+
+    output_file = f'{file_path}.{output_format}'
+    if output_format == 'tsv' and output.compression.method:
+        output_file = f'{output_file}.{output.compression.method}'
+
+    return output_file
+
+
+def write_table_format(table, file_path, output_format, output, index=True,
+                       **kwargs):
+    """Writes a table in one of OUTPUT_FORMATS, see write_table().
+    """
+
+    output_file = f'{file_path}.{output_format}'
+    if output_format == 'tsv':
+        write_tsv(
+                table,
+                output_file,
+                output.compression,
+                index=index,
+                **kwargs,
+                )
+    elif output_format == 'xlsx' and output.workbooks is not None:
+        output.workbooks.write(table, file_path, index)
+    elif output_format == 'xlsx':
+        write_xlsx(table, output_file, index)
+    elif output_format == 'parquet':
+        table.to_parquet(output_file, index=index)
+    elif output_format == 'feather':
+        # Feather files can't hold an index.
+        table.reset_index(drop=not index).to_feather(output_file)
+
+
+def write_table(table, file_path, output=None, index=True, **kwargs):
+    """Writes a table in each of the formats of <output> (an OutputOptions),
+    adding the extension of the format to <file_path>. The index is written
+    as the first column(s) if <index>. <kwargs> are passed to to_csv().
+    With a BackgroundWriter in <output>, the files are written in the
+    background and the table must not be modified afterwards. Returns the
+    paths of the files.
+    """
+
+    output = OutputOptions() if output is None else output
+    written_files = []
+
+    for output_format in output.formats:
+        if output.writer is None:
+            write_table_format(
+                    table, file_path, output_format, output, index, **kwargs
+                    )
+        else:
+            # Sheets are added to consolidated workbooks one at a time, in
+            # the order the tables are written.
+            output.writer.submit(
+                    write_table_format,
+                    table,
+                    file_path,
+                    output_format,
+                    output,
+                    index,
+                    serial=output_format == 'xlsx'
+                           and output.workbooks is not None,
+                    **kwargs,
+                    )
+
+        output_file = get_output_file(file_path, output_format, output)
+        if output_file not in written_files:
+            written_files.append(output_file)
+
+    return written_files
+
+
+def close_output(output):
+    """Waits for the tables being written in the background and closes the
+    consolidated workbooks of <output>. Errors of the background writes are
+    raised.
+    """
+
+    try:
+        if output.writer is not None:
+            output.writer.close()
+    finally:
+        if output.workbooks is not None:
+            output.workbooks.close()
+
+
+def get_tmp_suffix():
+    """Returns a suffix for temporary files unique to the calling thread, so
+    that concurrent reads (from other runs or threads) never write to the
+    same file.
+    """
+
+    return f'{os.getpid()}.{threading.get_ident()}'
+
+
+def get_index_entry_file(cache_dir, file_path):
+    """Returns the path of the cache index entry of <file_path>. Each file
+    has an entry of its own, so reads of different files never update the
+    same one.
+    """
+
+    key = hashlib.sha256(file_path.encode()).hexdigest()[:32]
+
+    return f'{cache_dir}/index/{key}.json'
+
+
+@contextlib.contextmanager
+def lock_index_entry(entry_file):
+    """Holds the lock of a cache index entry while it's read and updated: the
+    threads of this process wait for each other on a threading.Lock and
+    other processes on a lock of <entry_file>.lock.
+    """
+
+    with _index_entry_locks_lock:
+        thread_lock = _index_entry_locks.setdefault(entry_file, threading.Lock())
+
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+
+        with open(f'{entry_file}.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_index_entry(entry_file):
+    """Reads a {path, size, mtime_ns, sha256} cache index entry, or returns
+    None.
+    """
+
+    try:
+        with open(entry_file, 'r') as j:
+            return json.loads(j.read())
+    except (OSError, ValueError):
+        return None
+
+
+def write_index_entry(entry_file, entry):
+    """Stores a cache index entry. It's written under a temporary name first
+    so that concurrent runs never read a partial file.
+    """
+
+    tmp_file = f'{entry_file[:-len(".json")]}.{get_tmp_suffix()}.tmp'
+    try:
+        with open(tmp_file, 'w') as j:
+            j.write(json.dumps(entry))
+        os.replace(tmp_file, entry_file)
+    except OSError:
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def get_file_digest(file_path, cache_dir):
+    """Returns the SHA-256 hex digest of a file. The digest is only computed
+    again when the file's size or modification time change. Concurrent reads
+    of the same file wait for the one computing it.
+    """
+
+    os.makedirs(f'{cache_dir}/index', exist_ok=True)
+    entry_file = get_index_entry_file(cache_dir, file_path)
+
+    with lock_index_entry(entry_file):
+        stat = os.stat(file_path)
+        entry = read_index_entry(entry_file)
+        if (
+                entry is not None
+                and entry.get('path') == file_path
+                and entry['size'] == stat.st_size
+                and entry['mtime_ns'] == stat.st_mtime_ns
+                ):
+            return entry['sha256']
+
+        with open(file_path, 'rb') as f:
+            digest = hashlib.file_digest(f, 'sha256').hexdigest()
+
+        write_index_entry(entry_file, {
+                'path' : file_path,
+                'size' : stat.st_size,
+                'mtime_ns' : stat.st_mtime_ns,
+                'sha256' : digest,
+                })
+
+    return digest
+
+
+def get_cache_file(file_path, cache_dir, kwargs):
+    """Returns the path of the cached copy of a table read with <kwargs>.
+    """
+
+    digest = get_file_digest(file_path, cache_dir)
+    options = hashlib.sha256(
+            repr((file_path.endswith('.xlsx'), sorted(kwargs.items()))).encode()
+            ).hexdigest()
+
+    return f'{cache_dir}/{digest[:32]}.{options[:16]}.parquet'
+
+
+def evict_cache_files(cache_dir, cache_size):
+    """Removes the least recently used cache files until the cache takes up
+    less than <cache_size> MB.
+    """
+
+    cache_files = []
+    for cache_file in glob.glob(f'{glob.escape(cache_dir)}/*.parquet'):
+        try:
+            stat = os.stat(cache_file)
+        except OSError:
+            continue
+        cache_files.append((stat.st_mtime_ns, stat.st_size, cache_file))
+
+    total_size = sum(size for _, size, _ in cache_files)
+    for _, size, cache_file in sorted(cache_files):
+        if total_size <= cache_size * 1024**2:
+            break
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+        total_size -= size
+
+
+def restore_missing_values(table):
+    """Parquet stores missing strings as nulls, which pandas reads back as
+    None. Turns them into NaN again, as read_csv() and read_excel() do.
+    """
+
+    for column in table.columns[table.dtypes == object]:
+        if table[column].isna().any():
+            table[column] = table[column].fillna(np.nan)
+
+    return table
+
+
+def select_columns(table, columns=None, dtype=None):
+    """Keeps only <columns> of <table>, in that order, and casts them to
+    <dtype> ({column : dtype}).
+    """
+
+    if columns is not None:
+        table = table[list(columns)]
+    if dtype:
+        table = table.astype(dtype)
+
+    return table
+
+
+def read_table_columns(file_path, columns=None, dtype=None, threads=1,
+                       **kwargs):
+    """Reads only <columns> of a table, cast to <dtype>, without the cache.
+    """
+
+    table = read_table_file(
+            file_path, threads, usecols=columns, dtype=dtype, **kwargs
+            )
+
+    return select_columns(table, columns)
+
+
+def read_table(file_path, columns=None, dtype=None, cache_dir=None,
+               cache_size=None, threads=1, **kwargs):
+    """Reads a TSV or XLSX table like read_table_file(), going through the
+    Parquet cache in <cache_dir> (default is CACHE_DIR, no cache if empty).
+    Only <columns> are returned, if given, cast to <dtype>. The cache always
+    holds the whole table, so reads of different columns of a file share the
+    same entry and cache hits only load the requested columns. Tables that
+    can't be stored as Parquet (or a missing pyarrow) are just read every
+    time. <threads> is passed to read_table_file().
+    """
+
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    cache_size = CACHE_SIZE if cache_size is None else cache_size
+    file_path = os.path.abspath(file_path)
+
+    if not cache_dir:
+        return read_table_columns(file_path, columns, dtype, threads, **kwargs)
+
+    try:
+        import pyarrow
+    except ImportError:
+        return read_table_columns(file_path, columns, dtype, threads, **kwargs)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_file = get_cache_file(file_path, cache_dir, kwargs)
+    except OSError:
+        # A read-only cache directory just disables the cache.
+        return read_table_columns(file_path, columns, dtype, threads, **kwargs)
+
+    if os.path.isfile(cache_file):
+        try:
+            table = pd.read_parquet(cache_file, columns=columns)
+            # The modification time of a cache file is its last use.
+            os.utime(cache_file)
+
+            return select_columns(restore_missing_values(table), dtype=dtype)
+
+        except (OSError, ValueError, pyarrow.ArrowException):
+            pass
+
+    table = read_table_file(file_path, threads, **kwargs)
+
+    tmp_file = f'{cache_file[:-len(".parquet")]}.{get_tmp_suffix()}.tmp'
+    try:
+        table.to_parquet(tmp_file)
+        os.replace(tmp_file, cache_file)
+        evict_cache_files(cache_dir, cache_size)
+
+    except (
+            OSError,
+            ValueError,
+            TypeError,
+            NotImplementedError,
+            pyarrow.ArrowException,
+            ):
+        # e.g. non-string column names or columns mixing numbers and
+        # strings, which Parquet can't store.
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+
+    return select_columns(table, columns, dtype)
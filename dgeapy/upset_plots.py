@@ -3,8 +3,60 @@
 """Upset plot generation functions. Uses matplotlib and UpSetPlot
 """
 
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
-from upsetplot import from_contents, UpSet
+from upsetplot import UpSet
+
+from dgeapy.intersections import get_membership_codes
+
+
+def generate_upset_plot_from_codes(
+        genes,
+        codes,
+        names,
+        plot_formats,
+        title,
+        path,
+        ):
+    """Generate Upset plot from the gene IDs and membership codes (as given
+    by get_membership_codes()) of any number of sets and their respective
+    names.
+    """
+
+    plt.style.use(['default'])
+
+    # Same data upsetplot.from_contents() would make out of the sets: one
+    # boolean column for each set and the gene IDs in the 'id' column.
+    upset_sets = pd.DataFrame({
+            name : (codes & np.uint64(1 << i)) != 0
+            for i, name in enumerate(names)
+            })
+    upset_sets['id'] = genes
+    upset_sets = upset_sets.set_index(list(names))
+
+    upset_plot = UpSet(
+                    upset_sets,
+                    subset_size="count",
+                    show_counts="{:d}",
+                    sort_by="cardinality",
+                    element_size=55,
+                    sort_categories_by='-input',
+                    ).plot()
+
+    plt.suptitle(title)
+
+    for format in plot_formats:
+        plt.savefig(f"{path}.{format}", dpi=300)
+
+        if format == "png":
+            plt.savefig(
+                    f"{path}_transparent-bg.{format}",
+                    dpi=300,
+                    transparent=True
+                    )
+
+    plt.close()
 
 
 def generate_upset_plot(
@@ -24,95 +76,22 @@ def generate_upset_plot(
     respective mutant names.
     """
 
-    plt.style.use(['default'])
-
-    if mutant3_gene_set is not None and mutant4_gene_set is None:
-        upset_sets = from_contents({
-                        mutant1_name : list(mutant1_gene_set),
-                        mutant2_name : list(mutant2_gene_set),
-                        mutant3_name : list(mutant3_gene_set),
-                        })
-
-        upset_plot = UpSet(
-                        upset_sets,
-                        subset_size="count",
-                        show_counts="{:d}",
-                        sort_by="cardinality",
-                        element_size=55,
-                        sort_categories_by='-input',
-                        ).plot()
-
-        plt.suptitle(title)
-
-        for format in plot_formats:
-            plt.savefig(f"{path}.{format}", dpi=300)
-
-            if format == "png":
-                plt.savefig(
-                        f"{path}_transparent-bg.{format}",
-                        dpi=300,
-                        transparent=True
-                        )
-
-        plt.close()
-
-    elif mutant3_gene_set is not None and mutant4_gene_set is not None:
-        upset_sets = from_contents({
-                        mutant1_name : list(mutant1_gene_set),
-                        mutant2_name : list(mutant2_gene_set),
-                        mutant3_name : list(mutant3_gene_set),
-                        mutant4_name : list(mutant4_gene_set),
-                        })
-
-        upset_plot = UpSet(
-                        upset_sets,
-                        subset_size="count",
-                        show_counts="{:d}",
-                        sort_by="cardinality",
-                        element_size=55,
-                        sort_categories_by='-input',
-                        ).plot()
-
-        plt.suptitle(title)
-
-        for format in plot_formats:
-            plt.savefig(f"{path}.{format}", dpi=300)
-
-            if format == "png":
-                plt.savefig(
-                        f"{path}_transparent-bg.{format}",
-                        dpi=300,
-                        transparent=True
-                        )
-
-        plt.close()
-
-    else:
-        upset_sets = from_contents({
-                        mutant1_name : list(mutant1_gene_set),
-                        mutant2_name : list(mutant2_gene_set),
-                        })
-
-        upset_plot = UpSet(
-                        upset_sets,
-                        subset_size="count",
-                        show_counts="{:d}",
-                        sort_by="cardinality",
-                        sort_categories_by='-input',
-                        element_size=55,
-                        ).plot()
-
-        plt.suptitle(title)
-
-        for format in plot_formats:
-            plt.savefig(f"{path}.{format}", dpi=300)
-
-            if format == "png":
-                plt.savefig(
-                        f"{path}_transparent-bg.{format}",
-                        dpi=300,
-                        transparent=True
-                        )
-
-        plt.close()
-
+    gene_sets = [mutant1_gene_set, mutant2_gene_set]
+    names = [mutant1_name, mutant2_name]
+    if mutant3_gene_set is not None:
+        gene_sets.append(mutant3_gene_set)
+        names.append(mutant3_name)
+        if mutant4_gene_set is not None:
+            gene_sets.append(mutant4_gene_set)
+            names.append(mutant4_name)
+
+    genes, codes = get_membership_codes(gene_sets)
+
+    generate_upset_plot_from_codes(
+            genes,
+            codes,
+            names,
+            plot_formats,
+            title,
+            path,
+            )
@@ -9,6 +9,10 @@ from matplotlib_venn import venn2, venn2_unweighted, venn3, venn3_unweighted
 from venn import venn, draw_venn, generate_petal_labels, generate_colors
 
 
+# Most sets a Venn diagram is drawn for.
+MAX_VENN_SETS = 4
+
+
 def generate_venn2_diagram(
         mutant1_gene_set,
         mutant1_name,
@@ -610,3 +614,38 @@ def generate_venn4_diagram_with_regulation_labels(
     # Clears current figure
     plt.close()
 
+
+def generate_venn_diagram(
+        gene_sets,
+        names,
+        plot_formats,
+        title,
+        path,
+        ):
+    """Generate a Venn diagram from a list of 2 up to MAX_VENN_SETS sets and
+    a list of their respective names.
+    """
+
+    if not 2 <= len(gene_sets) <= MAX_VENN_SETS:
+        raise ValueError(
+                f'Venn diagrams need 2 to {MAX_VENN_SETS} sets, ' \
+                f'got {len(gene_sets)}'
+                )
+
+    generate_venn = {
+            2 : generate_venn2_diagram,
+            3 : generate_venn3_diagram,
+            4 : generate_venn4_diagram,
+            }[len(gene_sets)]
+
+    sets_kwargs = {}
+    for i, (gene_set, name) in enumerate(zip(gene_sets, names), start=1):
+        sets_kwargs[f'mutant{i}_gene_set'] = gene_set
+        sets_kwargs[f'mutant{i}_name'] = name
+
+    generate_venn(
+            **sets_kwargs,
+            plot_formats=plot_formats,
+            title=title,
+            path=path,
+            )
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""
+Assign a function to each gene straight from its GO codes. Does the work of
+go2ancestors followed by assert-function in a single step, without writing
+the GO ancestors to any intermediate table.
+"""
+
+import os
+import sys
+import argparse
+
+from dgeapy.tables import read_table
+from dgeapy.tables import add_output_arguments
+from dgeapy.tables import get_output_options
+from dgeapy.tables import get_table_name
+from dgeapy.tables import write_table
+from dgeapy.utilities import read_config_json_file
+from dgeapy.go_ancestors import load_go_ancestor_closure
+from dgeapy.function_index import build_function_index
+from dgeapy.function_index import annotate_functions
+from dgeapy.parallel import map_row_shards
+
+
+# <http://purl.obolibrary.org/obo/go.obo>
+# path changed for GitHub
+GO_OBO = os.environ.get(
+        'DGEAPY_GO_OBO',
+        '../data/gene_onthology_obo/go.obo'
+        )
+
+
+def main(argv=None):
+
+    description = """The script reads the JSON file to extract the function names and their associated GO codes and KEGG pathways, and loads the ancestors of every GO term from the provided GO ontology file. It then assigns functions to each entry of the input table based on its GO codes, the ancestors of its GO codes, or its KEGG pathways. The result is the same as running go2ancestors and then assert-function, without writing the GO ancestors anywhere.
+
+The annotated table is saved in the formats given by --outputs (TSV by default) with "_functions" appended to the original file name.
+    """
+
+    parser = argparse.ArgumentParser(
+            description=description, usage='dgeapy.py annotate [args]'
+            )
+
+    input = parser.add_argument_group('input')
+    input.add_argument(
+            '-j', '--json',
+            metavar='<config.json>',
+            type=str,
+            help='JSON file containing function name as key and a list of ' \
+                 'all the selected GO codes as value'
+                 )
+    input.add_argument(
+            '-t', '--table',
+            metavar='<table.tsv>',
+            type=str,
+            help='input table'
+                )
+    input.add_argument(
+            '-on',
+            metavar='STR',
+            type=str,
+            default='Gene Ontology IDs',
+            help='column on <table.tsv> that contains GO codes for each ' \
+                 'gene, default is "Gene Ontology IDs"'
+                 )
+    input.add_argument(
+            '--obo',
+            metavar='<go.obo>',
+            type=str,
+            default=GO_OBO,
+            help='GO ontology file, default is $DGEAPY_GO_OBO or ' \
+                 '../data/gene_onthology_obo/go.obo'
+                 )
+    parser.add_argument(
+            '-s', '--strict',
+            action='store_true',
+            default=False,
+            help='only consider "is_a" GO relationships, on default both ' \
+                 '"is_a" and "regulates" are considered'
+            )
+
+    parser.add_argument(
+            '--jobs',
+            metavar='INT',
+            type=int,
+            default=1,
+            help='number of processes the rows of <table.tsv> are split ' \
+                 'across, default is 1'
+            )
+    add_output_arguments(parser)
+
+    args = parser.parse_args(argv)
+    output = get_output_options(args)
+
+    if not args.json:
+        parser.print_help()
+        sys.exit("\n** The <config.json> file is required **\n")
+    if not args.table:
+        parser.print_help()
+        sys.exit("\n** The <table.tsv> file is required **\n")
+    if args.jobs < 1:
+        parser.print_help()
+        sys.exit("\n** --jobs must be at least 1 **\n")
+
+    json_file = os.path.abspath(args.json)
+    table_file = os.path.abspath(args.table)
+    obo_file = os.path.abspath(args.obo)
+    if not os.path.isfile(json_file):
+        raise FileNotFoundError(f'Could not find file: {json_file}')
+    if not os.path.isfile(table_file):
+        raise FileNotFoundError(f'Could not find file: {table_file}')
+    if not os.path.isfile(obo_file):
+        raise FileNotFoundError(f'Could not find file: {obo_file}')
+
+    function_dict = read_config_json_file(json_file)
+    go_ancestors = load_go_ancestor_closure(obo_file)
+
+    table = read_table(table_file, threads=args.threads)
+
+    go_codes_column = args.on
+    kegg_pathways_column = 'kegg_pathways'
+
+    table.insert(
+            loc=(len(table.columns.values.tolist())),
+            column='function',
+            value=map_row_shards(
+                annotate_functions,
+                table[[go_codes_column, kegg_pathways_column]],
+                args.jobs,
+                go_ancestors=go_ancestors,
+                shared={'function_index' : build_function_index(function_dict)},
+                go_codes_column=go_codes_column,
+                kegg_pathways_column=kegg_pathways_column,
+                strict=args.strict,
+                ),
+            )
+
+    write_table(
+            table,
+            f'{get_table_name(table_file)}_functions',
+            output,
+            index=False
+            )
+
+
+if __name__ == "__main__":
+    main()
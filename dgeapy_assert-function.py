@@ -8,18 +8,22 @@ import sys
 import argparse
 import pdb
 
-import numpy as np
-import pandas as pd
-from pandas.core.api import notnull
-
+from dgeapy.tables import read_table
+from dgeapy.tables import add_output_arguments
+from dgeapy.tables import get_output_options
+from dgeapy.tables import get_table_name
+from dgeapy.tables import write_table
 from dgeapy.utilities import read_config_json_file
+from dgeapy.function_index import build_function_index
+from dgeapy.function_index import assign_functions
+from dgeapy.parallel import map_row_shards
 
 
-def main():
+def main(argv=None):
 
-    description = """The script reads the JSON file to extract the function names and their associated GO codes and KEGG pathways. It then loads the input table and iterates over each row, assigning functions to entries based on the provided annotations. The annotations can be GO codes, GO ancestors, or KEGG pathways.
+    description = """The script reads the JSON file to extract the function names and their associated GO codes and KEGG pathways. It then loads the input table and assigns functions to entries based on the provided annotations. The annotations can be GO codes, GO ancestors, or KEGG pathways.
 
-The annotated table is saved as a new TSV and XLSX file with "_functions" appended to the original file name.
+The annotated table is saved in the formats given by --outputs (TSV by default) with "_functions" appended to the original file name.
     """
 
     parser = argparse.ArgumentParser(
@@ -48,7 +52,18 @@ The annotated table is saved as a new TSV and XLSX file with "_functions" append
                  '"is_a" and "regulates" are considered'
             )
 
-    args = parser.parse_args()
+    parser.add_argument(
+            '--jobs',
+            metavar='INT',
+            type=int,
+            default=1,
+            help='number of processes the rows of <table.tsv> are split ' \
+                 'across, default is 1'
+            )
+    add_output_arguments(parser)
+
+    args = parser.parse_args(argv)
+    output = get_output_options(args)
 
     if not args.json:
         parser.print_help()
@@ -56,6 +71,9 @@ The annotated table is saved as a new TSV and XLSX file with "_functions" append
     if not args.table:
         parser.print_help()
         sys.exit("\n** The <table.tsv> file is required **\n")
+    if args.jobs < 1:
+        parser.print_help()
+        sys.exit("\n** --jobs must be at least 1 **\n")
 
     json_file = os.path.abspath(args.json)
     table_file = os.path.abspath(args.table)
@@ -66,10 +84,7 @@ The annotated table is saved as a new TSV and XLSX file with "_functions" append
 
     function_dict = read_config_json_file(json_file)
 
-    if table_file.endswith('.xlsx'):
-        table = pd.read_excel(table_file)
-    else:
-        table = pd.read_csv(table_file, sep='\t')
+    table = read_table(table_file, threads=args.threads)
 
     go_codes_column = 'Gene Ontology IDs'
     ancestors_column = 'go_ancestors_is_a_and_regulates'
@@ -77,68 +92,28 @@ The annotated table is saved as a new TSV and XLSX file with "_functions" append
     if args.strict is True:
         ancestors_column = 'go_ancestors_is_a'
 
+    # GO codes are looked up in an inverted index (GO code -> function)
+    # compiled once from the JSON file.
+    function_index = build_function_index(function_dict)
+
     table.insert(
             loc=(len(table.columns.values.tolist())),
             column='function',
-            value=[np.nan] * table.shape[0]
+            value=map_row_shards(
+                assign_functions,
+                table[[go_codes_column, ancestors_column, kegg_pathways_column]],
+                args.jobs,
+                shared={'function_index' : function_index},
+                go_codes_column=go_codes_column,
+                ancestors_column=ancestors_column,
+                kegg_pathways_column=kegg_pathways_column,
+                ),
             )
 
-    for index, row in table.iterrows():
-        if pd.isnull(row[go_codes_column]) and pd.isnull(row[ancestors_column]) and pd.isnull(row[kegg_pathways_column]):
-            table.at[index, 'function'] = 'not annotated'
-
-        if pd.notnull(row[go_codes_column]):
-            go_codes = str(row[go_codes_column]).split(';')
-
-            for code in go_codes:
-                code = code.strip()
-                for key in function_dict:
-                    if code in function_dict[key]['GO']:
-                        table.at[
-                                index,'function'
-                                ] = key
-                        break
-                if pd.notnull(table.at[index, 'function']):
-                    break
-
-        if pd.notnull(row[ancestors_column]):
-            if pd.isnull(table.at[index, 'function']):
-                ancestor_codes = str(row[ancestors_column]).split(';')
-
-                for ancestor in ancestor_codes:
-                    for key in function_dict:
-                        if ancestor in function_dict[key]['GO']:
-                            table.at[
-                                    index,'function'
-                                    ] = key
-                            break
-                    if pd.notnull(table.at[index, 'function']):
-                        break
-
-        if pd.notnull(row[kegg_pathways_column]):
-            if pd.isnull(table.at[index, 'function']):
-                kegg_pathways = str(row[kegg_pathways_column])
-
-                for key in function_dict:
-                    for pathway in function_dict[key]['KEGG']:
-                        if pathway in kegg_pathways:
-                            table.at[
-                                    index,'function'
-                                    ] = key
-                            break
-                    if pd.notnull(table.at[index, 'function']):
-                        break
-        if pd.isnull(table.at[index, 'function']):
-            table.at[index, 'function'] = 'others'
-
-
-    table.to_csv(
-            f'{table_file.split("/")[-1]}_functions.tsv',
-            sep='\t',
-            index=False
-            )
-    table.to_excel(
-            f'{table_file.split("/")[-1]}_functions.xlsx',
+    write_table(
+            table,
+            f'{get_table_name(table_file)}_functions',
+            output,
             index=False
             )
 
@@ -5,17 +5,27 @@
 
 import os
 import sys
+import time
 import argparse
 
-import pandas as pd
+from dgeapy.tables import read_table
+from dgeapy.tables import read_table_file
+from dgeapy.tables import read_table_chunks
+from dgeapy.tables import add_output_arguments
+from dgeapy.tables import get_output_options
+from dgeapy.tables import get_table_name
+from dgeapy.tables import write_table
+from dgeapy.tables import StreamingTableWriter
 
 
 
-def main():
+def main(argv=None):
 
     description = """The script loads the input table and identifies the specified column. It then removes rows that have NaN values in that column using the `notna()` method in pandas.
 
-The modified table, without the rows containing NaN values, is saved as a new TSV and XLSX file with "_dropNaN" appended to the original file name.
+The modified table, without the rows containing NaN values, is saved in the formats given by --outputs (TSV by default) with "_dropNaN" appended to the original file name.
+
+With --stream, the TSV table is read and filtered in chunks of rows that are appended to the output files as they are processed, so tables larger than the available memory can be filtered. Values are then written exactly as they appear in the input table.
 
     """
 
@@ -36,8 +46,24 @@ The modified table, without the rows containing NaN values, is saved as a new TS
             type=str,
             help='column where to drop NaN values'
             )
+    parser.add_argument(
+            '--stream',
+            action='store_true',
+            default=False,
+            help='read, filter and write the table in chunks of rows, only ' \
+                 'for TSV tables'
+            )
+    parser.add_argument(
+            '--chunksize',
+            metavar='INT',
+            type=int,
+            default=100000,
+            help='rows per chunk with --stream, default is 100000'
+            )
+    add_output_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    output = get_output_options(args)
 
     if not args.table:
         parser.print_help()
@@ -49,23 +75,59 @@ The modified table, without the rows containing NaN values, is saved as a new TS
     table_file = os.path.abspath(args.table)
     if not os.path.isfile(table_file):
         raise FileNotFoundError(f'Could not find file: {table_file}')
+    if args.stream and table_file.endswith('.xlsx'):
+        sys.exit("\n** --stream only supports TSV tables **\n")
+    if args.chunksize < 1:
+        parser.print_help()
+        sys.exit("\n** --chunksize must be at least 1 **\n")
+
+    output_file = f'{get_table_name(table_file)}_dropNaN'
+
+    if args.stream:
+        columns = read_table_file(table_file, nrows=0).columns
+        if args.column not in columns:
+            sys.exit(f"\n** Column '{args.column}' not found in <table.tsv> **\n")
+
+        start = time.perf_counter()
+        rows_read = 0
+        rows_kept = 0
+
+        # Every value is read as a string, so it's written back untouched
+        # whatever the other rows of its chunk are. Compressed tables are
+        # decompressed as they're read, in another thread with --threads.
+        chunks = read_table_chunks(
+                table_file,
+                args.chunksize,
+                threads=args.threads,
+                dtype=str,
+                )
 
+        with StreamingTableWriter(output_file, columns, output) as writer:
+            for chunk in chunks:
+                rows_read += len(chunk)
+                chunk = chunk[chunk[args.column].notna()]
+                rows_kept += len(chunk)
 
-    if table_file.endswith('.xlsx'):
-        table = pd.read_excel(table_file)
-    else:
-        table = pd.read_csv(table_file, sep='\t')
+                writer.write(chunk)
+
+        elapsed = time.perf_counter() - start
+        print(
+                f'{rows_read} rows read, {rows_kept} rows kept in ' \
+                f'{elapsed:.1f} s ({rows_read / max(elapsed, 1e-9):.0f} rows/s)',
+                file=sys.stderr,
+                )
+
+        return
+
+    table = read_table(table_file, threads=args.threads)
 
     table = table[table[args.column].notna()]
 
 
-    table.to_csv(
-            f'{table_file.split("/")[-1]}_dropNaN.tsv',
-            sep='\t',
-            index=False
-            )
-    table.to_excel(
-            f'{table_file.split("/")[-1]}_dropNaN.xlsx',
+    write_table(
+            table,
+            output_file,
+            output,
             index=False
             )
 
@@ -4,49 +4,29 @@ import os
 import sys
 import argparse
 
-import numpy as np
-import pandas as pd
-from goatools.obo_parser import GODag
-from goatools.gosubdag.gosubdag import GoSubDag
+from dgeapy.tables import read_table
+from dgeapy.tables import add_output_arguments
+from dgeapy.tables import get_output_options
+from dgeapy.tables import get_table_name
+from dgeapy.tables import write_table
+from dgeapy.go_ancestors import load_go_ancestor_closure
+from dgeapy.go_ancestors import get_go_column_ancestors
+from dgeapy.go_ancestors import get_go_incidence_matrix
+from dgeapy.go_ancestors import save_go_incidence_matrix
+from dgeapy.parallel import map_row_shards
 
 
 # <http://purl.obolibrary.org/obo/go.obo>
-GODAG = GODag(
-        # path changed for GitHub
-        '../data/gene_onthology_obo/go.obo',
-        optional_attrs={'relationship'}
+# path changed for GitHub
+GO_OBO = os.environ.get(
+        'DGEAPY_GO_OBO',
+        '../data/gene_onthology_obo/go.obo'
         )
 
-def go2ancestors_is_a(go_code: str) -> list:
-    """
-    """
-
-    gosubdag = GoSubDag([go_code], GODAG, prt=None)
-
-    return list(gosubdag.rcntobj.go2ancestors[go_code])
 
+def main(argv=None):
 
-def go2ancestors_is_a_and_regulates(go_code: str) -> list:
-    """
-    """
-
-    optional_relationships = {
-        'regulates', 'negatively_regulates', 'positively_regulates'
-        }
-
-    gosubdag = GoSubDag(
-            [go_code],
-            GODAG,
-            relationships=optional_relationships,
-            prt=None
-            )
-
-    return list(gosubdag.rcntobj.go2ancestors[go_code])
-
-
-def main():
-
-    description = """The script reads the input table, loads the provided GO ontology file, and defines two functions to retrieve ancestors of GO codes. It then iterates over each row in the table, splits the GO codes in the specified column, and retrieves the ancestors for each code. The ancestors are stored in new columns, 'go_ancestors_is_a' and 'go_ancestors_is_a_and_regulates', in the table.
+    description = """The script reads the input table and loads the ancestors of every GO term from the provided GO ontology file. It then splits the GO codes in the specified column and retrieves the ancestors of each distinct code. The ancestors are stored in new columns, 'go_ancestors_is_a' and 'go_ancestors_is_a_and_regulates', in the table.
     """
 
     parser = argparse.ArgumentParser(
@@ -67,70 +47,114 @@ def main():
             help='column on <table.tsv> that contains GO ' \
                  'codes for each gene'
                  )
+    input.add_argument(
+            '--obo',
+            metavar='<go.obo>',
+            type=str,
+            default=GO_OBO,
+            help='GO ontology file, default is $DGEAPY_GO_OBO or ' \
+                 '../data/gene_onthology_obo/go.obo'
+                 )
+    input.add_argument(
+            '--genes',
+            metavar='STR',
+            type=str,
+            help='column on <table.tsv> that contains gene IDs, only used ' \
+                 'with --matrix, default is the first column'
+                 )
+
+    output = parser.add_argument_group('output')
+    output.add_argument(
+            '--matrix',
+            action='store_true',
+            default=False,
+            help='instead of adding the ancestors to the table, write a ' \
+                 'sparse genes x GO terms incidence matrix (.npz)'
+                 )
 
-    args = parser.parse_args()
+    parser.add_argument(
+            '--jobs',
+            metavar='INT',
+            type=int,
+            default=1,
+            help='number of processes the rows of <table.tsv> are split ' \
+                 'across, default is 1 (not used with --matrix)'
+            )
+    add_output_arguments(parser)
+
+    args = parser.parse_args(argv)
+    output = get_output_options(args)
 
     if not args.table:
         parser.print_help()
         sys.exit("\n** The <table.tsv> file is required **\n")
+    if args.jobs < 1:
+        parser.print_help()
+        sys.exit("\n** --jobs must be at least 1 **\n")
     if not args.on:
         parser.print_help()
         sys.exit("\n** Name of the column contains GO codes is required **\n")
 
     table_file = os.path.abspath(args.table)
+    obo_file = os.path.abspath(args.obo)
     if not os.path.isfile(table_file):
         raise FileNotFoundError(f'Could not find file: {table_file}')
+    if not os.path.isfile(obo_file):
+        raise FileNotFoundError(f'Could not find file: {obo_file}')
 
-    if table_file.endswith('.xlsx'):
-        table = pd.read_excel(table_file)
-    else:
-        table = pd.read_csv(table_file, sep='\t')
+    # Ancestors of every GO term, parsed once from the .obo file and cached
+    # next to it.
+    go_ancestors = load_go_ancestor_closure(obo_file)
+
+    table = read_table(table_file, threads=args.threads)
 
     go_column = args.on
+    if go_column not in table.columns:
+        sys.exit(f"\n** Column '{go_column}' not found in <table.tsv> **\n")
+
+    if args.matrix:
+        gene_column = args.genes if args.genes else table.columns[0]
+        if gene_column not in table.columns:
+            sys.exit(f"\n** Column '{gene_column}' not found in <table.tsv> **\n")
+
+        matrix = get_go_incidence_matrix(
+                table[go_column],
+                table[gene_column],
+                go_ancestors,
+                )
+        save_go_incidence_matrix(
+                matrix,
+                f'{get_table_name(table_file)}_go_ancestors.npz',
+                )
+
+        return
+
+    # GO codes are split once for the whole column and each distinct code is
+    # looked up only once. With --jobs, each process gets a shard of rows and
+    # reads the closure from shared memory.
+    ancestors_df = map_row_shards(
+            get_go_column_ancestors,
+            table[go_column],
+            args.jobs,
+            go_ancestors=go_ancestors,
+            )
 
-    table_columns = table.columns.values.tolist()
-
-    for i in range(len(table_columns)):
-        if table_columns[i] == go_column:
-            table.insert(
-                    loc=(i+1),
-                    column='go_ancestors_is_a',
-                    value=[np.nan] * table.shape[0]
-                    )
-            table.insert(
-                    (i+2),
-                    'go_ancestors_is_a_and_regulates',
-                    value=[np.nan] * table.shape[0]
-                    )
-
-    for index, row in table.iterrows():
-        if row['Gene Ontology IDs'] is not np.nan:
-            go_codes = str(row['Gene Ontology IDs']).split(';')
-            go_ancestors_is_a = []
-            go_ancestors_is_a_and_regulates = []
-
-            for code in go_codes:
-                try:
-                    go_ancestors_is_a.extend(go2ancestors_is_a(code.strip()))
-                except KeyError: # obsolete GO code
-                    pass
-                try:
-                    go_ancestors_is_a_and_regulates.extend(
-                            go2ancestors_is_a_and_regulates(code.strip())
-                            )
-                except KeyError: # obsolete GO code
-                    pass
-
-            table.at[index, 'go_ancestors_is_a'] = ";".join(set(go_ancestors_is_a))
-            table.at[index, 'go_ancestors_is_a_and_regulates'] = ";".join(set(go_ancestors_is_a_and_regulates))
-
-    table.to_csv(
-            f'{table_file.split("/")[-1]}_go_ancestors.tsv',
-            sep='\t',
-            index=False
+    go_column_loc = table.columns.get_loc(go_column)
+    table.insert(
+            loc=(go_column_loc+1),
+            column='go_ancestors_is_a',
+            value=ancestors_df['go_ancestors_is_a'],
+            )
+    table.insert(
+            loc=(go_column_loc+2),
+            column='go_ancestors_is_a_and_regulates',
+            value=ancestors_df['go_ancestors_is_a_and_regulates'],
             )
-    table.to_excel(
-            f'{table_file.split("/")[-1]}_go_ancestors.xlsx',
+
+    write_table(
+            table,
+            f'{get_table_name(table_file)}_go_ancestors',
+            output,
             index=False
             )
 
@@ -15,10 +15,14 @@ import os
 import sys
 import argparse
 
-import pandas as pd
+from dgeapy.tables import read_table
+from dgeapy.tables import add_output_arguments
+from dgeapy.tables import get_output_options
+from dgeapy.tables import get_table_name
+from dgeapy.tables import write_table
 
 
-def main():
+def main(argv=None):
 
     description = """
     Perform a left join of two tables based on a common key column. The first
@@ -57,8 +61,10 @@ def main():
     # TODO:
     #     - Add output options
     #     - Add override option
+    add_output_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    output = get_output_options(args)
 
     if not args.table1:
         parser.print_help()
@@ -77,15 +83,9 @@ def main():
     if not os.path.isfile(table_2_file):
         raise FileNotFoundError(f'Could not find file: {table_2_file}')
 
-    if table_1_file.endswith('.xlsx'):
-        table_1 = pd.read_excel(table_1_file)
-    else:
-        table_1 = pd.read_csv(table_1_file, sep='\t')
+    table_1 = read_table(table_1_file, threads=args.threads)
 
-    if table_2_file.endswith('.xlsx'):
-        table_2 = pd.read_excel(table_2_file)
-    else:
-        table_2 = pd.read_csv(table_2_file, sep='\t')
+    table_2 = read_table(table_2_file, threads=args.threads)
 
     key = args.on
 
@@ -115,13 +115,11 @@ def main():
 
     table_1_mapped = table_1_mapped.reset_index()
     table_1_mapped = table_1_mapped.loc[:, ~table_1_mapped.columns.str.contains('^Unnamed')]
-    table_1_mapped.to_csv(f'{out_dir}/{table_1_file.split("/")[-1]}_joined.tsv', sep='\t', index=False)
-    table_1_mapped.to_excel(f'{out_dir}/{table_1_file.split("/")[-1]}_joined.xlsx', index=False)
+    write_table(table_1_mapped, f'{out_dir}/{get_table_name(table_1_file)}_joined', output, index=False)
 
     table_2_notmapped = table_2_notmapped.reset_index()
     table_2_notmapped = table_2_notmapped.loc[:, ~table_2_notmapped.columns.str.contains('^Unnamed')]
-    table_2_notmapped.to_csv(f'{out_dir}/{table_2_file.split("/")[-1]}_notjoined.tsv', sep='\t', index=False)
-    table_2_notmapped.to_excel(f'{out_dir}/{table_2_file.split("/")[-1]}_notjoined.xlsx', index=False)
+    write_table(table_2_notmapped, f'{out_dir}/{get_table_name(table_2_file)}_notjoined', output, index=False)
 
 if __name__ == "__main__":
     main()
@@ -2,7 +2,8 @@
 
 """
 Perform mapping between a mapping file <map.tsv> and a table file <table.tsv>
-based on specified columns. The mapped data is saved to output files in a
+based on specified columns, or between a map and the table of each strain of
+a JSON configuration file. The mapped data is saved to output files in a
 directory created by the script.
 """
 
@@ -10,15 +11,27 @@ import os
 import sys
 import argparse
 
-import numpy as np
-import pandas as pd
+from dgeapy.utilities import read_config_json_file
+from dgeapy.tables import read_table
+from dgeapy.tables import add_output_arguments
+from dgeapy.tables import get_output_options
+from dgeapy.tables import get_table_name
+from dgeapy.tables import write_table
+from dgeapy.gene_maps import index_map
+from dgeapy.gene_maps import map_table
+from dgeapy.gene_maps import map_strains
+from dgeapy.gene_maps import check_strains_config
 
 
-def main():
+def main(argv=None):
 
     description = """Perform mapping between a mapping file <map.tsv> and
     a table file <table.tsv> based on specified columns. The mapped data is
     saved to output files in a directory created by the script.
+
+    With a JSON configuration file (see mkconfigs), the map is read once and
+    the table of every strain is mapped to it on the strain's gene ID column
+    of the map, with the outputs of each strain in their own directory.
     """
 
     parser = argparse.ArgumentParser(
@@ -52,39 +65,64 @@ def main():
             type=str,
             help='column name and values on <map.tsv> and <table.tsv> column'
                  )
+    input.add_argument(
+            '-j', '--json',
+            metavar='<config.json>',
+            type=str,
+            help='JSON configuration file with a map and the tables of ' \
+                 'several strains, instead of -m, -t and --on'
+                 )
+    parser.add_argument(
+            '--jobs',
+            metavar='INT',
+            type=int,
+            default=1,
+            help='number of strains mapped at the same time, with -j, ' \
+                 'default is 1'
+                 )
     # TODO:
     #     - Add output options
     #     - Add override option
+    add_output_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    output = get_output_options(args)
 
-    if not args.map:
-        parser.print_help()
-        sys.exit("\n** The <map.tsv> file is required **\n")
-    if not args.table:
-        parser.print_help()
-        sys.exit("\n** The <table.tsv> file is required **\n")
-    if not args.on:
+    if args.jobs < 1:
         parser.print_help()
-        sys.exit("\n** <map.tsv> and <table.tsv> column value is required **\n")
+        sys.exit("\n** --jobs must be at least 1 **\n")
+
+    if args.json:
+        config_file = os.path.abspath(args.json)
+        if not os.path.isfile(config_file):
+            raise FileNotFoundError(f'Could not find file: {config_file}')
+        config_dictionary = read_config_json_file(config_file)
+        check_strains_config(config_dictionary)
+
+        input_files = [config_dictionary['map']] + [
+                strain['df'] for strain in config_dictionary['strains'].values()
+                ]
+        for input_file in input_files:
+            if not os.path.isfile(input_file):
+                raise FileNotFoundError(f'Could not find file: {input_file}')
 
-    map_file = os.path.abspath(args.map)
-    table_file = os.path.abspath(args.table)
-    if not os.path.isfile(map_file):
-        raise FileNotFoundError(f'Could not find file: {map_file}')
-    if not os.path.isfile(table_file):
-        raise FileNotFoundError(f'Could not find file: {table_file}')
-
-    map = pd.read_csv(map_file, sep='\t')
-    table = pd.read_csv(table_file, sep='\t')
-
-    key = args.on
-    if args.map_columns:
-        map = map[args.map_columns]
-
-    map['index'] = np.where(map[key].str.endswith('#'), map[key].str[:-1], map[key])
-    map = map.set_index('index')
-    table = table.set_index(key)
+    else:
+        if not args.map:
+            parser.print_help()
+            sys.exit("\n** The <map.tsv> file is required **\n")
+        if not args.table:
+            parser.print_help()
+            sys.exit("\n** The <table.tsv> file is required **\n")
+        if not args.on:
+            parser.print_help()
+            sys.exit("\n** <map.tsv> and <table.tsv> column value is required **\n")
+
+        map_file = os.path.abspath(args.map)
+        table_file = os.path.abspath(args.table)
+        if not os.path.isfile(map_file):
+            raise FileNotFoundError(f'Could not find file: {map_file}')
+        if not os.path.isfile(table_file):
+            raise FileNotFoundError(f'Could not find file: {table_file}')
 
     out_dir = f'{os.getcwd()}/dgeapy_map_output'
     # Crate a directory for the output. If already exists, add _n to the name.
@@ -99,22 +137,30 @@ def main():
     else:
         os.mkdir(out_dir)
 
-    table_mapped = table.join(map, how='left')
+    if args.json:
+        map_strains(
+                config_dictionary,
+                out_dir,
+                output,
+                map_columns=args.map_columns or None,
+                jobs=args.jobs,
+                threads=args.threads,
+                )
+        return
 
-    table_columns = table.columns.values.tolist()
-    map_columns = map.columns.values.tolist()
-    table_mapped = table_mapped.reindex(columns= map_columns + table_columns)
+    map = read_table(map_file, threads=args.threads)
+    table = read_table(table_file, threads=args.threads)
 
-    map_notmapped = map[~map.index.isin(table_mapped.index)]
+    key = args.on
+    table_mapped, map_notmapped = map_table(
+            index_map(map, key, args.map_columns or None),
+            table,
+            key,
+            )
 
-    table_mapped = table_mapped.reset_index()
-    table_mapped.to_csv(f'{out_dir}/{table_file.split("/")[-1]}_mapped.tsv', sep='\t', index=False)
-    table_mapped.to_excel(f'{out_dir}/{table_file.split("/")[-1]}_mapped.xlsx', index=False)
+    write_table(table_mapped, f'{out_dir}/{get_table_name(table_file)}_mapped', output, index=False)
 
-    map_notmapped = map_notmapped.reset_index()
-    map_notmapped = map_notmapped.drop(columns=['index'])
-    map_notmapped.to_csv(f'{out_dir}/{map_file.split("/")[-1]}_notmapped.tsv', sep='\t', index=False)
-    map_notmapped.to_excel(f'{out_dir}/{map_file.split("/")[-1]}_notmapped.xlsx', index=False)
+    write_table(map_notmapped, f'{out_dir}/{get_table_name(map_file)}_notmapped', output, index=False)
 
 if __name__ == "__main__":
     main()
@@ -3,29 +3,168 @@
 import os
 import sys
 import argparse
+import dataclasses
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 
 import dgeapy
+from dgeapy.parallel import map_tasks
 
 
 @dataclass
 class SampleData:
     """Store data related to each sample."""
     name: str
+    input_file: str
+    output_columns: list
     input_df: pd.DataFrame
     df_columns:  dict
     dge_df: pd.DataFrame
     up_df: pd.DataFrame
     down_df: pd.DataFrame
+    # Sorted codes of the gene IDs of dge_df, up_df and down_df in the
+    # GeneDictionary of the run, added by dgeapy.encode_samples().
+    dge_codes: np.ndarray = None
+    up_codes: np.ndarray = None
+    down_codes: np.ndarray = None
+    # Columns of the input table that the analysis doesn't use, for the rows
+    # of input_df (only of dge_df once its tables are written), added by
+    # dgeapy.join_annotation_columns().
+    annotation_df: pd.DataFrame = None
+
+
+def analyze_sample(name, input_file, foldchange_threshold, padj_threshold,
+                   exclude=None, threads=1):
+    """Reads a sample table, without the gene IDs matching any of the
+    <exclude> patterns, and filters its differentially expressed, up and
+    down regulated genes. Returns its SampleData.
+    """
+
+    # Only the columns used in the analysis are loaded, annotations are
+    # joined back when writing the tables. Excluded gene IDs (e.g. non-coding
+    # transcripts) and repeated ones, since sometimes one old locus tag
+    # belongs to two new locus tags, are dropped as the table is loaded.
+    df, column_names, output_columns, dropped = dgeapy.read_sample_table(
+                input_file,
+                threads=threads,
+                exclude=exclude,
+                )
+    print(
+            f"{name}: {dropped['excluded']} excluded and " \
+            f"{dropped['duplicated']} repeated gene IDs dropped",
+            file=sys.stderr,
+            )
+
+    dgeapy.add_fold_change_columns(df)
+
+    dgeapy.add_regulation_columns(df)
 
+    # TODO: improve this
+    for key in column_names:
+        df = df.rename(columns={column_names[key] : key})
+        column_names[key] = key
 
-def main():
+    df = df.set_index(column_names['index'])
+
+    # DEG according to FC and padj value3
+    dge_df = dgeapy.filter_FC_PADJ(
+                        dataframe=df,
+                        foldchange_threshold=foldchange_threshold,
+                        foldchange_column_name='FoldChange',
+                        padj_threshold=padj_threshold,
+                        padj_column_name='padj',
+                        )
+
+    # Up and Down regulated genes from DEG
+    up_df = dge_df[dge_df[column_names["Regulation"]] == "Up"]
+    donw_df = dge_df[dge_df[column_names["Regulation"]] == "Down"]
+
+    return SampleData(
+            name=name,
+            input_file=input_file,
+            output_columns=output_columns,
+            input_df=df,
+            df_columns=column_names,
+            dge_df=dge_df,
+            up_df=up_df,
+            down_df=donw_df
+            )
+
+
+def write_sample_tables(sample_data, sample_df_dir, output):
+    """Writes the input, DEG, UP and DOWN tables of a sample, with all of the
+    columns of its input table.
+    """
+
+    annotated_df = dgeapy.join_annotation_columns(
+                            sample_data,
+                            sample_data.input_df,
+                            )
+    dgeapy.write_table(
+                            annotated_df,
+                            f'{sample_df_dir}/{sample_data.name}_input',
+                            output,
+                            )
+    dgeapy.write_table(
+                            annotated_df.loc[sample_data.dge_df.index],
+                            f'{sample_df_dir}/{sample_data.name}_DEG',
+                            output,
+                            )
+    dgeapy.write_table(
+                            annotated_df.loc[sample_data.up_df.index],
+                            f'{sample_df_dir}/{sample_data.name}_UP',
+                            output,
+                            )
+    dgeapy.write_table(
+                            annotated_df.loc[sample_data.down_df.index],
+                            f'{sample_df_dir}/{sample_data.name}_DOWN',
+                            output,
+                            )
+
+
+def process_sample(name, input_file, sample_df_dir, volcano_dir,
+                   foldchange_threshold, padj_threshold, plot_formats, output,
+                   exclude=None, threads=1, keep_annotations=False):
+    """Analyzes a sample, writes its tables and its volcano and count plots.
+    Samples are independent of each other up to here, so this is what each
+    process runs with --jobs. Returns the SampleData, with the annotations of
+    every row of the input table if <keep_annotations>, so that its tables
+    can be written again, and only of its DEG otherwise.
+    """
+
+    sample_data = analyze_sample(
+            name,
+            input_file,
+            foldchange_threshold,
+            padj_threshold,
+            exclude,
+            threads,
+            )
+
+    write_sample_tables(sample_data, sample_df_dir, output)
+    if not keep_annotations:
+        dgeapy.trim_annotation_columns(sample_data)
+
+    # Generate a volcano and a count plots
+    dgeapy.generate_volcano_plot(
+            data=sample_data,
+            file_path=volcano_dir,
+            foldchange_threshold=foldchange_threshold,
+            padj_threshold=padj_threshold,
+            plot_formats=plot_formats,
+            )
+
+    return sample_data
+
+
+def main(argv=None):
 
     description = """
-    Differential Gene Expression data analysis between 2, 3 and 4
-    'mutant vs. wild' like type experiments."""
+    Differential Gene Expression data analysis between 2, 3, 4 or more
+    'mutant vs. wild' like type experiments. Venn diagrams are drawn for up
+    to 4 samples, UpSet plots and intersection tables for any number."""
 
     parser = argparse.ArgumentParser(
                         description=description,
@@ -69,12 +208,57 @@ def main():
             default=False,
             help="include non-coding transcripts"
             )
+    parser.add_argument(
+            '--exclude',
+            metavar='PATTERN',
+            nargs='+',
+            default=[],
+            action='extend',
+            help="also exclude the gene IDs matching any of these regular " \
+                 "expressions. Gene IDs matching " \
+                 f"{'|'.join(dgeapy.NON_CODING_PATTERNS)} (non-coding " \
+                 "transcripts) are excluded unless --non-coding is given",
+            )
+    parser.add_argument(
+            '--workbook',
+            choices=['run', 'category'],
+            default=None,
+            help="write the XLSX tables on the sheets of a single workbook, " \
+                 "or of one workbook per directory of tables (category), " \
+                 "each with an index sheet, instead of one file per table. " \
+                 "Adds xlsx to --outputs",
+            )
+    parser.add_argument(
+            '--jobs',
+            metavar='INT',
+            default=1,
+            type=int,
+            help="number of processes the samples are analyzed in, up to " \
+                 "the Sankey, Venn and UpSet stages, default is 1",
+            )
+    parser.add_argument(
+            '--writers',
+            metavar='INT',
+            default=2,
+            type=int,
+            help="number of threads writing the tables in the background " \
+                 "while the analysis goes on, 0 writes them as they're " \
+                 "made, default is 2",
+            )
+    dgeapy.add_output_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    output = dgeapy.get_output_options(args)
 
     if not args.configuration_json_file:
         parser.print_help()
         sys.exit("\n** The JSON configuration file is required **\n")
+    if args.jobs < 1:
+        parser.print_help()
+        sys.exit("\n** --jobs must be at least 1 **\n")
+    if args.writers < 0:
+        parser.print_help()
+        sys.exit("\n** --writers can't be negative **\n")
 
     config_file = os.path.abspath(args.configuration_json_file)
     if not os.path.isfile(config_file):
@@ -88,11 +272,13 @@ def main():
     PADJ_THRESHOLD = args.padj
     PLOT_FORMATS = args.formats
     DATAFRAMES = config_dictionary
-    include_novels = args.non_coding
+    EXCLUDE = args.exclude
+    if not args.non_coding:
+        EXCLUDE = dgeapy.NON_CODING_PATTERNS + EXCLUDE
 
-    if len(DATAFRAMES) not in [1, 2, 3, 4]:
-        sys.exit('\n** dgeapy multiplemuts only supports data from 2, 3 or 4' \
-                 ' different samples **\n')
+    if not 1 <= len(DATAFRAMES) <= dgeapy.MAX_SETS:
+        sys.exit('\n** dgeapy multiplemuts only supports data from 1 up to ' \
+                 f'{dgeapy.MAX_SETS} different samples **\n')
 
     for k in DATAFRAMES:
         if not os.path.isfile(DATAFRAMES[k]):
@@ -123,227 +309,211 @@ def main():
     for k in output_dirs_dict:
         os.mkdir(output_dirs_dict[k])
 
-    data = []
-    for k in DATAFRAMES:
+    if args.workbook is not None:
+        if 'xlsx' not in output.formats:
+            output.formats.append('xlsx')
+        output.workbooks = dgeapy.ConsolidatedWorkbooks(
+                output_dirs_dict['df'],
+                by_category=args.workbook == 'category',
+                )
 
-        sample_df_dir = f'{output_dirs_dict["df"]}/{k}'
-        os.mkdir(sample_df_dir)
+    if args.writers > 0:
+        output.writer = dgeapy.BackgroundWriter(threads=args.writers)
+
+    try:
+        sample_tasks = []
+        for k in DATAFRAMES:
+            sample_df_dir = f'{output_dirs_dict["df"]}/{k}'
+            os.mkdir(sample_df_dir)
+
+            sample_tasks.append({
+                    'name' : k,
+                    'input_file' : DATAFRAMES[k],
+                    'sample_df_dir' : sample_df_dir,
+                    'volcano_dir' : output_dirs_dict['volcano'],
+                    'foldchange_threshold' : FOLD_CHANGE_THRESHOLD,
+                    'padj_threshold' : PADJ_THRESHOLD,
+                    'plot_formats' : PLOT_FORMATS,
+                    'output' : output,
+                    'exclude' : EXCLUDE,
+                    'threads' : args.threads,
+                    })
+
+        if args.jobs <= 1:
+            data = [process_sample(**task) for task in sample_tasks]
 
-        if DATAFRAMES[k].endswith(".xlsx"):
-            df = pd.read_excel(
-                        DATAFRAMES[k],
-                        na_values=["--", "",]
-                        )
         else:
-            df = pd.read_csv(
-                        DATAFRAMES[k],
-                        sep="\t",
-                        na_values=["--", "",]
-                        )
-
-        dgeapy.add_fold_change_columns(df)
-
-        dgeapy.add_regulation_columns(df)
-
-        column_names = dgeapy.get_column_names(df)
-
-        # TODO: improve this
-        for key in column_names:
-            df = df.rename(columns={column_names[key] : key})
-            column_names[key] = key
-
-        df = df.set_index(column_names['index'])
-
-        if include_novels is False:
-            df = df[~df.index.str.contains("Novel")]
-            df = df[~df.index.str.contains("sRNA")]
-
-        # Sometime one old locus tag belongs to two new locus tag so we have
-        # to remove one
-        df = df.loc[~df.index.duplicated(keep='first')]
-
-        # DEG according to FC and padj value3
-        dge_df = dgeapy.filter_FC_PADJ(
-                            dataframe=df,
-                            foldchange_threshold=FOLD_CHANGE_THRESHOLD,
-                            foldchange_column_name='FoldChange',
-                            padj_threshold=PADJ_THRESHOLD,
-                            padj_column_name='padj',
+            # Each process writes its own tables, in the foreground, but the
+            # sheets of the consolidated workbooks are written from here once
+            # all of the samples are done, in the order of the samples.
+            workbook_output = None
+            if output.workbooks is not None:
+                workbook_output = dataclasses.replace(output, formats=['xlsx'])
+            sample_output = dataclasses.replace(
+                    output,
+                    formats=[
+                        f for f in output.formats
+                        if workbook_output is None or f != 'xlsx'
+                        ],
+                    workbooks=None,
+                    writer=None,
+                    )
+            for task in sample_tasks:
+                task['output'] = sample_output
+                task['keep_annotations'] = workbook_output is not None
+
+            data = map_tasks(process_sample, sample_tasks, args.jobs)
+
+            if workbook_output is not None:
+                for sample_data, task in zip(data, sample_tasks):
+                    write_sample_tables(
+                            sample_data,
+                            task['sample_df_dir'],
+                            workbook_output,
                             )
+                    dgeapy.trim_annotation_columns(sample_data)
 
-        # Up and Down regulated genes from DEG
-        up_df = dge_df[dge_df[column_names["Regulation"]] == "Up"]
-        donw_df = dge_df[dge_df[column_names["Regulation"]] == "Down"]
-
-        sample_data = SampleData(
-                        name=k,
-                        input_df=df,
-                        df_columns=column_names,
-                        dge_df=dge_df,
-                        up_df=up_df,
-                        down_df=donw_df
-                        )
-        data.append(sample_data)
-
-        # Saving to csv and excel files.
-        sample_data.input_df.to_csv(
-                                f'{sample_df_dir}/{sample_data.name}_input.tsv',
-                                sep="\t",
-                                )
-        sample_data.input_df.to_excel(
-                                f'{sample_df_dir}/{sample_data.name}_input.xlsx',
-                                )
-        sample_data.dge_df.to_csv(
-                                f'{sample_df_dir}/{sample_data.name}_DEG.tsv',
-                                sep="\t",
-                                )
-        sample_data.dge_df.to_excel(
-                                f'{sample_df_dir}/{sample_data.name}_DEG.xlsx',
-                                )
-        sample_data.up_df.to_csv(
-                                f'{sample_df_dir}/{sample_data.name}_UP.tsv',
-                                sep="\t",
-                                )
-        sample_data.up_df.to_excel(
-                                f'{sample_df_dir}/{sample_data.name}_UP.xlsx',
-                                )
-        sample_data.down_df.to_csv(
-                                f'{sample_df_dir}/{sample_data.name}_DOWN.tsv',
-                                sep="\t",
-                                )
-        sample_data.down_df.to_excel(
-                                f'{sample_df_dir}/{sample_data.name}_DOWN.xlsx',
-                                )
-
-        # Generate a volcano and a count plots
-        dgeapy.generate_volcano_plot(
-                data=sample_data,
-                file_path=output_dirs_dict['volcano'],
-                foldchange_threshold=FOLD_CHANGE_THRESHOLD,
-                padj_threshold=PADJ_THRESHOLD,
-                plot_formats=PLOT_FORMATS,
-                )
-    if len(data) == 1:
-        sys.exit()
-
-    # Sankey diagrams
-    dgeapy.generate_sankey_diagram(
-            data,
-            fc_value=FOLD_CHANGE_THRESHOLD,
-            padj_value=PADJ_THRESHOLD,
-            plot_formats=PLOT_FORMATS,
-            path=output_dirs_dict['sankey']
-            )
+        if len(data) == 1:
+            return
 
-    # For the 3 sets of gene IDs for DEG, UP and DOWN regulated genes:
-    #   - Generate 2 venn's diagrams representing the intersections of
-    #     gene IDs. One will be defalut, the other will be unweight.
-    #   - Generete an upset plot for also representing the intersections
-    #   - From the intersections represented, generate  a dataframe for each
-    #     containing all of the relevant information and save it to a file.
-    dgeapy.mk_venn_upset_and_intersections_dfs(
-            data=data,
-            plot_formats=PLOT_FORMATS,
-            venn_path=output_dirs_dict["venn"],
-            upset_path=output_dirs_dict["upset"],
-            df_path=output_dirs_dict["df"],
-            )
+        # Every gene ID of the run gets an integer code once, and the
+        # samples are compared on those codes from here on.
+        gene_dictionary = dgeapy.encode_samples(data)
 
-    # Both up/down_regulation_labels are dictionaries conaining
-    # the labels for the next venn diagrams we're going to generate.
-    # They'll display the actual number of genes considered
-    # up and down regulated at the same time.
-    if len(data) == 2:
-        up_regulation_labels = dgeapy.get_gene_ids_set_for_intersections2(
-                set1=set(data[0].up_df.index),
-                set2=set(data[1].up_df.index),
-                )
-        down_regulation_labels = dgeapy.get_gene_ids_set_for_intersections2(
-                set1=set(data[0].down_df.index),
-                set2=set(data[1].down_df.index),
-                )
-        # Generate the same two diagrams but with the labels
-        dgeapy.generate_venn2_diagram_with_regulation_labels(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
+        # Sankey diagrams
+        dgeapy.generate_sankey_diagram(
+                data,
+                fc_value=FOLD_CHANGE_THRESHOLD,
+                padj_value=PADJ_THRESHOLD,
                 plot_formats=PLOT_FORMATS,
-                up_regulation_labels=up_regulation_labels,
-                down_regulation_labels=down_regulation_labels,
-                title="Differentially expressed genes",
-                file_path=f"{output_dirs_dict['venn']}/venn_DEG_labels",
+                path=output_dirs_dict['sankey'],
+                gene_dictionary=gene_dictionary,
                 )
 
-    elif len(data) == 3:
-        up_regulation_labels = dgeapy.get_gene_ids_set_for_intersections3(
-                set1=set(data[0].up_df.index),
-                set2=set(data[1].up_df.index),
-                set3=set(data[2].up_df.index),
-                )
-        down_regulation_labels = dgeapy.get_gene_ids_set_for_intersections3(
-                set1=set(data[0].down_df.index),
-                set2=set(data[1].down_df.index),
-                set3=set(data[2].down_df.index),
+        # For the 3 sets of gene IDs for DEG, UP and DOWN regulated genes:
+        #   - Generate 2 venn's diagrams representing the intersections of
+        #     gene IDs. One will be defalut, the other will be unweight.
+        #   - Generete an upset plot for also representing the intersections
+        #   - From the intersections represented, generate  a dataframe for each
+        #     containing all of the relevant information and save it to a file.
+        # All samples are joined once for the intersection dataframes of
+        # every gene category, inverted regulations included.
+        intersections_table = dgeapy.mk_intersections_table(
+                data,
+                gene_dictionary,
                 )
-        # Generate the same two diagrams but with the labels
-        dgeapy.generate_venn3_diagram_with_regulation_labels(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].dge_df.index),
-                mutant3_name=data[2].name,
+        dgeapy.mk_venn_upset_and_intersections_dfs(
+                data=data,
                 plot_formats=PLOT_FORMATS,
-                up_regulation_labels=up_regulation_labels,
-                down_regulation_labels=down_regulation_labels,
-                title="Differentially expressed genes",
-                file_path=f"{output_dirs_dict['venn']}/venn_DEG_labels",
+                venn_path=output_dirs_dict["venn"],
+                upset_path=output_dirs_dict["upset"],
+                df_path=output_dirs_dict["df"],
+                output=output,
+                intersections_table=intersections_table,
                 )
 
-    elif len(data) == 4:
-        up_regulation_labels = dgeapy.get_gene_ids_set_for_intersections4(
-                set1=set(data[0].up_df.index),
-                set2=set(data[1].up_df.index),
-                set3=set(data[2].up_df.index),
-                set4=set(data[3].up_df.index),
-                )
-        down_regulation_labels = dgeapy.get_gene_ids_set_for_intersections4(
-                set1=set(data[0].down_df.index),
-                set2=set(data[1].down_df.index),
-                set3=set(data[2].down_df.index),
-                set4=set(data[3].down_df.index),
-                )
-        # Generate the same two diagrams but with the labels
-        dgeapy.generate_venn4_diagram_with_regulation_labels(
-                mutant1_gene_set=set(data[0].dge_df.index),
-                mutant1_name=data[0].name,
-                mutant2_gene_set=set(data[1].dge_df.index),
-                mutant2_name=data[1].name,
-                mutant3_gene_set=set(data[2].dge_df.index),
-                mutant3_name=data[2].name,
-                mutant4_gene_set=set(data[3].dge_df.index),
-                mutant4_name=data[3].name,
+        # Both up/down_regulation_labels are dictionaries conaining
+        # the labels for the next venn diagrams we're going to generate.
+        # They'll display the actual number of genes considered
+        # up and down regulated at the same time.
+        if len(data) == 2:
+            up_regulation_labels = dgeapy.get_gene_ids_set_for_intersections2(
+                    set1=data[0].up_codes,
+                    set2=data[1].up_codes,
+                    )
+            down_regulation_labels = dgeapy.get_gene_ids_set_for_intersections2(
+                    set1=data[0].down_codes,
+                    set2=data[1].down_codes,
+                    )
+            # Generate the same two diagrams but with the labels
+            dgeapy.generate_venn2_diagram_with_regulation_labels(
+                    mutant1_gene_set=set(data[0].dge_codes.tolist()),
+                    mutant1_name=data[0].name,
+                    mutant2_gene_set=set(data[1].dge_codes.tolist()),
+                    mutant2_name=data[1].name,
+                    plot_formats=PLOT_FORMATS,
+                    up_regulation_labels=up_regulation_labels,
+                    down_regulation_labels=down_regulation_labels,
+                    title="Differentially expressed genes",
+                    file_path=f"{output_dirs_dict['venn']}/venn_DEG_labels",
+                    )
+
+        elif len(data) == 3:
+            up_regulation_labels = dgeapy.get_gene_ids_set_for_intersections3(
+                    set1=data[0].up_codes,
+                    set2=data[1].up_codes,
+                    set3=data[2].up_codes,
+                    )
+            down_regulation_labels = dgeapy.get_gene_ids_set_for_intersections3(
+                    set1=data[0].down_codes,
+                    set2=data[1].down_codes,
+                    set3=data[2].down_codes,
+                    )
+            # Generate the same two diagrams but with the labels
+            dgeapy.generate_venn3_diagram_with_regulation_labels(
+                    mutant1_gene_set=set(data[0].dge_codes.tolist()),
+                    mutant1_name=data[0].name,
+                    mutant2_gene_set=set(data[1].dge_codes.tolist()),
+                    mutant2_name=data[1].name,
+                    mutant3_gene_set=set(data[2].dge_codes.tolist()),
+                    mutant3_name=data[2].name,
+                    plot_formats=PLOT_FORMATS,
+                    up_regulation_labels=up_regulation_labels,
+                    down_regulation_labels=down_regulation_labels,
+                    title="Differentially expressed genes",
+                    file_path=f"{output_dirs_dict['venn']}/venn_DEG_labels",
+                    )
+
+        elif len(data) == 4:
+            up_regulation_labels = dgeapy.get_gene_ids_set_for_intersections4(
+                    set1=data[0].up_codes,
+                    set2=data[1].up_codes,
+                    set3=data[2].up_codes,
+                    set4=data[3].up_codes,
+                    )
+            down_regulation_labels = dgeapy.get_gene_ids_set_for_intersections4(
+                    set1=data[0].down_codes,
+                    set2=data[1].down_codes,
+                    set3=data[2].down_codes,
+                    set4=data[3].down_codes,
+                    )
+            # Generate the same two diagrams but with the labels
+            dgeapy.generate_venn4_diagram_with_regulation_labels(
+                    mutant1_gene_set=set(data[0].dge_codes.tolist()),
+                    mutant1_name=data[0].name,
+                    mutant2_gene_set=set(data[1].dge_codes.tolist()),
+                    mutant2_name=data[1].name,
+                    mutant3_gene_set=set(data[2].dge_codes.tolist()),
+                    mutant3_name=data[2].name,
+                    mutant4_gene_set=set(data[3].dge_codes.tolist()),
+                    mutant4_name=data[3].name,
+                    plot_formats=PLOT_FORMATS,
+                    up_regulation_labels=up_regulation_labels,
+                    down_regulation_labels=down_regulation_labels,
+                    title="Differentially expressed genes",
+                    file_path=f"{output_dirs_dict['venn']}/venn_DEG_labels",
+                    )
+
+        # Comparing sets for the possible inverted regulations combinations.
+        # TODO: compute inverted regulations for 4-sample data.
+        inverted_reg_venn_dir = f"{output_dirs_dict['venn']}/inverted_regulations"
+        inverted_reg_upset_dir = f"{output_dirs_dict['upset']}/inverted_regulations"
+        os.mkdir(inverted_reg_venn_dir)
+        os.mkdir(inverted_reg_upset_dir)
+        dgeapy.get_inverted_regulations_and_mk_venns_and_dataframes(
+                data=data,
                 plot_formats=PLOT_FORMATS,
-                up_regulation_labels=up_regulation_labels,
-                down_regulation_labels=down_regulation_labels,
-                title="Differentially expressed genes",
-                file_path=f"{output_dirs_dict['venn']}/venn_DEG_labels",
+                venn_directory_path=inverted_reg_venn_dir,
+                upset_directory_path=inverted_reg_upset_dir,
+                dataframes_directory_path=output_dirs_dict['df'],
+                output=output,
+                intersections_table=intersections_table,
                 )
 
-    # Comparing sets for the possible inverted regulations combinations.
-    # TODO: compute inverted regulations for 4-sample data.
-    inverted_reg_venn_dir = f"{output_dirs_dict['venn']}/inverted_regulations"
-    inverted_reg_upset_dir = f"{output_dirs_dict['upset']}/inverted_regulations"
-    os.mkdir(inverted_reg_venn_dir)
-    os.mkdir(inverted_reg_upset_dir)
-    dgeapy.get_inverted_regulations_and_mk_venns_and_dataframes(
-            data=data,
-            plot_formats=PLOT_FORMATS,
-            venn_directory_path=inverted_reg_venn_dir,
-            upset_directory_path=inverted_reg_upset_dir,
-            dataframes_directory_path=output_dirs_dict['df'],
-            )
+    finally:
+        # Tables still being written are waited for, and consolidated
+        # workbooks are only complete once closed.
+        dgeapy.close_output(output)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, DGEAPY_PATH)
+
+# Tests never write to the user's table cache.
+os.environ['DGEAPY_CACHE_DIR'] = ''
+
+
+# A small ontology. GO:0000001 and GO:0000008 are roots, GO:0000002 and
+# GO:0000005 are "is_a" GO:0000001, GO:0000003 and GO:0000004 are "is_a"
+# GO:0000002, GO:0000006 is "is_a" GO:0000003 and GO:0000005, and GO:0000004
+# also regulates GO:0000005. GO:0000103 is an alternative ID of GO:0000003
+# and GO:0000007 is obsolete.
+GO_OBO = """format-version: 1.2
+ontology: go
+
+[Term]
+id: GO:0000001
+name: root
+namespace: biological_process
+
+[Term]
+id: GO:0000002
+name: two
+namespace: biological_process
+is_a: GO:0000001 ! root
+
+[Term]
+id: GO:0000003
+name: three
+namespace: biological_process
+alt_id: GO:0000103
+is_a: GO:0000002 ! two
+
+[Term]
+id: GO:0000004
+name: four
+namespace: biological_process
+is_a: GO:0000002 ! two
+relationship: regulates GO:0000005 ! five
+
+[Term]
+id: GO:0000005
+name: five
+namespace: biological_process
+is_a: GO:0000001 ! root
+
+[Term]
+id: GO:0000006
+name: six
+namespace: biological_process
+is_a: GO:0000003 ! three
+is_a: GO:0000005 ! five
+
+[Term]
+id: GO:0000007
+name: seven
+namespace: biological_process
+is_obsolete: true
+replaced_by: GO:0000006
+
+[Term]
+id: GO:0000008
+name: eight
+namespace: molecular_function
+"""
+
+
+@pytest.fixture
+def go_obo(tmp_path):
+    """Path of a go.obo file with the GO_OBO ontology.
+    """
+
+    obo_file = tmp_path / 'go.obo'
+    obo_file.write_text(GO_OBO)
+
+    return str(obo_file)
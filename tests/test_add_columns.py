@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from dgeapy.add_columns import REGULATION_DTYPE
+from dgeapy.add_columns import add_fold_change_columns
+from dgeapy.add_columns import add_regulation_columns
+
+
+def test_regulation_of_each_value():
+    table = pd.DataFrame({
+            'log2FoldChange' : [1.5, -0.2, 0.0, -0.0, np.inf, -np.inf, np.nan],
+            'padj' : 0.01,
+            })
+    add_fold_change_columns(table)
+    add_regulation_columns(table)
+
+    assert table.columns.tolist() == [
+            'log2FoldChange', 'FoldChange', 'Regulation', 'padj'
+            ]
+    assert table['Regulation'].dtype == REGULATION_DTYPE
+    assert table['Regulation'].tolist()[:-1] == [
+            'Up', 'Down', 'Unchanged', 'Unchanged', 'Up', 'Down'
+            ]
+    assert pd.isna(table['Regulation'].iloc[-1])
+
+
+def test_regulation_of_each_contrast():
+    table = pd.DataFrame({
+            'mutA_log2FoldChange' : [1.0, np.nan],
+            'mutB_log2FoldChange' : [-1.0, 0.0],
+            })
+    add_fold_change_columns(table)
+    add_regulation_columns(table)
+
+    assert table.columns.tolist() == [
+            'mutA_log2FoldChange', 'mutA_FoldChange', 'mutA_Regulation',
+            'mutB_log2FoldChange', 'mutB_FoldChange', 'mutB_Regulation',
+            ]
+    assert table['mutA_Regulation'].astype(object).fillna('').tolist() == ['Up', '']
+    assert table['mutB_Regulation'].tolist() == ['Down', 'Unchanged']
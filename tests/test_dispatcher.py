@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+import pandas as pd
+
+from conftest import DGEAPY_PATH
+
+
+def run_dgeapy(args, cwd):
+    return subprocess.run(
+            [sys.executable, f'{DGEAPY_PATH}/dgeapy.py'] + args,
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            )
+
+
+def test_exit_status_of_subcommands(tmp_path):
+    pd.DataFrame({
+            'index' : ['g1', 'g2'], 'GO' : ['GO:0000001', None],
+            }).to_csv(tmp_path / 'table.tsv', sep='\t', index=False)
+
+    done = run_dgeapy(['dropNaN-in-column', '-t', 'table.tsv', '-c', 'GO'], tmp_path)
+    assert done.returncode == 0
+    assert (tmp_path / 'table.tsv_dropNaN.tsv').is_file()
+
+    failed = run_dgeapy(['dropNaN-in-column', '-t', 'table.tsv'], tmp_path)
+    assert failed.returncode == 1
+    assert 'The column is required' in failed.stderr
+
+    assert run_dgeapy(['-h'], tmp_path).returncode == 0
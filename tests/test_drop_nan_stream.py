@@ -0,0 +1,84 @@
+import gzip
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dgeapy.tables import read_table_chunks
+
+from conftest import DGEAPY_PATH
+
+
+def load_drop_nan():
+    spec = importlib.util.spec_from_file_location(
+            'dgeapy_dropNaN_in_column',
+            f'{DGEAPY_PATH}/dgeapy_dropNaN-in-column.py',
+            )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module.main
+
+
+def mk_table(n_rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({
+            'index' : [f'gene{i}' for i in range(n_rows)],
+            'value' : np.where(rng.random(n_rows) < 0.3, np.nan, rng.random(n_rows)),
+            'note' : rng.choice(['a', 'b', 'c'], n_rows),
+            })
+
+
+@pytest.mark.parametrize('compression', ['gz', 'bz2', 'xz', 'zst'])
+@pytest.mark.parametrize('threads', [1, 2])
+def test_chunks_match_whole_table(tmp_path, compression, threads):
+    if compression == 'zst':
+        pytest.importorskip('zstandard')
+    table = mk_table()
+    file_path = str(tmp_path / f'table.tsv.{compression}')
+    table.to_csv(file_path, sep='\t', index=False)
+
+    chunks = list(read_table_chunks(file_path, 1000, threads=threads))
+
+    assert [len(chunk) for chunk in chunks] == [1000] * 5
+    pd.testing.assert_frame_equal(pd.concat(chunks), table)
+
+
+def test_chunks_stop_early(tmp_path):
+    file_path = str(tmp_path / 'table.tsv.gz')
+    mk_table(n_rows=200000).to_csv(file_path, sep='\t', index=False)
+
+    chunks = read_table_chunks(file_path, 10, threads=2)
+    assert len(next(chunks)) == 10
+    chunks.close()
+
+
+def test_chunks_raise_decompression_errors(tmp_path):
+    file_path = tmp_path / 'table.tsv.gz'
+    data = gzip.compress(mk_table().to_csv(sep='\t', index=False).encode())
+    file_path.write_bytes(data[:len(data) // 2])
+
+    with pytest.raises(EOFError):
+        for _ in read_table_chunks(str(file_path), 1000, threads=2):
+            pass
+
+
+@pytest.mark.parametrize('threads', [1, 2])
+def test_stream_keeps_values_as_written(tmp_path, monkeypatch, threads):
+    file_path = tmp_path / 'table.tsv.gz'
+    mk_table().to_csv(file_path, sep='\t', index=False)
+    table = pd.read_csv(file_path, sep='\t', dtype=str)
+    expected = table[table['value'].notna()].to_csv(sep='\t', index=False)
+
+    monkeypatch.chdir(tmp_path)
+    load_drop_nan()([
+            '-t', 'table.tsv.gz',
+            '-c', 'value',
+            '--stream',
+            '--chunksize', '700',
+            '--threads', str(threads),
+            ])
+
+    assert (tmp_path / 'table.tsv_dropNaN.tsv').read_text() == expected
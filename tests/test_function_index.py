@@ -0,0 +1,275 @@
+"""Parity of the inverted-index function classifier with the nested loops
+assert-function used before it.
+"""
+
+import json
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dgeapy.go_ancestors import load_go_ancestor_closure
+from dgeapy.go_ancestors import get_go_column_ancestors
+from dgeapy.function_index import build_function_index
+from dgeapy.function_index import assign_functions
+from dgeapy.function_index import annotate_functions
+
+from conftest import DGEAPY_PATH
+
+
+GO_CODES_COLUMN = 'Gene Ontology IDs'
+KEGG_PATHWAYS_COLUMN = 'kegg_pathways'
+ANCESTORS_COLUMNS = {
+        False : 'go_ancestors_is_a_and_regulates',
+        True : 'go_ancestors_is_a',
+        }
+
+# GO:0000006 is listed under two functions, GO:0000004 under none but its
+# regulates ancestor GO:0000005 is, and "ko0201" and "ko0001" are substrings
+# of "ko02010" and "ko00010".
+FUNCTIONS = {
+        'transport' : {
+            'GO' : ['GO:0000006'],
+            'KEGG' : ['ko0201'],
+            },
+        'metabolism' : {
+            'GO' : ['GO:0000006', 'GO:0000003', 'GO:0000005'],
+            'KEGG' : ['ko00010', 'ko0001'],
+            },
+        'signalling' : {
+            'GO' : ['GO:0000008', 'GO:0000103'],
+            'KEGG' : ['ko02010'],
+            },
+        }
+
+# GO codes, KEGG pathways, expected function (not strict) and expected
+# function with only "is_a" ancestors (strict).
+ROWS = [
+        # Listed under transport and metabolism: the first function wins.
+        ('GO:0000006', np.nan, 'transport', 'transport'),
+        # The first matching code wins, whatever its function.
+        ('GO:0000003; GO:0000006', np.nan, 'metabolism', 'metabolism'),
+        (' GO:0000008;GO:0000006', np.nan, 'signalling', 'signalling'),
+        # Matches only through its ancestors: GO:0000005 is a regulates
+        # ancestor, so the strict match falls back to the KEGG pathways,
+        # where transport's "ko0201" is in "ko02010".
+        ('GO:0000004', 'ko02010', 'metabolism', 'transport'),
+        ('GO:0000004', np.nan, 'metabolism', 'others'),
+        # GO:0000002 only descends from GO:0000001, in no function.
+        ('GO:0000002', np.nan, 'others', 'others'),
+        ('GO:0000002', 'ko00011;ko09999', 'metabolism', 'metabolism'),
+        # An alternative ID listed as it is.
+        ('GO:0000103', np.nan, 'signalling', 'signalling'),
+        # Obsolete.
+        ('GO:0000007', np.nan, 'others', 'others'),
+        (np.nan, 'ko00010', 'metabolism', 'metabolism'),
+        (np.nan, 'ko02010', 'transport', 'transport'),
+        (np.nan, 'ko09999', 'others', 'others'),
+        (np.nan, np.nan, 'not annotated', 'not annotated'),
+        ]
+
+
+def legacy_assign_functions(table, function_dict, go_codes_column,
+                            ancestors_column, kegg_pathways_column):
+    """The row by row loops of assert-function before the inverted index.
+    """
+
+    table = table.copy()
+    table['function'] = pd.Series(np.nan, index=table.index, dtype=object)
+
+    for index, row in table.iterrows():
+        if pd.isnull(row[go_codes_column]) and pd.isnull(row[ancestors_column]) and pd.isnull(row[kegg_pathways_column]):
+            table.at[index, 'function'] = 'not annotated'
+
+        if pd.notnull(row[go_codes_column]):
+            go_codes = str(row[go_codes_column]).split(';')
+
+            for code in go_codes:
+                code = code.strip()
+                for key in function_dict:
+                    if code in function_dict[key]['GO']:
+                        table.at[index, 'function'] = key
+                        break
+                if pd.notnull(table.at[index, 'function']):
+                    break
+
+        if pd.notnull(row[ancestors_column]):
+            if pd.isnull(table.at[index, 'function']):
+                ancestor_codes = str(row[ancestors_column]).split(';')
+
+                for ancestor in ancestor_codes:
+                    for key in function_dict:
+                        if ancestor in function_dict[key]['GO']:
+                            table.at[index, 'function'] = key
+                            break
+                    if pd.notnull(table.at[index, 'function']):
+                        break
+
+        if pd.notnull(row[kegg_pathways_column]):
+            if pd.isnull(table.at[index, 'function']):
+                kegg_pathways = str(row[kegg_pathways_column])
+
+                for key in function_dict:
+                    for pathway in function_dict[key]['KEGG']:
+                        if pathway in kegg_pathways:
+                            table.at[index, 'function'] = key
+                            break
+                    if pd.notnull(table.at[index, 'function']):
+                        break
+        if pd.isnull(table.at[index, 'function']):
+            table.at[index, 'function'] = 'others'
+
+    return table['function'].tolist()
+
+
+def mk_table(go_codes, kegg_pathways, go_ancestors):
+    """Table with the GO ancestor columns go2ancestors adds.
+    """
+
+    table = pd.DataFrame({
+            GO_CODES_COLUMN : go_codes,
+            KEGG_PATHWAYS_COLUMN : kegg_pathways,
+            })
+
+    return pd.concat(
+            [table, get_go_column_ancestors(table[GO_CODES_COLUMN], go_ancestors)],
+            axis=1,
+            )
+
+
+def mk_random_rows(seed, n_rows=300):
+    """Random GO codes and KEGG pathways, unknown ones included.
+    """
+
+    rng = np.random.default_rng(seed)
+    go_codes = [f'GO:000000{i}' for i in range(1, 9)] + ['GO:0000103', 'GO:9999999']
+    pathways = ['ko0001', 'ko00010', 'ko00011', 'ko0201', 'ko02010', 'ko09999']
+
+    rows = []
+    for _ in range(n_rows):
+        codes = rng.choice(go_codes, rng.integers(0, 4)).tolist()
+        kegg = rng.choice(pathways, rng.integers(0, 3)).tolist()
+        rows.append((
+                '; '.join(codes) if codes else np.nan,
+                ';'.join(kegg) if kegg else np.nan,
+                ))
+
+    return rows
+
+
+def mk_random_functions(seed):
+    """Random function dictionary, with GO codes and KEGG pathways listed
+    under several functions.
+    """
+
+    rng = np.random.default_rng(seed)
+    go_codes = [f'GO:000000{i}' for i in range(1, 9)] + ['GO:0000103']
+    pathways = ['ko0001', 'ko00010', 'ko0201', 'ko02010']
+
+    return {
+            f'function{i}' : {
+                'GO' : rng.choice(go_codes, rng.integers(0, 4)).tolist(),
+                'KEGG' : rng.choice(pathways, rng.integers(0, 2)).tolist(),
+                }
+            for i in range(4)
+            }
+
+
+@pytest.mark.parametrize('strict', [False, True])
+def test_fixture_rows(go_obo, strict):
+    go_ancestors = load_go_ancestor_closure(go_obo)
+    go_codes, kegg_pathways, expected, expected_strict = zip(*ROWS)
+    table = mk_table(list(go_codes), list(kegg_pathways), go_ancestors)
+
+    legacy = legacy_assign_functions(
+            table,
+            FUNCTIONS,
+            GO_CODES_COLUMN,
+            ANCESTORS_COLUMNS[strict],
+            KEGG_PATHWAYS_COLUMN,
+            )
+    functions = assign_functions(
+            table,
+            build_function_index(FUNCTIONS),
+            GO_CODES_COLUMN,
+            ANCESTORS_COLUMNS[strict],
+            KEGG_PATHWAYS_COLUMN,
+            ).tolist()
+
+    assert legacy == list(expected_strict if strict else expected)
+    assert functions == legacy
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('strict', [False, True])
+def test_random_rows(go_obo, seed, strict):
+    go_ancestors = load_go_ancestor_closure(go_obo)
+    function_dict = mk_random_functions(seed)
+    function_index = build_function_index(function_dict)
+    go_codes, kegg_pathways = zip(*mk_random_rows(seed))
+    table = mk_table(list(go_codes), list(kegg_pathways), go_ancestors)
+
+    legacy = legacy_assign_functions(
+            table,
+            function_dict,
+            GO_CODES_COLUMN,
+            ANCESTORS_COLUMNS[strict],
+            KEGG_PATHWAYS_COLUMN,
+            )
+    functions = assign_functions(
+            table,
+            function_index,
+            GO_CODES_COLUMN,
+            ANCESTORS_COLUMNS[strict],
+            KEGG_PATHWAYS_COLUMN,
+            )
+    # The annotate command reads the ancestors from the closure instead.
+    annotated_functions = annotate_functions(
+            table,
+            function_index,
+            go_ancestors,
+            GO_CODES_COLUMN,
+            KEGG_PATHWAYS_COLUMN,
+            strict,
+            )
+
+    assert functions.tolist() == legacy
+    assert annotated_functions.tolist() == legacy
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_assert_function_command(go_obo, tmp_path, monkeypatch, jobs):
+    go_ancestors = load_go_ancestor_closure(go_obo)
+    go_codes, kegg_pathways = zip(*(
+            [row[:2] for row in ROWS] + mk_random_rows(0)
+            ))
+    mk_table(list(go_codes), list(kegg_pathways), go_ancestors).to_csv(
+            tmp_path / 'table.tsv', sep='\t', index=False
+            )
+    (tmp_path / 'functions.json').write_text(json.dumps(FUNCTIONS))
+
+    spec = importlib.util.spec_from_file_location(
+            'dgeapy_assert_function',
+            f'{DGEAPY_PATH}/dgeapy_assert-function.py',
+            )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    monkeypatch.chdir(tmp_path)
+    module.main([
+            '-j', 'functions.json',
+            '-t', 'table.tsv',
+            '--jobs', str(jobs),
+            ])
+
+    table = pd.read_csv(tmp_path / 'table.tsv', sep='\t')
+    functions = pd.read_csv(tmp_path / 'table.tsv_functions.tsv', sep='\t')
+
+    assert functions['function'].tolist() == legacy_assign_functions(
+            table,
+            FUNCTIONS,
+            GO_CODES_COLUMN,
+            ANCESTORS_COLUMNS[False],
+            KEGG_PATHWAYS_COLUMN,
+            )
@@ -0,0 +1,70 @@
+import argparse
+
+import pandas as pd
+import pytest
+
+from dgeapy.tables import add_output_arguments
+from dgeapy.tables import get_output_options
+from dgeapy.gene_maps import map_strains
+
+
+def mk_config(tmp_path, id_col_in_df_b='locus'):
+    pd.DataFrame({
+            'old' : ['a1#', 'a2', 'b1'],
+            'new' : ['A1', 'A2', 'B1'],
+            }).to_csv(tmp_path / 'map.tsv', sep='\t', index=False)
+    pd.DataFrame({
+            'locus' : ['a1', 'a2'], 'value' : [1, 2],
+            }).to_csv(tmp_path / 'a.tsv', sep='\t', index=False)
+    pd.DataFrame({
+            'locus' : ['b1'], 'value' : [3],
+            }).to_csv(tmp_path / 'b.tsv', sep='\t', index=False)
+
+    return {
+            'map' : str(tmp_path / 'map.tsv'),
+            'strains' : {
+                'a' : {
+                    'df' : str(tmp_path / 'a.tsv'),
+                    'id_col_in_map' : 'old',
+                    'id_col_in_df' : 'locus',
+                    },
+                'b' : {
+                    'df' : str(tmp_path / 'b.tsv'),
+                    'id_col_in_map' : 'old',
+                    'id_col_in_df' : id_col_in_df_b,
+                    },
+                },
+            }
+
+
+def get_output():
+    parser = argparse.ArgumentParser()
+    add_output_arguments(parser)
+
+    return get_output_options(parser.parse_args([]))
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_map_strains(tmp_path, jobs):
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    map_strains(mk_config(tmp_path), str(out_dir), get_output(), jobs=jobs)
+
+    mapped = pd.read_csv(out_dir / 'a' / 'a.tsv_mapped.tsv', sep='\t')
+    assert mapped['new'].tolist() == ['A1', 'A2']
+    assert (out_dir / 'b' / 'b.tsv_mapped.tsv').is_file()
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_missing_column_stops_before_mapping(tmp_path, jobs):
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+
+    with pytest.raises(SystemExit, match="Column 'gene' of strain 'b'"):
+        map_strains(
+                mk_config(tmp_path, id_col_in_df_b='gene'),
+                str(out_dir),
+                get_output(),
+                jobs=jobs,
+                )
+    assert list(out_dir.iterdir()) == []
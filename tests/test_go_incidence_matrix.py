@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from dgeapy.go_ancestors import load_go_ancestor_closure
+from dgeapy.go_ancestors import get_go_incidence_matrix
+from dgeapy.go_ancestors import save_go_incidence_matrix
+from dgeapy.go_ancestors import read_go_incidence_matrix
+
+
+GO_CODES = pd.Series([
+        'GO:0000006',
+        'GO:0000004',
+        # Alternative ID of GO:0000003.
+        'GO:0000103',
+        np.nan,
+        # Obsolete.
+        'GO:0000007',
+        'GO:0000008; GO:0000003',
+        ])
+GENES = ['g1', 'g2', 'g3', 'g4', 'g5', 'g6']
+
+
+def get_matrix(go_obo):
+    return get_go_incidence_matrix(
+            GO_CODES, GENES, load_go_ancestor_closure(go_obo)
+            )
+
+
+def scan_genes_with_term(matrix, column, strict):
+    """Genes of a column found by scanning the whole CSR matrix.
+    """
+
+    if strict:
+        indptr, indices = matrix.is_a_indptr, matrix.is_a_indices
+    else:
+        indptr = matrix.is_a_and_regulates_indptr
+        indices = matrix.is_a_and_regulates_indices
+    rows = np.repeat(np.arange(len(matrix.genes)), np.diff(indptr))
+
+    return matrix.genes[rows[indices == column]].tolist()
+
+
+def test_genes_with_term(go_obo):
+    matrix = get_matrix(go_obo)
+
+    assert matrix.genes_with_term('GO:0000001').tolist() == [
+            'g1', 'g2', 'g3', 'g6'
+            ]
+    assert matrix.genes_with_term('GO:0000003').tolist() == ['g1', 'g3', 'g6']
+    # GO:0000004 regulates GO:0000005.
+    assert matrix.genes_with_term('GO:0000005').tolist() == ['g1', 'g2']
+    assert matrix.genes_with_term('GO:0000005', strict=True).tolist() == ['g1']
+    assert matrix.genes_with_term('GO:0000008').tolist() == ['g6']
+
+
+def test_genes_with_alternative_id(go_obo):
+    matrix = get_matrix(go_obo)
+
+    assert matrix.alt_ids.tolist() == ['GO:0000103']
+    assert matrix.genes_with_term('GO:0000103').tolist() == (
+            matrix.genes_with_term('GO:0000003').tolist()
+            )
+
+
+def test_genes_with_missing_term(go_obo):
+    matrix = get_matrix(go_obo)
+
+    assert matrix.genes_with_term('GO:0000007').tolist() == []
+    assert matrix.genes_with_term('GO:9999999').tolist() == []
+    assert matrix.genes_with_term('GO:0000000').tolist() == []
+
+
+def test_column_slices_match_csr_scan(go_obo, tmp_path):
+    save_go_incidence_matrix(get_matrix(go_obo), tmp_path / 'matrix.npz')
+    matrix = read_go_incidence_matrix(tmp_path / 'matrix.npz')
+
+    for column, term in enumerate(matrix.terms.tolist()):
+        for strict in (False, True):
+            assert matrix.genes_with_term(term, strict).tolist() == (
+                    scan_genes_with_term(matrix, column, strict)
+                    )
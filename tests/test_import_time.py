@@ -0,0 +1,74 @@
+"""The base import of the dgeapy package must not load the plotting stack.
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+
+DGEAPY_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Top-level modules only imported by the plotting modules of dgeapy.
+PLOTTING_MODULES = [
+        'matplotlib',
+        'seaborn',
+        'upsetplot',
+        'pysankey',
+        'venn',
+        'matplotlib_venn',
+        ]
+
+
+def get_imported_modules(statement):
+    """Runs <statement> with -X importtime in a new interpreter and returns
+    the names of the modules it imported.
+    """
+
+    result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', statement],
+            cwd=DGEAPY_PATH,
+            capture_output=True,
+            text=True,
+            check=True,
+            )
+
+    # Lines are "import time: self [us] | cumulative | imported package".
+    return [
+            line.split('|')[-1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith('import time:') and line.count('|') == 2
+            ][1:]
+
+
+def test_base_import_skips_plotting_modules():
+    modules = get_imported_modules('import dgeapy')
+
+    assert 'dgeapy.tables' in modules
+    plotting_modules = sorted({
+            module for module in modules
+            if module.split('.')[0].lower() in PLOTTING_MODULES
+            })
+    assert plotting_modules == []
+
+
+@pytest.mark.parametrize('statement', [
+        'from dgeapy import read_config_json_file',
+        'import dgeapy; dgeapy.read_table, dgeapy.mk_intersections_table',
+        ])
+def test_table_functions_skip_plotting_modules(statement):
+    modules = get_imported_modules(statement)
+
+    assert not [
+            module for module in modules
+            if module.split('.')[0].lower() in PLOTTING_MODULES
+            ]
+
+
+def test_plotting_functions_are_imported_on_access():
+    modules = get_imported_modules(
+            'import dgeapy; dgeapy.generate_upset_plot_from_codes'
+            )
+
+    assert 'upsetplot' in modules
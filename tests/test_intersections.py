@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from dgeapy.intersections import get_gene_ids_set_for_intersections
+from dgeapy.intersections import get_intersection_keys
+
+
+def mk_gene_sets(n_sets, seed, n_genes=300):
+    rng = np.random.default_rng(seed)
+    gene_ids = [f'gene{i}' for i in range(n_genes)]
+
+    return [
+            set(rng.choice(gene_ids, rng.integers(0, n_genes)).tolist())
+            for _ in range(n_sets)
+            ]
+
+
+def get_expected_intersections(gene_sets):
+    """Intersections by the membership of each gene in every set.
+    """
+
+    intersections = {}
+    for gene in set().union(*gene_sets):
+        key = ''.join('1' if gene in s else '0' for s in gene_sets)
+        intersections.setdefault(key, set()).add(gene)
+
+    return intersections
+
+
+@pytest.mark.parametrize('n_sets', range(1, 10))
+@pytest.mark.parametrize('seed', range(3))
+def test_intersections_of_sets_and_arrays(n_sets, seed):
+    gene_sets = mk_gene_sets(n_sets, seed)
+    expected = get_expected_intersections(gene_sets)
+
+    assert get_gene_ids_set_for_intersections(gene_sets) == expected
+    assert get_gene_ids_set_for_intersections(
+            [np.array(sorted(s), dtype=object) for s in gene_sets]
+            ) == expected
+
+
+def test_keys_of_empty_intersections():
+    gene_sets = [{'a', 'b'}, {'b'}, set()]
+    keys = get_intersection_keys(3)
+    intersections = get_gene_ids_set_for_intersections(gene_sets, keys)
+
+    assert list(intersections) == keys
+    assert intersections['100'] == {'a'}
+    assert intersections['110'] == {'b'}
+    assert all(not intersections[key] for key in keys if key not in ('100', '110'))
+    assert get_gene_ids_set_for_intersections([set(), frozenset()]) == {}
@@ -0,0 +1,105 @@
+import argparse
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+import dgeapy
+import dgeapy.sample_tables
+
+from conftest import DGEAPY_PATH
+
+
+def load_multiplemuts():
+    spec = importlib.util.spec_from_file_location(
+            'dgeapy_multiplemuts', f'{DGEAPY_PATH}/dgeapy_multiplemuts.py'
+            )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def mk_sample_table(file_path, seed, n_genes=60):
+    """Writes a sample table with annotation columns, a repeated gene ID and
+    a non-coding one, and returns it.
+    """
+
+    rng = np.random.default_rng(seed)
+    ids = [f'gene{i}' for i in range(n_genes)] + ['gene3', 'Novel1']
+    table = pd.DataFrame({
+            'index' : ids,
+            'gene_id' : ids,
+            'log2FoldChange' : rng.normal(0, 2, len(ids)),
+            'pvalue' : rng.uniform(0, 0.05, len(ids)),
+            'padj' : rng.uniform(0, 0.1, len(ids)),
+            'Description' : [f'{i} description' for i in ids],
+            'chr' : [f'chr{i % 3}' for i in range(len(ids))],
+            'GO' : [f'GO:{i:07d}' if i % 4 else '--' for i in range(len(ids))],
+            })
+    table.to_csv(file_path, sep='\t', index=False)
+
+    return table
+
+
+def test_annotations_are_read_once_per_sample(tmp_path, monkeypatch):
+    multiplemuts = load_multiplemuts()
+    tables = {
+            name : mk_sample_table(tmp_path / f'{name}.tsv', seed)
+            for seed, name in enumerate(['mutA', 'mutB'])
+            }
+
+    annotation_reads = []
+    read_table = dgeapy.sample_tables.read_table
+    def counted_read_table(file_path, columns=None, **kwargs):
+        if 'chr' in (columns or []):
+            annotation_reads.append(file_path)
+        return read_table(file_path, columns, **kwargs)
+    monkeypatch.setattr(dgeapy.sample_tables, 'read_table', counted_read_table)
+
+    parser = argparse.ArgumentParser()
+    dgeapy.add_output_arguments(parser)
+    output = dgeapy.get_output_options(parser.parse_args([]))
+
+    data = []
+    for name in tables:
+        sample_df_dir = tmp_path / name
+        sample_df_dir.mkdir()
+        data.append(multiplemuts.analyze_sample(
+                name,
+                str(tmp_path / f'{name}.tsv'),
+                1.5,
+                0.05,
+                exclude=dgeapy.NON_CODING_PATTERNS,
+                ))
+        multiplemuts.write_sample_tables(data[-1], sample_df_dir, output)
+        dgeapy.trim_annotation_columns(data[-1])
+    intersections_table = dgeapy.mk_intersections_table(data)
+
+    assert sorted(annotation_reads) == sorted(
+            str(tmp_path / f'{name}.tsv') for name in tables
+            )
+
+    for sample_data in data:
+        table = tables[sample_data.name]
+        expected = table[
+                ~table['index'].duplicated() & (table['index'] != 'Novel1')
+                ].set_index('index')
+        written = pd.read_csv(
+                tmp_path / sample_data.name / f'{sample_data.name}_input.tsv',
+                sep='\t',
+                index_col=0,
+                na_values=dgeapy.sample_tables.NA_VALUES,
+                )
+        pd.testing.assert_series_equal(
+                written['chr'], expected['chr'], check_names=False
+                )
+        pd.testing.assert_series_equal(
+                written['GO'],
+                expected['GO'].replace('--', np.nan),
+                check_names=False,
+                )
+        assert sample_data.annotation_df.index.equals(sample_data.dge_df.index)
+        assert intersections_table.df.loc[
+                sample_data.dge_df.index, f'{sample_data.name}_chr'
+                ].tolist() == expected.loc[sample_data.dge_df.index, 'chr'].tolist()
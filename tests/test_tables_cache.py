@@ -0,0 +1,95 @@
+import os
+import sys
+import glob
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dgeapy.tables import read_table
+
+from conftest import DGEAPY_PATH
+
+
+pytest.importorskip('pyarrow')
+
+
+def mk_tables(tmp_path, n_tables=16, n_rows=200):
+    """Writes <n_tables> TSV tables and returns their paths and contents.
+    """
+
+    tables = {}
+    for i in range(n_tables):
+        table = pd.DataFrame({
+                'index' : [f'gene{j}' for j in range(n_rows)],
+                'value' : np.arange(n_rows) * i,
+                'note' : [np.nan if j % 3 else f'note{j}' for j in range(n_rows)],
+                })
+        file_path = str(tmp_path / f'table{i}.tsv')
+        table.to_csv(file_path, sep='\t', index=False)
+        tables[file_path] = table
+
+    return tables
+
+
+def test_concurrent_reads_keep_every_index_entry(tmp_path):
+    tables = mk_tables(tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+
+    def read(file_path):
+        return read_table(file_path, cache_dir=cache_dir)
+
+    for _ in range(2):
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(read, tables))
+        for table, result in zip(tables.values(), results):
+            pd.testing.assert_frame_equal(result, table)
+
+    entries = [
+            json.loads(open(entry_file).read())
+            for entry_file in glob.glob(f'{cache_dir}/index/*.json')
+            ]
+    assert sorted(entry['path'] for entry in entries) == sorted(tables)
+    assert len(glob.glob(f'{cache_dir}/*.parquet')) == len(tables)
+
+
+def test_changed_file_is_read_again(tmp_path):
+    tables = mk_tables(tmp_path, n_tables=1)
+    file_path, = tables
+    cache_dir = str(tmp_path / 'cache')
+
+    read_table(file_path, cache_dir=cache_dir)
+    changed = tables[file_path].assign(value=-1)
+    changed.to_csv(file_path, sep='\t', index=False)
+
+    pd.testing.assert_frame_equal(
+            read_table(file_path, cache_dir=cache_dir), changed
+            )
+    pd.testing.assert_frame_equal(
+            read_table(file_path, ['value'], cache_dir=cache_dir),
+            changed[['value']],
+            )
+
+
+def test_cache_is_off_by_default(tmp_path):
+    # Checked in a new interpreter, since CACHE_DIR is set on import.
+    env = {k : v for k, v in os.environ.items() if k != 'DGEAPY_CACHE_DIR'}
+    env['HOME'] = str(tmp_path)
+    env['XDG_CACHE_HOME'] = str(tmp_path / 'cache')
+    result = subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                'from dgeapy.tables import CACHE_DIR; print(repr(CACHE_DIR))',
+                ],
+            cwd=DGEAPY_PATH,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+            )
+
+    assert result.stdout.strip() == "''"